@@ -4,9 +4,10 @@ from .resume_analyzer import ResumeAnalyzer
 from .interview_agent import InterviewAgent
 from .resume_improver import ResumeImprover
 from .job_search_agent import JobAgent
+from .batch_ranker import BatchRanker
 
 # Import LLM functions for backward compatibility
-from utils.llm_providers import groq_chat, SESSION
+from utils.llm_providers import groq_chat, groq_chat_async, groq_chat_stream_async, SESSION
 from utils.text_utils import clamp_text as _clamp_text
 
 
@@ -34,7 +35,8 @@ class ResumeAnalysisAgent(ResumeAnalyzer):
         return self._improver_agent
     
     # Backend API compatibility methods
-    def analyze_resume(self, role=None, cutoff_score=75, jd_text=None, custom_skills=None):
+    def analyze_resume(self, role=None, cutoff_score=75, jd_text=None, custom_skills=None, deadline=None,
+                       intensity="full"):
         """
         Analyze resume with backend-compatible API.
         
@@ -43,6 +45,8 @@ class ResumeAnalysisAgent(ResumeAnalyzer):
             cutoff_score: Minimum matching score threshold
             jd_text: Job description text
             custom_skills: List of required skills
+            deadline: Optional `Deadline` (or seconds); partial results are returned when it passes
+            intensity: "full", "quick" or "local" (no LLM calls)
         """
         # Determine role requirements
         role_requirements = custom_skills if custom_skills else None
@@ -53,7 +57,9 @@ class ResumeAnalysisAgent(ResumeAnalyzer):
                 resume_text=self.resume_text,
                 role_requirements=role_requirements,
                 custom_jd=jd_text,
-                quick=False
+                quick=False,
+                deadline=deadline,
+                intensity=intensity
             )
         else:
             raise ValueError("Resume text must be set before calling analyze_resume")
@@ -118,6 +124,18 @@ class ResumeAnalysisAgent(ResumeAnalyzer):
         """Delegate to interview agent."""
         return self.interview_agent.ask_question(question, chat_history)
     
+    async def ask_question_async(self, question, chat_history=None):
+        """Delegate to interview agent (async)."""
+        return await self.interview_agent.ask_question_async(question, chat_history)
+    
+    def ask_question_stream(self, question, chat_history=None):
+        """Delegate to interview agent (streaming)."""
+        return self.interview_agent.ask_question_stream(question, chat_history)
+    
+    def ask_question_astream(self, question, chat_history=None):
+        """Delegate to interview agent (async streaming)."""
+        return self.interview_agent.ask_question_astream(question, chat_history)
+    
     def answer_interview_question(self, question: str) -> str:
         """Delegate to interview agent."""
         return self.interview_agent.answer_interview_question(question)
@@ -134,11 +152,38 @@ class ResumeAnalysisAgent(ResumeAnalyzer):
         """Delegate to improver agent."""
         return self.improver_agent.get_improved_resume(target_role, highlight_skills)
     
+    async def get_improved_resume_async(self, target_role="", highlight_skills=""):
+        """Delegate to improver agent (async)."""
+        return await self.improver_agent.get_improved_resume_async(target_role, highlight_skills)
+    
+    def get_improved_resume_stream(self, target_role="", highlight_skills=""):
+        """Delegate to improver agent (streaming)."""
+        return self.improver_agent.get_improved_resume_stream(target_role, highlight_skills)
+    
+    def get_improved_resume_astream(self, target_role="", highlight_skills=""):
+        """Delegate to improver agent (async streaming)."""
+        return self.improver_agent.get_improved_resume_astream(target_role, highlight_skills)
+    
     def generate_cover_letter(self, company: str, role: str, job_description: str = "", 
                             tone: str = "professional", length: str = "one-page") -> str:
         """Delegate to improver agent."""
         return self.improver_agent.generate_cover_letter(company, role, job_description, tone, length)
     
+    async def generate_cover_letter_async(self, company: str, role: str, job_description: str = "",
+                                          tone: str = "professional", length: str = "one-page") -> str:
+        """Delegate to improver agent (async)."""
+        return await self.improver_agent.generate_cover_letter_async(company, role, job_description, tone, length)
+    
+    def generate_cover_letter_stream(self, company: str, role: str, job_description: str = "",
+                                     tone: str = "professional", length: str = "one-page"):
+        """Delegate to improver agent (streaming)."""
+        return self.improver_agent.generate_cover_letter_stream(company, role, job_description, tone, length)
+    
+    def generate_cover_letter_astream(self, company: str, role: str, job_description: str = "",
+                                      tone: str = "professional", length: str = "one-page"):
+        """Delegate to improver agent (async streaming)."""
+        return self.improver_agent.generate_cover_letter_astream(company, role, job_description, tone, length)
+    
     def generate_updated_resume_latex(self, latex_source: str, job_description: str) -> str:
         """Delegate to improver agent."""
         return self.improver_agent.generate_updated_resume_latex(latex_source, job_description)
@@ -156,6 +201,8 @@ __all__ = [
     'ResumeAnalysisAgent',  # Backward compatibility
     # LLM functions for backward compatibility
     'groq_chat',
+    'groq_chat_async',
+    'groq_chat_stream_async',
     'SESSION',
     '_clamp_text',
 ]
@@ -0,0 +1,292 @@
+"""Rank many resumes against one job description.
+
+The JD skills are extracted and canonicalized once. Resume text is
+extracted in a process pool, every resume's chunks are embedded in large
+batches, and the local lexical/embedding scorer ranks all of them with a
+few matrix products. Only the top K go on to LLM skill scoring. Once every
+resume is scored, ranked records are yielded one at a time: the LLM-scored
+shortlist first, then the rest by local score.
+
+Usage:
+    python -m agents.batch_ranker --jd jd.txt resumes/ --top-k 25 --out ranked.jsonl
+    python -m agents.batch_ranker --skills "Python, Docker, AWS" resumes/*.pdf --top-k 0
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.file_handlers import extract_text_from_file
+from utils.skill_ontology import canonicalize_skills
+from utils.text_utils import split_text
+from .resume_analyzer import ResumeAnalyzer, LOCAL_CHUNK_SIZE, calibrate_local_scores
+
+BATCH_TOP_K = int(os.getenv("BATCH_TOP_K", "20"))
+BATCH_EMBED_SIZE = int(os.getenv("BATCH_EMBED_SIZE", "512"))
+BATCH_EXTRACT_WORKERS = int(os.getenv("BATCH_EXTRACT_WORKERS", "0")) or None  # None: one per CPU
+RESUME_EXTENSIONS = (".pdf", ".txt")
+
+
+def collect_resume_paths(inputs) -> list:
+    """Expand files and directories into a sorted, de-duplicated list of resume paths."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(RESUME_EXTENSIONS))
+        elif item.lower().endswith(RESUME_EXTENSIONS):
+            paths.append(item)
+        else:
+            print(f"Skipping unsupported file: {item}", file=sys.stderr)
+    return sorted(dict.fromkeys(paths))
+
+
+class BatchRanker:
+    """Rank resumes against one JD: local prefilter for all, LLM scoring for the top K.
+
+    Example:
+        ranker = BatchRanker(ResumeAnalyzer(api_key), top_k=25)
+        for record in ranker.rank(paths, jd_text=jd):
+            ...
+    """
+
+    def __init__(self, analyzer: ResumeAnalyzer, top_k: int | None = None, embed_batch_size: int | None = None,
+                 extract_workers: int | None = None, progress=None):
+        self.analyzer = analyzer
+        self.top_k = BATCH_TOP_K if top_k is None else max(0, top_k)
+        self.embed_batch_size = embed_batch_size or BATCH_EMBED_SIZE
+        self.extract_workers = extract_workers or BATCH_EXTRACT_WORKERS
+        self.progress = progress  # progress(stage, done, total)
+        self.token_usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._lock = threading.Lock()
+        self._local = threading.local()  # one analyzer per fan-out worker thread
+
+    def _report(self, stage: str, done: int, total: int) -> None:
+        if self.progress:
+            try:
+                self.progress(stage, done, total)
+            except Exception:
+                pass
+
+    def job_skills(self, jd_text: str | None = None, skills: list | None = None, use_llm: bool = True) -> list:
+        """Canonical JD skills, extracted once for the whole batch."""
+        if skills:
+            return canonicalize_skills(skills)
+        if not jd_text:
+            return []
+        jd = self.analyzer.clean_job_description(jd_text)
+        self.analyzer.jd_text = jd
+        found = self.analyzer.extract_skills_from_jd(jd) if use_llm else []
+        return found or self.analyzer.fast_extract_skills_from_jd(jd)
+
+    def extract_texts(self, paths: list) -> list:
+        """Resume text for each path (empty string when extraction fails), using a process pool."""
+        total = len(paths)
+        self._report("extract", 0, total)
+        if total < 8:
+            texts = []
+            for i, path in enumerate(paths, 1):
+                texts.append(extract_text_from_file(path) or "")
+                self._report("extract", i, total)
+            return texts
+        workers = self.extract_workers or os.cpu_count() or 1
+        try:
+            texts = []
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for text in pool.map(extract_text_from_file, paths, chunksize=max(1, total // (workers * 8))):
+                    texts.append(text or "")
+                    if len(texts) % 25 == 0 or len(texts) == total:
+                        self._report("extract", len(texts), total)
+            return texts
+        except Exception as e:
+            print(f"Process pool unavailable, extracting serially: {e}", file=sys.stderr)
+            return [extract_text_from_file(path) or "" for path in paths]
+
+    def _chunk_similarity(self, texts: list, skill_vectors: np.ndarray) -> np.ndarray:
+        """Best chunk similarity per (resume, skill), embedding all chunks in large batches."""
+        chunks, owners = [], []
+        for i, text in enumerate(texts):
+            if text.strip():
+                pieces = split_text(text, chunk_size=LOCAL_CHUNK_SIZE, chunk_overlap=50) or [text]
+                chunks.extend(pieces)
+                owners.extend([i] * len(pieces))
+
+        similarity = np.zeros((len(texts), len(skill_vectors)), dtype=np.float32)
+        if not chunks:
+            return similarity
+        embeddings = self.analyzer._get_embeddings()
+        total = len(chunks)
+        self._report("embed", 0, total)
+        for start in range(0, total, self.embed_batch_size):
+            batch = chunks[start:start + self.embed_batch_size]
+            matrix = np.asarray(embeddings.embed_documents(batch), dtype=np.float32)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+            # Fold each batch into the per-resume maxima right away (chunks of a resume are contiguous)
+            sims = matrix @ skill_vectors.T
+            batch_owners = np.asarray(owners[start:start + len(batch)])
+            bounds = np.flatnonzero(np.r_[True, batch_owners[1:] != batch_owners[:-1]])
+            rows = batch_owners[bounds]
+            similarity[rows] = np.maximum(similarity[rows], np.maximum.reduceat(sims, bounds, axis=0))
+            self._report("embed", min(start + len(batch), total), total)
+        return similarity
+
+    def local_scores(self, texts: list, skills: list) -> tuple:
+        """(scores, similarity, hits) matrices of shape resumes x skills."""
+        hits = np.stack([self.analyzer.skill_mentions(text, skills) for text in texts]) if texts else \
+            np.zeros((0, len(skills)), dtype=np.float32)
+        try:
+            similarity = self._chunk_similarity(texts, self.analyzer.embed_skills(skills))
+        except Exception as e:
+            print(f"Local embedding scoring unavailable, using lexical hits only: {e}", file=sys.stderr)
+            similarity = np.zeros_like(hits)
+        return calibrate_local_scores(similarity, hits), similarity, hits
+
+    def _worker_analyzer(self) -> ResumeAnalyzer:
+        """This thread's analyzer, created once and reused for every resume the thread scores.
+
+        Analyzers hold per-resume state, so fan-out workers cannot share the
+        base one; they do share its embeddings, evidence cache and vector
+        cache directory (and, by API key and model, its rate limiter).
+        """
+        worker = getattr(self._local, "analyzer", None)
+        if worker is None:
+            base = self.analyzer
+            worker = ResumeAnalyzer(base.api_key, cutoff_score=base.cutoff_score, model=base.model,
+                                    user_id=base.user_id, vector_cache_dir=base.vector_cache_dir)
+            worker._embeddings = base._embeddings
+            worker.evidence_cache = base.evidence_cache
+            self._local.analyzer = worker
+        return worker
+
+    def _llm_analysis(self, text: str, skills: list) -> dict:
+        """LLM skill scoring for one resume on this worker's analyzer."""
+        worker = self._worker_analyzer()
+        before = dict(worker.token_usage)
+        worker.resume_text = text
+        worker.resume_hash = worker._compute_resume_hash(text)
+        result = worker.semantic_skill_analysis(text, skills)
+        with self._lock:
+            for key, value in worker.token_usage.items():
+                self.token_usage[key] += value - before.get(key, 0)
+        return result
+
+    def rank(self, paths: list, jd_text: str | None = None, skills: list | None = None, use_llm_jd: bool = True):
+        """Yield one ranked record per resume: the LLM-scored top K first, then the rest by local score."""
+        skills = self.job_skills(jd_text, skills, use_llm=use_llm_jd)
+        if not skills:
+            raise ValueError("No skills found in the job description; pass skills explicitly")
+        texts = self.extract_texts(paths)
+        scores, similarity, hits = self.local_scores(texts, skills)
+        local = [self.analyzer.local_result(skills, scores[i], similarity[i], hits[i]) for i in range(len(texts))]
+
+        order = sorted(range(len(texts)), key=lambda i: (-local[i]["overall_score"], paths[i]))
+        shortlist = [i for i in order if texts[i].strip()][:self.top_k]
+
+        llm = {}
+        if shortlist:
+            done = [0]
+            self._report("llm", 0, len(shortlist))
+
+            def score(i):
+                try:
+                    return self._llm_analysis(texts[i], skills)
+                finally:
+                    with self._lock:
+                        done[0] += 1
+                        self._report("llm", done[0], len(shortlist))
+
+            def failed(i, exc):
+                print(f"LLM scoring failed for {paths[i]}, keeping local score: {exc}", file=sys.stderr)
+                return None
+
+            for i, result in zip(shortlist, self.analyzer.fan_out(score, shortlist, on_error=failed)):
+                if result:
+                    llm[i] = result
+            shortlist.sort(key=lambda i: (-(llm.get(i) or local[i])["overall_score"], paths[i]))
+
+        shortlisted = set(shortlist)
+        for rank, i in enumerate(shortlist + [i for i in order if i not in shortlisted], 1):
+            result = llm.get(i) or local[i]
+            record = {
+                "rank": rank,
+                "path": paths[i],
+                "score": result["overall_score"],
+                "local_score": local[i]["overall_score"],
+                "llm_score": llm[i]["overall_score"] if i in llm else None,
+                "stage": "llm" if i in llm else "local",
+                "selected": result["selected"],
+                "skill_scores": result["skill_scores"],
+                "missing_skills": result["missing_skills"],
+                "strengths": result["strengths"],
+            }
+            if result.get("partial"):
+                record["partial"] = True
+            if not texts[i].strip():
+                record["error"] = "No text could be extracted"
+            yield record
+
+
+def _print_progress(stage: str, done: int, total: int) -> None:
+    print(f"\r{stage}: {done}/{total}", end="\n" if done >= total else "", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank resumes against one job description (JSONL output)")
+    parser.add_argument("resumes", nargs="+", help="resume files (.pdf/.txt) or directories")
+    parser.add_argument("--jd", help="job description file")
+    parser.add_argument("--skills", help="comma-separated required skills (instead of extracting them from --jd)")
+    parser.add_argument("--top-k", type=int, default=BATCH_TOP_K, help="resumes sent to LLM scoring (0: local only)")
+    parser.add_argument("--out", help="write JSONL here instead of stdout")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--cutoff", type=int, default=75)
+    parser.add_argument("--workers", type=int, default=None, help="text extraction processes")
+    parser.add_argument("--batch-size", type=int, default=None, help="chunks per embedding batch")
+    parser.add_argument("--fast-jd", action="store_true", help="extract JD skills without the LLM")
+    parser.add_argument("--quiet", action="store_true", help="no progress on stderr")
+    args = parser.parse_args(argv)
+
+    if not args.jd and not args.skills:
+        parser.error("one of --jd or --skills is required")
+    jd_text = None
+    if args.jd:
+        with open(args.jd, "r", encoding="utf-8", errors="ignore") as f:
+            jd_text = f.read()
+    skills = [s.strip() for s in args.skills.split(",") if s.strip()] if args.skills else None
+
+    api_key = os.getenv("GROQ_API_KEY")
+    top_k = args.top_k
+    if not api_key and (top_k or (jd_text and not skills and not args.fast_jd)):
+        print("GROQ_API_KEY not set: ranking with local scores only", file=sys.stderr)
+        top_k, args.fast_jd = 0, True
+
+    paths = collect_resume_paths(args.resumes)
+    if not paths:
+        parser.error("no .pdf/.txt resumes found")
+
+    ranker = BatchRanker(ResumeAnalyzer(api_key, cutoff_score=args.cutoff, model=args.model), top_k=top_k,
+                         embed_batch_size=args.batch_size, extract_workers=args.workers,
+                         progress=None if args.quiet else _print_progress)
+    started = time.perf_counter()
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    count = 0
+    try:
+        for record in ranker.rank(paths, jd_text=jd_text, skills=skills, use_llm_jd=not args.fast_jd):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if not args.quiet:
+        print(f"Ranked {count} resumes in {time.perf_counter() - started:.1f}s "
+              f"({ranker.token_usage['calls']} LLM calls)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
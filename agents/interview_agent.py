@@ -2,7 +2,9 @@
 
 import re
 import json
-from utils.text_utils import clamp_text
+import asyncio
+from utils.prompt_budget import PromptBuilder
+from utils.structured_output import QUESTIONS_FORMAT, parse_json
 
 
 class InterviewAgent:
@@ -21,7 +23,36 @@ class InterviewAgent:
         """
         if not self.analyzer.resume_text:
             return "Please analyze a resume first."
-        
+        prompt = self._build_ask_prompt(question, chat_history)
+        return self.analyzer.llm_chat(messages=[{"role": "user", "content": prompt}], max_tokens=2000).strip()
+
+    async def ask_question_async(self, question, chat_history=None):
+        """Async variant of `ask_question`; retrieval runs in a worker thread."""
+        if not self.analyzer.resume_text:
+            return "Please analyze a resume first."
+        prompt = await asyncio.to_thread(self._build_ask_prompt, question, chat_history)
+        answer = await self.analyzer.llm_chat_async(messages=[{"role": "user", "content": prompt}], max_tokens=2000)
+        return answer.strip()
+
+    def ask_question_stream(self, question, chat_history=None):
+        """Streaming variant of `ask_question` yielding answer deltas."""
+        if not self.analyzer.resume_text:
+            yield "Please analyze a resume first."
+            return
+        prompt = self._build_ask_prompt(question, chat_history)
+        yield from self.analyzer.llm_chat_stream(messages=[{"role": "user", "content": prompt}], max_tokens=2000)
+
+    async def ask_question_astream(self, question, chat_history=None):
+        """Async-iterator variant of `ask_question` yielding answer deltas."""
+        if not self.analyzer.resume_text:
+            yield "Please analyze a resume first."
+            return
+        prompt = await asyncio.to_thread(self._build_ask_prompt, question, chat_history)
+        async for delta in self.analyzer.llm_chat_astream(messages=[{"role": "user", "content": prompt}], max_tokens=2000):
+            yield delta
+
+    def _build_ask_prompt(self, question, chat_history=None):
+        """Assemble the RAG + chat-history prompt for a resume question."""
         chat_history = chat_history or []
         
         # Lazily build RAG store on first use
@@ -42,12 +73,11 @@ class InterviewAgent:
             except Exception:
                 pass
         
-        # If no context from RAG or context is too short, use full resume (clamped)
+        # If no context from RAG or context is too short, use full resume (budgeted below)
         if not context or len(context) < 100:
-            context = clamp_text(self.analyzer.resume_text, 2500)
-        else:
-            context = clamp_text(context, 2500)
+            context = self.analyzer.resume_text
         
+        analysis_info = ""
         # Check if asking about weaknesses/analysis results
         if any(word in question.lower() for word in ['weakness', 'weak', 'missing', 'lack', 'improve', 'gap', 'need to add']):
             weakness_info = ""
@@ -61,7 +91,7 @@ class InterviewAgent:
                 if missing:
                     weakness_info += f"\nMissing Skills: {', '.join(missing[:10])}\n"
             
-            context += weakness_info
+            analysis_info += weakness_info
         
         # Check if asking about strengths/skills
         if any(word in question.lower() for word in ['strength', 'strong', 'skill', 'technology', 'experience', 'good at']):
@@ -78,7 +108,7 @@ class InterviewAgent:
                     for skill, score in top_skills:
                         strength_info += f"- {skill}: {score}/10\n"
             
-            context += strength_info
+            analysis_info += strength_info
         
         # Build conversation context from chat history
         conversation_context = ""
@@ -91,67 +121,89 @@ class InterviewAgent:
                 conversation_context += f"{role}: {msg['content']}\n"
             conversation_context += "\n"
         
-        prompt = (
-            "You are a helpful AI assistant analyzing a resume. Answer the user's question based on the resume content and conversation history provided.\n"
-            "Be conversational, friendly, and helpful. Provide specific details from the resume.\n"
-            "Use the conversation history to understand context and give relevant follow-up answers.\n"
-            "If referring to something mentioned earlier, acknowledge it naturally.\n"
-            "If you greet the user (hi/hello), respond warmly and ask how you can help with the resume.\n\n"
-            f"Resume Content:\n{context}\n"
-            f"{conversation_context}"
-            f"Current Question: {question}\n\n"
-            "Answer:"
+        # Instructions and the question always fit; resume context, analysis
+        # notes and history share what is left (oldest history goes first)
+        plan = (
+            PromptBuilder(self.analyzer.model, max_completion=2000)
+            .add(
+                "You are a helpful AI assistant analyzing a resume. Answer the user's question based on the resume content and conversation history provided.\n"
+                "Be conversational, friendly, and helpful. Provide specific details from the resume.\n"
+                "Use the conversation history to understand context and give relevant follow-up answers.\n"
+                "If referring to something mentioned earlier, acknowledge it naturally.\n"
+                "If you greet the user (hi/hello), respond warmly and ask how you can help with the resume.\n\n"
+                "Resume Content:\n",
+                priority=100,
+            )
+            .add(context, priority=60, max_tokens=625, name="resume")
+            .add(analysis_info, priority=70, max_tokens=300, name="analysis")
+            .add("\n", priority=100)
+            .add(conversation_context, priority=40, max_tokens=800, keep="tail", name="history")
+            .add(f"Current Question: {question}\n\nAnswer:", priority=100)
+            .build()
         )
-        return self.analyzer.llm_chat(messages=[{"role": "user", "content": prompt}], max_tokens=2000).strip()
+        return plan.prompt
+
+    def _answer_prompt(self, question: str) -> str:
+        """Build the model-answer prompt for an interview question."""
+        jd_context = self.analyzer.jd_text or ""
+        return (
+            PromptBuilder(self.analyzer.model)
+            .add(
+                "You are a senior candidate crafting a concise, strong answer.\n"
+                "Use only the candidate's resume context (and JD if present).\n"
+                "Keep it specific, with impact/metrics where possible, 4-7 sentences max.\n\n"
+                "Resume context (may be partial):\n",
+                priority=100,
+            )
+            .add(self.analyzer.resume_context(), priority=60, name="resume")
+            .add("\n\n", priority=100)
+            .add(f"Job description (optional):\n{jd_context}\n\n" if jd_context else "", priority=40, name="jd")
+            .add(f"Question: {question}\n\nAnswer:", priority=100)
+            .build()
+        ).prompt
 
     def answer_interview_question(self, question: str) -> str:
         """Generate a best-fit model answer to an interview question."""
         if not self.analyzer.resume_text:
             return ""
-        
-        jd_context = self.analyzer.jd_text or ""
-        prompt = (
-            "You are a senior candidate crafting a concise, strong answer.\n"
-            "Use only the candidate's resume context (and JD if present).\n"
-            "Keep it specific, with impact/metrics where possible, 4-7 sentences max.\n\n"
-            f"Resume context (may be partial):\n{clamp_text(self.analyzer.resume_text, 900)}\n\n"
-            + (f"Job description (optional):\n{clamp_text(jd_context, 600)}\n\n" if jd_context else "") +
-            f"Question: {question}\n\nAnswer:"
-        )
+        prompt = self._answer_prompt(question)
         try:
             return self.analyzer.llm_chat(messages=[{"role": "user", "content": prompt}]).strip()
         except Exception:
             return ""
 
+    async def answer_interview_question_async(self, question: str) -> str:
+        """Async variant of `answer_interview_question`."""
+        if not self.analyzer.resume_text:
+            return ""
+        prompt = self._answer_prompt(question)
+        try:
+            return (await self.analyzer.llm_chat_async(messages=[{"role": "user", "content": prompt}])).strip()
+        except Exception:
+            return ""
+
     def generate_interview_questions(self, question_types, difficulty, num_questions):
         """Generate interview questions based on the resume."""
         if not self.analyzer.resume_text or not self.analyzer.extracted_skills:
             return []
 
         try:
+            # Each item carries a 4-7 sentence solution; size the completion to fit them all
+            max_tokens = self.analyzer._json_max_tokens(num_questions, per_item=220)
             context = f"""
-    Resume Content:
-    {clamp_text(self.analyzer.resume_text, 1200)}...
-
     Skills to focus on: {', '.join(self.analyzer.extracted_skills)}
     Strengths: {', '.join(self.analyzer.analysis_result.get('strengths', []))}
     Areas for improvement: {', '.join(self.analyzer.analysis_result.get('missing_skills', []))}
     """
 
-            prompt = f"""
+            instructions = f"""
         Generate exactly {num_questions} personalized {difficulty.lower()} level interview questions
         for this candidate based on their resume and skills.
 
         Only include question types from this list: {', '.join(question_types)}.
 
         Return ONLY valid JSON in this exact format (no backticks, no prefixes/suffixes):
-        [
-            {{
-                "type": "<One type from the list above>",
-                "question": "<A real interview question>",
-                "solution": "<A best-fit, strong answer tailored to the resume in 4-7 sentences>"
-            }}
-        ]
+        {QUESTIONS_FORMAT}
 
         Requirements:
         - Output MUST contain exactly {num_questions} items.
@@ -159,15 +211,24 @@ class InterviewAgent:
         - "question" must be a complete interview question.
         - "solution" must be a best-fit answer using the resume context.
         - Do not include any extra commentary.
-        {context}
         """
+            prompt = (
+                PromptBuilder(self.analyzer.model, max_completion=max_tokens)
+                .add(instructions, priority=100)
+                .add("\n    Resume Content:\n    ", priority=100)
+                .add(self.analyzer.resume_context(), priority=50, name="resume")
+                .add(context, priority=90)
+                .build()
+            ).prompt
 
-            raw_response = self.analyzer.llm_chat(messages=[{"role": "user", "content": prompt}]).strip()
+            raw_response = self.analyzer.llm_chat(
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+            ).strip()
 
-            # Try parsing JSON
-            try:
-                parsed_questions = json.loads(raw_response)
-            except json.JSONDecodeError:
+            # Parse JSON (repairing fences, trailing commas, truncation); scrape with a regex as a last resort
+            parsed_questions = parse_json(raw_response, [dict], fallback_calls=1)
+            if parsed_questions is None:
                 pattern = r'"type"\s*:\s*"([^"]+)"\s*,\s*"question"\s*:\s*"([^"]+)"(?:\s*,\s*"solution"\s*:\s*"([^"]+)")?'
                 matches = re.findall(pattern, raw_response, re.DOTALL)
                 parsed_questions = [{"type": m[0], "question": m[1], "solution": (m[2] if len(m) > 2 else "")} for m in matches]
@@ -180,8 +241,6 @@ class InterviewAgent:
                 q_sol = q.get("solution", "").strip()
 
                 if q_type and q_text and q_type.lower() in [t.lower() for t in question_types]:
-                    if not q_sol:
-                        q_sol = self.answer_interview_question(q_text)
                     cleaned_questions.append({"type": q_type, "question": q_text, "solution": q_sol})
 
             # Deduplicate
@@ -202,13 +261,15 @@ class InterviewAgent:
             {json.dumps([q.get('question','') for q in cleaned_questions])}
 
             Only include question types from this list: {', '.join(question_types)}.
-            Return ONLY valid JSON list in the same format (type, question, solution).
+            Return ONLY valid JSON list in this format: {QUESTIONS_FORMAT}
             {context}
             """
-                fill_raw = self.analyzer.llm_chat(messages=[{"role": "user", "content": fill_prompt}]).strip()
-                try:
-                    fill_parsed = json.loads(fill_raw)
-                except json.JSONDecodeError:
+                fill_raw = self.analyzer.llm_chat(
+                    messages=[{"role": "user", "content": fill_prompt}],
+                    max_tokens=self.analyzer._json_max_tokens(remaining, per_item=220),
+                ).strip()
+                fill_parsed = parse_json(fill_raw, [dict], fallback_calls=1)
+                if fill_parsed is None:
                     pattern = r'"type"\s*:\s*"([^"]+)"\s*,\s*"question"\s*:\s*"([^"]+)"(?:\s*,\s*"solution"\s*:\s*"([^"]+)")?'
                     matches = re.findall(pattern, fill_raw, re.DOTALL)
                     fill_parsed = [{"type": m[0], "question": m[1], "solution": (m[2] if len(m) > 2 else "")} for m in matches]
@@ -218,8 +279,6 @@ class InterviewAgent:
                     q_text = q.get("question", "").strip()
                     q_sol = q.get("solution", "").strip()
                     if q_type and q_text and q_type.lower() in [t.lower() for t in question_types]:
-                        if not q_sol:
-                            q_sol = self.answer_interview_question(q_text)
                         if q_text.lower() not in seen:
                             cleaned_questions.append({"type": q_type, "question": q_text, "solution": q_sol})
                             seen.add(q_text.lower())
@@ -264,13 +323,20 @@ class InterviewAgent:
                     template_fn = templates.get(q_type) or (lambda s: f"Tell me about your experience with {s}.")
                     q_text = template_fn(topic)
                     if q_text.lower() not in [q.get("question","" ).lower() for q in cleaned_questions]:
-                        q_sol = self.answer_interview_question(q_text)
-                        cleaned_questions.append({"type": q_type, "question": q_text, "solution": q_sol})
+                        cleaned_questions.append({"type": q_type, "question": q_text, "solution": ""})
                         remaining -= 1
                     idx += 1
 
             # Finally, trim to exact number requested
-            return cleaned_questions[:num_questions]
+            cleaned_questions = cleaned_questions[:num_questions]
+
+            # Answer questions that came back without a solution (and templated padding) concurrently
+            unanswered = [q for q in cleaned_questions if not q["solution"]]
+            answers = self.analyzer.fan_out(lambda q: self.answer_interview_question(q["question"]), unanswered,
+                                            on_error=lambda q, e: "")
+            for q, answer in zip(unanswered, answers):
+                q["solution"] = answer
+            return cleaned_questions
 
         except Exception as e:
             print(f"Error generating interview questions: {e}")
@@ -1,6 +1,7 @@
 """Job Search Agent - Job board integrations."""
 
 import os
+import re
 from utils.llm_providers import SESSION
 
 
@@ -40,7 +41,8 @@ class JobAgent:
                 "title": job.get("title"),
                 "company": (job.get("company") or {}).get("display_name"),
                 "location": (job.get("location") or {}).get("display_name"),
-                "link": job.get("redirect_url")
+                "link": job.get("redirect_url"),
+                "description": job.get("description") or ""
             })
         return jobs
 
@@ -70,7 +72,8 @@ class JobAgent:
                     "title": job.get("title") or job.get("profession") or job.get("position"),
                     "company": job.get("company") or job.get("companyName") or job.get("employer"),
                     "location": job.get("location") or job.get("city") or job.get("country") or "",
-                    "link": job.get("link") or job.get("url") or job.get("redirect_url")
+                    "link": job.get("link") or job.get("url") or job.get("redirect_url"),
+                    "description": re.sub(r"<[^>]+>|&nbsp;", " ", job.get("snippet") or job.get("description") or "")
                 })
             return jobs if jobs else [{"error": "No jobs found"}]
         except Exception as e:
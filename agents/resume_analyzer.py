@@ -3,14 +3,57 @@
 import os
 import re
 import json
-from langchain_community.vectorstores import FAISS
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
+import threading
+import numpy as np
 
-from utils.llm_providers import groq_chat
-from utils.text_utils import clamp_text, compute_hash
+from utils.llm_providers import groq_chat, groq_chat_stream_async
+from utils.llm import forget_cached, hedged_chat, hedged_chat_async
+from utils.embeddings import get_embeddings
+from utils.vector_store import VECTOR_STORE_CACHE, NumpyVectorStore
+from utils.vector_cache import VECTOR_CACHE_DIR, get_vector_cache
+from utils.text_utils import compute_hash, split_text
+from utils.prompt_budget import PromptBuilder, clamp_tokens, count_message_tokens, count_tokens, max_completion_tokens
+from utils.skill_matcher import SKILL_MATCHER
+from utils.skill_ontology import canonicalize, canonicalize_skills
+from utils.resume_digest import build_resume_digest, cached_resume_digest, digest_to_text, split_sections
+from utils.skill_evidence import SKILL_EVIDENCE_CACHE, evidence_key
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.fanout import fan_out
+from utils.structured_output import (JOB_SKILLS_FORMAT, SKILL_LIST_FORMAT, SKILL_SCORES_FORMAT, WEAKNESSES_FORMAT,
+                                     failed_generation, json_response_format, parse_json)
+from utils.rate_limit import get_limiter
 from utils.file_handlers import extract_text_from_pdf, extract_text_from_txt, extract_text_from_file
 
+# Analysis intensities: "full" (LLM scoring + weaknesses), "quick" (one LLM call), "local" (no LLM)
+INTENSITIES = ("full", "quick", "local")
+
+# Local scoring: cosine similarities in [floor, ceil] map linearly onto the semantic half of 0-10
+LOCAL_SIM_FLOOR = float(os.getenv("LOCAL_SIM_FLOOR", "0.55"))
+LOCAL_SIM_CEIL = float(os.getenv("LOCAL_SIM_CEIL", "0.85"))
+LOCAL_CHUNK_SIZE = int(os.getenv("LOCAL_CHUNK_SIZE", "300"))
+
+# Skill scoring: completion budget per shard and the answer tokens each skill needs besides its name
+SKILL_SHARD_MAX_TOKENS = int(os.getenv("SKILL_SHARD_MAX_TOKENS", "480"))
+SKILL_REASON_TOKENS = 30
+
+# match_many: job descriptions per batched skill-extraction call
+JD_SKILL_BATCH = int(os.getenv("JD_SKILL_BATCH", "5"))
+
+
+def calibrate_local_scores(similarity, hits):
+    """Blend best-chunk similarity and mention counts into 0-10 skill scores.
+
+    Works element-wise, so `similarity` and `hits` may be per-skill vectors or
+    resumes x skills matrices.
+    """
+    similarity = np.asarray(similarity, dtype=np.float32)
+    hits = np.asarray(hits, dtype=np.float32)
+    semantic = np.clip((similarity - LOCAL_SIM_FLOOR) / max(LOCAL_SIM_CEIL - LOCAL_SIM_FLOOR, 1e-6), 0.0, 1.0)
+    lexical = np.minimum(hits, 2) / 2
+    scores = np.rint(10 * (0.55 * semantic + 0.45 * lexical))
+    # A skill that is never named is at most partially evidenced
+    return np.where(hits == 0, np.minimum(scores, 5), scores).astype(int)
+
 
 class ResumeAnalyzer:
     """Handles resume analysis, skill extraction, and job description processing."""
@@ -34,18 +77,31 @@ class ResumeAnalyzer:
         self.resume_weaknesses = []
         self.resume_strengths = []
         self.improvement_suggestions = {}
+        self.resume_digest = None
+        self._digest_hash = None
+        self.jd_skills_partial = False
         
         # Caching settings
         self.user_id = user_id
-        self.vector_cache_dir = vector_cache_dir or os.getenv("VECTOR_CACHE_DIR") or ".cache/faiss"
+        self.vector_cache_dir = vector_cache_dir or VECTOR_CACHE_DIR
         
-        # Lazy embeddings cache
+        # Shared embedding model, resolved on first use
         self._embeddings = None
+        self._local_chunks = None  # (resume_hash, normalized chunk matrix) for local scoring
+        self._jd_skills_cache = {}  # jd hash -> LLM-extracted skills
+        self._skill_score_cache = {}  # (resume_hash, skill) -> (score, reasoning) from LLM scoring
+        self._sections = None  # (resume_hash, sections, {skill: supporting section hashes})
+        self.evidence_cache = SKILL_EVIDENCE_CACHE
+
+        # Token estimates: last call and running totals
+        self.last_prompt_stats = None
+        self.token_usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._usage_lock = threading.Lock()
 
     def _get_embeddings(self):
-        """Lazy load embeddings."""
+        """The process-wide embedding model (shared by all analyzers)."""
         if self._embeddings is None:
-            self._embeddings = FastEmbedEmbeddings()
+            self._embeddings = get_embeddings()
         return self._embeddings
 
     def _compute_resume_hash(self, text: str) -> str:
@@ -61,9 +117,110 @@ class ResumeAnalyzer:
             base = "no-jd"
         return compute_hash(base)
 
-    def llm_chat(self, messages: list, temperature: float = 0.2, max_tokens: int = 600) -> str:
-        """Groq-only chat helper."""
-        return groq_chat(self.api_key, messages=messages, model=self.model, temperature=temperature, max_tokens=max_tokens)
+    def get_resume_digest(self, resume_text: str | None = None) -> dict:
+        """Return the structured resume digest, building it once per resume hash."""
+        text = self.resume_text if resume_text is None else resume_text
+        if not text:
+            return {}
+        r_hash = self.resume_hash if (text is self.resume_text and self.resume_hash) else self._compute_resume_hash(text)
+        if self.resume_digest is not None and self._digest_hash == r_hash:
+            return self.resume_digest
+
+        digest = cached_resume_digest(r_hash, lambda: build_resume_digest(text, self.fast_extract_skills_from_jd(text)))
+        self.resume_digest, self._digest_hash = digest, r_hash
+        return digest
+
+    def resume_context(self, max_tokens: int | None = None, resume_text: str | None = None) -> str:
+        """Resume text for prompts: the digest (within `max_tokens` if given), or the raw text if the digest is too thin.
+
+        Prompts pass it to a `PromptBuilder` segment, which fits it to what
+        the model's window leaves after the reserved completion tokens.
+        """
+        text = self.resume_text if resume_text is None else resume_text
+        context = digest_to_text(self.get_resume_digest(text), max_tokens, self.model)
+        # Unstructured resumes (no bullets/sections) yield little; send the text itself
+        if len(context) < min(400, len(text or "") // 2):
+            return clamp_tokens(text, max_tokens, self.model) if max_tokens else text
+        return context
+
+    def _record_usage(self, messages: list, max_tokens: int, text: str | None) -> None:
+        """Store prompt/completion token estimates for the last call and add them to the totals."""
+        prompt_tokens = count_message_tokens(messages, self.model)
+        completion_tokens = count_tokens(text, self.model)
+        self.last_prompt_stats = {
+            "model": self.model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "max_tokens": max_tokens,
+        }
+        with self._usage_lock:  # fanned-out calls record from several threads
+            self.token_usage["calls"] += 1
+            self.token_usage["prompt_tokens"] += prompt_tokens
+            self.token_usage["completion_tokens"] += completion_tokens
+
+    def fan_out(self, fn, items, on_error=None, deadline: Deadline | None = None) -> list:
+        """Run independent per-item LLM calls concurrently, paced by this key/model's rate limiter."""
+        return fan_out(fn, items, on_error=on_error, limiter=get_limiter(self.api_key, self.model), deadline=deadline)
+
+    def _json_max_tokens(self, items: int, per_item: int, base: int = 64) -> int:
+        """Completion budget for a JSON answer with one entry per item."""
+        return min(base + per_item * max(1, items), max_completion_tokens(self.model))
+
+    def llm_chat(self, messages: list, temperature: float = 0.2, max_tokens: int = 600, cache: bool = True,
+                 deadline: Deadline | None = None, response_format: dict | None = None) -> str:
+        """Groq-only chat helper (`cache=False` forces a fresh sample).
+
+        Goes through `utils.llm.hedged_chat`: an unhealthy model is skipped and
+        a slow call is raced against a second model. Raises `DeadlineExceeded`
+        once `deadline` passes.
+        """
+        text = hedged_chat(self.api_key, messages=messages, model=self.model, temperature=temperature,
+                           max_tokens=max_tokens, cache=cache, deadline=deadline, response_format=response_format)
+        self._record_usage(messages, max_tokens, text)
+        return text
+
+    def llm_json(self, messages: list, schema, temperature: float = 0.2, max_tokens: int = 600,
+                 deadline: Deadline | None = None, fallback_calls: int = 0):
+        """Chat call whose answer is parsed (and repaired) as JSON matching `schema`.
+
+        Object answers use JSON mode when the model supports it. Returns None
+        if the answer cannot be parsed (and drops it from the response cache,
+        so a retry asks again); `fallback_calls` is the number of LLM calls
+        the caller's fallback would cost (counted as saved on repair).
+        """
+        response_format = json_response_format(self.model, dict if (schema is dict or isinstance(schema, dict)) else list)
+        try:
+            text = self.llm_chat(messages=messages, temperature=temperature, max_tokens=max_tokens,
+                                 deadline=deadline, response_format=response_format)
+        except Exception as e:
+            # JSON mode rejects invalid output outright; the rejected text is often repairable
+            text = failed_generation(e)
+            if text is None:
+                raise
+            return parse_json(text, schema, fallback_calls)
+        data = parse_json(text, schema, fallback_calls)
+        if data is None:
+            forget_cached(messages, self.model, temperature, max_tokens, response_format)
+        return data
+
+    async def llm_chat_async(self, messages: list, temperature: float = 0.2, max_tokens: int = 600, cache: bool = True,
+                             deadline: Deadline | None = None, response_format: dict | None = None) -> str:
+        """Async Groq-only chat helper (does not block the event loop)."""
+        text = await hedged_chat_async(self.api_key, messages=messages, model=self.model, temperature=temperature,
+                                       max_tokens=max_tokens, cache=cache, deadline=deadline,
+                                       response_format=response_format)
+        self._record_usage(messages, max_tokens, text)
+        return text
+
+    def llm_chat_stream(self, messages: list, temperature: float = 0.2, max_tokens: int = 600, cache: bool = True):
+        """Streaming chat helper yielding content deltas as they arrive."""
+        return groq_chat(self.api_key, messages=messages, model=self.model, temperature=temperature,
+                         max_tokens=max_tokens, cache=cache, stream=True)
+
+    def llm_chat_astream(self, messages: list, temperature: float = 0.2, max_tokens: int = 600, cache: bool = True):
+        """Async-iterator variant of `llm_chat_stream`."""
+        return groq_chat_stream_async(self.api_key, messages=messages, model=self.model, temperature=temperature,
+                                      max_tokens=max_tokens, cache=cache)
 
     def extract_text_from_pdf(self, pdf_file):
         """Extract text from PDF file."""
@@ -77,55 +234,52 @@ class ResumeAnalyzer:
         """Extract text from file (PDF or TXT)."""
         return extract_text_from_file(file)
 
-    def create_rag_vector_store(self, text):
-        """Create or load a cached FAISS vector store for RAG using FastEmbed."""
-        splitter = RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=100)
-        chunks = splitter.split_text(text)
-        embeddings = self._get_embeddings()
-        
-        # Determine cache path
-        r_hash = self.resume_hash or self._compute_resume_hash(text)
-        user_part = str(self.user_id or "anon")
-        cache_path = os.path.join(self.vector_cache_dir, user_part, r_hash, "rag")
-        
-        try:
-            if os.path.isdir(cache_path) and os.listdir(cache_path):
-                vs = FAISS.load_local(cache_path, embeddings, allow_dangerous_deserialization=True)
-                return vs
-        except Exception:
-            pass
-        
-        # Build fresh and cache
-        vectorstore = FAISS.from_texts(chunks, embeddings)
+    def _load_vector_store(self, cache_path: str, embeddings):
+        """Saved store at `cache_path`, or None if there is none (or it cannot be read)."""
         try:
-            os.makedirs(cache_path, exist_ok=True)
-            vectorstore.save_local(cache_path)
-        except Exception:
-            pass
-        return vectorstore
+            return NumpyVectorStore.load_local(cache_path, embeddings)
+        except Exception as e:
+            print(f"Ignoring unreadable vector store at {cache_path}: {e}")
+            return None
 
-    def create_vector_store(self, text):
-        """Create or load a cached single-shot FAISS store for whole-resume queries."""
-        embeddings = self._get_embeddings()
+    def _vector_store(self, text, kind: str, chunks: list):
+        """Resident, on-disk or freshly built store for this resume (`kind` names the chunking)."""
         r_hash = self.resume_hash or self._compute_resume_hash(text)
         user_part = str(self.user_id or "anon")
-        cache_path = os.path.join(self.vector_cache_dir, user_part, r_hash, "single")
-        
-        try:
-            if os.path.isdir(cache_path) and os.listdir(cache_path):
-                vs = FAISS.load_local(cache_path, embeddings, allow_dangerous_deserialization=True)
-                return vs
-        except Exception:
-            pass
+        key = (user_part, r_hash, kind)
+        disk = get_vector_cache(self.vector_cache_dir)
+        cache_path = os.path.join(self.vector_cache_dir, user_part, r_hash, kind)
+        vs = VECTOR_STORE_CACHE.get(key)
+        if vs is not None:
+            disk.touch(cache_path)
+            return vs
         
-        # Build and cache
-        vectorstore = FAISS.from_texts([text], embeddings)
-        try:
-            os.makedirs(cache_path, exist_ok=True)
-            vectorstore.save_local(cache_path)
-        except Exception:
-            pass
-        return vectorstore
+        embeddings = self._get_embeddings()
+        vs = self._load_vector_store(cache_path, embeddings)
+        if vs is not None:
+            disk.touch(cache_path)
+        else:
+            # One builder per entry across workers; the others wait and load its result
+            with disk.build_lock(cache_path):
+                vs = self._load_vector_store(cache_path, embeddings)
+                if vs is None:
+                    # Chunk vectors come from the embedding cache; only new chunks are embedded
+                    vs = NumpyVectorStore.from_texts(chunks, embeddings)
+                    try:
+                        vs.save_local(cache_path)
+                        disk.record(cache_path)
+                    except Exception as e:
+                        print(f"Could not save vector store to {cache_path}: {e}")
+        VECTOR_STORE_CACHE.put(key, vs)
+        return vs
+
+    def create_rag_vector_store(self, text):
+        """Create or load a cached chunk vector store for RAG."""
+        return self._vector_store(text, "rag", split_text(text, chunk_size=600, chunk_overlap=100))
+
+    def create_vector_store(self, text):
+        """Create or load a cached single-shot vector store for whole-resume queries."""
+        return self._vector_store(text, "single", [text])
 
     import re
 
@@ -155,117 +309,86 @@ class ResumeAnalyzer:
         return "\n".join(lines)
 
 
-    def extract_skills_from_jd(self, jd_text):
-        """Extract skills from job description using LLM."""
+    def _jd_skills_prompt(self, jd_text, max_tokens: int = 600):
+        """Build the skill-extraction prompt for a job description."""
+        return (
+            PromptBuilder(self.model, max_completion=max_tokens)
+            .add(
+                "Extract a comprehensive list of technical skills, technologies, and competencies required from this job description.\n"
+                f"Return ONLY {SKILL_LIST_FORMAT}.\n\n"
+                "Job Description:\n",
+                priority=100,
+            )
+            .add(jd_text, priority=50, name="jd")
+            .build()
+        ).prompt
+
+    def _parse_skill_list(self, skills_text):
+        """Split an LLM skill list into unique, ordered skill names."""
+        skills = [s.strip() for s in re.split(r',|\n|-|\*', skills_text.strip()) if s.strip()]
+        return canonicalize_skills(skills)
+
+    def extract_skills_from_jd(self, jd_text, deadline: Deadline | None = None):
+        """Extract skills from job description using LLM (heuristic extraction once the deadline passes)."""
         try:
-            jd_snippet = clamp_text(jd_text, 1500)
-            prompt = f"""
-            Extract a comprehensive list of technical skills, technologies, and competencies required from this job description.
-            Return ONLY a plain comma-separated list of skills.
-
-            Job Description:
-            {jd_snippet}
-            """
-            skills_text = self.llm_chat(messages=[{"role": "user", "content": prompt}]).strip()
-            skills = [s.strip() for s in re.split(r',|\n|-|\*', skills_text) if s.strip()]
-            return list(dict.fromkeys(skills))
+            prompt = self._jd_skills_prompt(jd_text)
+            skills_text = self.llm_chat(messages=[{"role": "user", "content": prompt}], deadline=deadline)
+            return self._parse_skill_list(skills_text)
+        except DeadlineExceeded:
+            self.jd_skills_partial = True
+            return self.fast_extract_skills_from_jd(jd_text)
+        except Exception as e:
+            print(f"Error extracting skills from job description: {e}")
+            return []
+
+    async def extract_skills_from_jd_async(self, jd_text):
+        """Async variant of `extract_skills_from_jd`."""
+        try:
+            prompt = self._jd_skills_prompt(jd_text)
+            skills_text = await self.llm_chat_async(messages=[{"role": "user", "content": prompt}])
+            return self._parse_skill_list(skills_text)
         except Exception as e:
             print(f"Error extracting skills from job description: {e}")
             return []
 
     def fast_extract_skills_from_jd(self, jd_text: str) -> list:
         """Heuristic skill extraction without LLM for quick mode."""
-        vocab = {
-            # Programming Languages
-            "python","java","javascript","typescript","c","c++","c#","go","golang","rust","kotlin","swift","ruby","php","scala","r","matlab","perl","dart","lua",
-            # Web/Frontend
-            "react","next.js","nextjs","angular","vue","svelte","html","css","html5","css3","sass","scss","less","tailwind","bootstrap","redux","graphql","webpack","vite","parcel","gulp","npm","yarn","pnpm",
-            # Backend/Frameworks
-            "node","node.js","express","django","flask","fastapi","spring","spring boot",".net","dotnet","asp.net","grpc","rest","restful","microservices","soap","laravel","rails","ruby on rails",
-            # Databases
-            "sql","mysql","postgresql","postgres","mongodb","redis","elasticsearch","cassandra","dynamodb","mariadb","oracle","sqlite","neo4j","couchdb","firestore",
-            # Message Queue/Streaming
-            "kafka","rabbitmq","redis","activemq","zeromq","nats","pulsar","kinesis",
-            # Big Data/Analytics
-            "spark","hadoop","hive","airflow","databricks","etl","data warehouse","snowflake","bigquery","redshift","presto","flink",
-            # Machine Learning/AI
-            "machine learning","deep learning","ml","dl","nlp","natural language processing","computer vision","cv","pandas","numpy","scikit-learn","sklearn","tensorflow","pytorch","keras","transformers","hugging face","bert","gpt","llm","generative ai","langchain","llama","rag",
-            # DevOps/Cloud
-            "docker","kubernetes","k8s","terraform","ansible","puppet","chef","jenkins","gitlab","github actions","ci/cd","cicd","git","github","gitlab","bitbucket","linux","unix","bash","shell","aws","azure","gcp","google cloud","cloud","heroku","vercel","netlify","cloudflare",
-            # AWS Services
-            "ec2","s3","lambda","rds","cloudformation","ecs","eks","sqs","sns","cloudwatch","iam","vpc","route53","api gateway",
-            # Azure Services  
-            "azure functions","azure sql","blob storage","cosmos db","aks","azure devops",
-            # GCP Services
-            "compute engine","cloud storage","cloud functions","cloud run","gke","pub/sub",
-            # Mobile
-            "android","ios","react native","flutter","swiftui","kotlin","swift","xamarin","ionic",
-            # Testing/QA
-            "pytest","unittest","selenium","cypress","playwright","junit","jest","mocha","jasmine","testng","postman","jmeter","loadrunner",
-            # Methodologies
-            "agile","scrum","kanban","waterfall","devops","tdd","test driven development","bdd","behavior driven development",
-            # Soft Skills
-            "leadership","communication","teamwork","problem solving","analytical","critical thinking","project management","time management",
-            # Tools
-            "jira","confluence","slack","trello","asana","figma","sketch","postman","insomnia","datadog","new relic","splunk","prometheus","grafana","tableau","power bi","excel","jupyter","vscode","intellij","eclipse","vim",
-            # Security
-            "oauth","jwt","ssl","tls","encryption","authentication","authorization","security","cybersecurity","penetration testing","owasp",
-            # Other Tech
-            "api","json","xml","yaml","websocket","graphql","grpc","protobuf","openapi","swagger","nginx","apache","tomcat","iis","elasticsearch","solr","memcached"
-        }
-        
-        text = jd_text.lower()
-        found = set()
-        for term in vocab:
-            if term in text:
-                found.add(term)
-        
-        # Capture capitalized acronyms
-        caps = set(re.findall(r"\b([A-Z]{2,5})\b", jd_text))
-        for c in caps:
-            if c.lower() not in found:
-                found.add(c.lower())
-        
-        # This part of the code is responsible for cleaning, formatting, and ordering the 
-        # extracted skills so they look professional and readable.
-        norm = []
-        for f in found:
-            if len(f) <= 5 and f.isupper():
-                norm.append(f)
-            elif " " in f:
-                norm.append(" ".join(w.capitalize() for w in f.split()))
-            elif f in {"sql","aws","gcp","nlp","cv","ci/cd","cicd"}:
-                norm.append(f.upper())
-            elif f in {"c#","c++"}:
-                norm.append(f.upper())
-            else:
-                norm.append(f.capitalize())
-        
-        # Keep original order of appearance
-        order = []
-        for m in re.finditer(r"[A-Za-z\+#\.]{2,}(?:\s[A-Za-z\+\.#]{2,})*", jd_text):
-            token = m.group(0).strip().lower()
-            for n in norm:
-                if n.lower() in token and n not in order:
-                    order.append(n)
-        return order or sorted(set(norm), key=lambda s: s.lower())
-
-    def analyze_skill(self, retriever, resume_text, skill):
+        # Single pass over the text; matches come back ordered by position
+        found, covered = {}, set()
+        for start, end, term in SKILL_MATCHER.finditer(jd_text or ""):
+            found.setdefault(term, start)
+            covered.update(range(start, end))
+
+        # Capture capitalized acronyms (not ones inside a match, e.g. "CI" in "CI/CD")
+        for m in re.finditer(r"\b([A-Z]{2,5})\b", jd_text or ""):
+            if m.start() not in covered and m.group(1).lower() not in found:
+                found.setdefault(m.group(1), m.start())
+
+        # Map every spelling ("node", "Node.js") to its canonical ontology name
+        ordered = sorted(found, key=found.get)
+        return canonicalize_skills(ordered, fuzzy=False)
+
+    def analyze_skill(self, retriever, resume_text, skill, deadline: Deadline | None = None):
         """Analyze a single skill."""
         try:
             docs = retriever.get_relevant_documents(skill)
         except Exception:
             docs = []
         
-        context = "\n\n".join([getattr(d, 'page_content', str(d)) for d in docs][:3]) or clamp_text(resume_text, 1200)
-        context = clamp_text(context, 1500)
+        context = "\n\n".join([getattr(d, 'page_content', str(d)) for d in docs][:3]) or self.resume_context(resume_text=resume_text)
         
         user = (
-            f"Context from resume (may be partial):\n{context}\n\n"
-            f"Task: On a scale of 0-10, how clearly does the candidate mention proficiency in '{skill}'? "
-            f"First output ONLY a number (0-10), then a short reasoning sentence."
-        )
-        text = self.llm_chat(messages=[{"role": "user", "content": user}])
+            PromptBuilder(self.model, max_completion=120)
+            .add(f"Context from resume (may be partial):\n", priority=100)
+            .add(context, priority=50, name="context")
+            .add(
+                f"\n\nTask: On a scale of 0-10, how clearly does the candidate mention proficiency in '{skill}'? "
+                f"First output ONLY a number (0-10), then a short reasoning sentence.",
+                priority=100,
+            )
+            .build()
+        ).prompt
+        text = self.llm_chat(messages=[{"role": "user", "content": user}], max_tokens=120, deadline=deadline)
         match = re.search(r"\b(\d{1,2})\b", text)
         score = int(match.group(1)) if match else 0
         reasoning = text
@@ -275,10 +398,134 @@ class ResumeAnalyzer:
                 reasoning = text[idx + len(match.group(1)):].strip(" -:;\n")
         return skill, min(score, 10), reasoning
 
-    def semantic_skill_analysis(self, resume_text, skills):
-        """Batch skill scoring in a single LLM call."""
-        vectorstore = self.create_vector_store(resume_text)
+    def heuristic_skill_score(self, resume_text, skill):
+        """LLM-free 0-10 estimate of how clearly a skill appears in the resume."""
+        text = resume_text or ""
+        pattern = r"(?<![\w+#.])" + re.escape(str(skill)) + r"(?![\w+#])"
+        hits = len(re.findall(pattern, text, flags=re.IGNORECASE))
+        digest_skills = {s.lower() for s in (self.get_resume_digest(text).get("skills") or [])}
+        score = 0 if hits == 0 else min(4 + hits, 8)
+        if str(skill).lower() in digest_skills:
+            score = min(score + 1, 9) if score else 5
+        return score, f"Heuristic estimate ({hits} mention(s)); LLM scoring did not finish in time."
+
+    def _skill_answer_tokens(self, skill) -> int:
+        """Answer tokens one skill needs: its name in both JSON maps plus a short reason."""
+        return 2 * count_tokens(str(skill), self.model) + SKILL_REASON_TOKENS
+
+    def _skill_shards(self, skills) -> list:
+        """Split skills into contiguous shards whose JSON answers fit `SKILL_SHARD_MAX_TOKENS`.
+
+        Shards are balanced, so a 33-skill list becomes a few similar calls
+        rather than one truncated answer.
+        """
+        costs = [self._skill_answer_tokens(s) for s in skills]
+        budget = max(SKILL_REASON_TOKENS, min(SKILL_SHARD_MAX_TOKENS, max_completion_tokens(self.model)) - 64)
+        n_shards = max(1, -(-sum(costs) // budget))
+        target = sum(costs) / n_shards
+        # Assign each skill by the midpoint of its cumulative cost: n contiguous, balanced shards
+        shards = [[] for _ in range(n_shards)]
+        used = 0
+        for skill, cost in zip(skills, costs):
+            shards[min(n_shards - 1, int((used + cost / 2) // target))].append(skill)
+            used += cost
+        return [shard for shard in shards if shard]
+
+    def _score_skill_shard(self, resume_ctx, shard, deadline: Deadline | None = None) -> dict:
+        """Score one shard in a single LLM call; returns {skill: (score, reasoning)}."""
+        max_tokens = min(64 + sum(self._skill_answer_tokens(s) for s in shard), max_completion_tokens(self.model))
+        prompt = (
+            PromptBuilder(self.model, max_completion=max_tokens)
+            .add(f"Rate each skill (0-10) based ONLY on this resume text. Return strict JSON: {SKILL_SCORES_FORMAT}.\n", priority=100)
+            .add("Resume:\n", priority=100)
+            .add(resume_ctx, priority=50, name="resume")
+            .add(f"\n\nSkills: {', '.join(shard)}\n", priority=90)
+            .build()
+        ).prompt
+        data = self.llm_json([{"role": "user", "content": prompt}], {"skill_scores": dict, "skill_reasoning?": dict},
+                             temperature=0.1, max_tokens=max_tokens, deadline=deadline, fallback_calls=len(shard))
+        ss = (data or {}).get("skill_scores") or {}
+        sr = (data or {}).get("skill_reasoning") or {}
+        if not ss:
+            raise ValueError("No skill_scores in response")
+        # Answers may change a skill's case; key them back to the requested spelling
+        requested = {str(sk).lower(): sk for sk in shard}
+        scored = {}
+        for k, v in ss.items():
+            try:
+                v_int = int(v)
+            except Exception:
+                m = re.search(r"\b(\d{1,2})\b", str(v))
+                v_int = int(m.group(1)) if m else 0
+            scored[requested.get(str(k).lower(), k)] = (max(0, min(10, v_int)), (sr.get(k) or "").strip())
+        return scored
+
+    def resume_sections(self, resume_text: str | None = None) -> list:
+        """Sections of the resume with content hashes, split once per resume hash."""
+        text = (self.resume_text if resume_text is None else resume_text) or ""
+        r_hash = self.resume_hash if (text is self.resume_text and self.resume_hash) else self._compute_resume_hash(text)
+        if self._sections and self._sections[0] == r_hash:
+            return self._sections[1]
+        sections = split_sections(text) or [{"heading": "", "text": text, "hash": r_hash}]
+        self._sections = (r_hash, sections, {})
+        return sections
+
+    def skill_evidence(self, resume_text, skills) -> dict:
+        """Hashes of the sections supporting each skill.
+
+        A skill is supported by the sections that mention it; a skill named
+        nowhere by the section most similar to it (or, without embeddings,
+        by the whole resume).
+        """
+        sections = self.resume_sections(resume_text)
+        known = self._sections[2]
+        todo = [sk for sk in dict.fromkeys(skills) if sk not in known]
+        if todo:
+            hits = np.stack([self.skill_mentions(sec["text"], todo) for sec in sections])
+            unmentioned = [j for j in range(len(todo)) if not hits[:, j].any()]
+            closest = {}
+            if unmentioned and len(sections) > 1:
+                try:
+                    vectors = np.asarray(self._get_embeddings().embed_documents([sec["text"] for sec in sections]), dtype=np.float32)
+                    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+                    similarity = self.embed_skills([todo[j] for j in unmentioned]) @ vectors.T
+                    closest = dict(zip(unmentioned, similarity.argmax(axis=1).tolist()))
+                except Exception as e:
+                    print(f"Section similarity unavailable, tying unmentioned skills to the whole resume: {e}")
+            for j, skill in enumerate(todo):
+                rows = np.flatnonzero(hits[:, j]).tolist() or ([closest[j]] if j in closest else range(len(sections)))
+                known[skill] = tuple(sections[i]["hash"] for i in rows)
+        return {sk: known[sk] for sk in skills}
+
+    def _reusable_results(self, resume_text, skills, kind: str) -> tuple:
+        """(evidence, stored): {skill: (key, section hashes)} and results kept for skills whose sections are unchanged."""
+        try:
+            scope = str(self.user_id or "")
+            evidence = {sk: (evidence_key(scope, self.model, kind, sk, hashes), hashes)
+                        for sk, hashes in self.skill_evidence(resume_text, skills).items()}
+        except Exception as e:
+            print(f"Section evidence unavailable, analyzing every skill: {e}")
+            return {}, {}
+        stored = self.evidence_cache.get_many(key for key, _ in evidence.values())
+        return evidence, {sk: stored[key] for sk, (key, _) in evidence.items() if key in stored}
+
+    def _remember_results(self, evidence, kind: str, results: dict) -> None:
+        """Store {skill: result} under each skill's current evidence key."""
+        self.evidence_cache.put_many(kind, {evidence[sk][0]: (value, evidence[sk][1])
+                                            for sk, value in results.items() if sk in evidence})
+
+    def semantic_skill_analysis(self, resume_text, skills, deadline: Deadline | None = None):
+        """Batch skill scoring, sharded so each LLM answer fits its token budget.
+
+        Shards run concurrently and their JSON is merged. Skills a shard did
+        not score fall back to per-skill analysis. If `deadline` passes,
+        skills not yet scored get heuristic scores and the result is flagged
+        ``partial``. Skills whose supporting resume sections are unchanged
+        since an earlier revision reuse their stored scores (listed in
+        ``reused_skills``) and are not sent to the LLM.
+        """
         skill_scores, skill_reasoning, missing_skills, total_score = {}, {}, [], 0
+        partial = False
         
         if not skills:
             return {
@@ -292,55 +539,78 @@ class ResumeAnalyzer:
                 "improvement_areas": []
             }
         
-        # Use larger resume snippet for better skill detection (increased from 900 to 2000)
-        resume_snippet = clamp_text(resume_text, 2000)
-        skills_list = ", ".join(skills)
-        prompt = (
-            "Rate each skill (0-10) based ONLY on this resume text. Return strict JSON: {\"skill_scores\":{skill:score}, \"skill_reasoning\":{skill:short_reason}}.\n"
-            f"Resume:\n{resume_snippet}\n\nSkills: {skills_list}\n"
-        )
-        
-        parsed_ok = False
-        try:
-            resp = self.llm_chat(messages=[{"role": "user", "content": prompt}], temperature=0.1)
-            data = json.loads(resp)
-            ss = data.get("skill_scores", {})
-            sr = data.get("skill_reasoning", {})
-            
-            if isinstance(ss, dict) and ss:
-                for k, v in ss.items():
+        # Skills whose supporting sections are unchanged since an earlier revision keep their scores
+        evidence, stored = self._reusable_results(resume_text, skills, "score")
+        scored = {sk: (int(value["score"]), value.get("reasoning") or "") for sk, value in stored.items()}
+        todo = [sk for sk in skills if sk not in scored]
+        estimated = set()
+
+        if todo:
+            # Size shards from the expected answer length so the JSON is never cut off
+            resume_ctx = self.resume_context(resume_text=resume_text)
+            shards = self._skill_shards(todo)
+            timed_out = []
+
+            def shard_failed(shard, exc):
+                if isinstance(exc, DeadlineExceeded):
+                    timed_out.append(shard)
+                return {}
+
+            fresh = {}
+            for result in self.fan_out(lambda shard: self._score_skill_shard(resume_ctx, shard, deadline), shards,
+                                       on_error=shard_failed, deadline=deadline):
+                fresh.update(result)
+            partial = bool(timed_out)
+            leftover = [sk for sk in todo if sk not in fresh]
+
+            if leftover:
+                # Fallback to per-skill analysis, fanned out concurrently (heuristic scores for
+                # skills whose call fails or starts after the deadline)
+                late = []
+
+                def heuristic(skill, exc):
+                    if isinstance(exc, DeadlineExceeded):
+                        late.append(skill)
+                    estimated.add(skill)
+                    score, reasoning = self.heuristic_skill_score(resume_text, skill)
+                    return skill, score, reasoning
+
+                if partial:
+                    results = [heuristic(sk, DeadlineExceeded()) for sk in leftover]
+                else:
                     try:
-                        v_int = int(v)
-                    except Exception:
-                        m = re.search(r"\b(\d{1,2})\b", str(v))
-                        v_int = int(m.group(1)) if m else 0
-                    v_int = max(0, min(10, v_int))
-                    skill_scores[k] = v_int
-                    total_score += v_int
-                    if v_int <= 5:
-                        missing_skills.append(k)
-                    skill_reasoning[k] = (sr.get(k) or "").strip()
-                parsed_ok = True
-        except Exception:
-            parsed_ok = False
-        
-        if not parsed_ok:
-            # Fallback to per-skill analysis
-            retriever = vectorstore.as_retriever()
-            for s in skills:
-                skill, score, reasoning = self.analyze_skill(retriever, resume_text, s)
-                skill_scores[skill] = score
-                skill_reasoning[skill] = reasoning
-                total_score += score
-                if score <= 5:
-                    missing_skills.append(skill)
+                        retriever = self.create_vector_store(resume_text).as_retriever()
+                    except DeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        print(f"Vector store unavailable, scoring skills without retrieval: {e}")
+                        retriever = None
+                    results = self.fan_out(lambda sk: self.analyze_skill(retriever, resume_text, sk, deadline=deadline),
+                                           leftover, on_error=heuristic, deadline=deadline)
+                partial = partial or bool(late)
+                for skill, score, reasoning in results:
+                    fresh[skill] = (score, reasoning)
+
+            # Heuristic stand-ins are not worth keeping
+            self._remember_results(evidence, "score", {sk: {"score": fresh[sk][0], "reasoning": fresh[sk][1]}
+                                                       for sk in todo if sk in fresh and sk not in estimated})
+            scored.update({sk: fresh[sk] for sk in todo if sk in fresh})
+
+        # Only requested skills count (in request order); stray keys would skew the average
+        for skill in skills:
+            score, reasoning = scored.get(skill, (0, ""))
+            skill_scores[skill] = score
+            skill_reasoning[skill] = reasoning
+            total_score += score
+            if score <= 5:
+                missing_skills.append(skill)
         
         overall_score = int((total_score / (10 * len(skills))) * 100) if skills else 0
         selected = overall_score >= self.cutoff_score
         strengths = [skill for skill, score in skill_scores.items() if score >= 7]
         self.resume_strengths = strengths
         
-        return {
+        result = {
             "overall_score": overall_score,
             "skill_scores": skill_scores,
             "skill_reasoning": skill_reasoning,
@@ -350,9 +620,229 @@ class ResumeAnalyzer:
             "strengths": strengths,
             "improvement_areas": missing_skills if not selected else []
         }
+        if stored:
+            result["reused_skills"] = [sk for sk in skills if sk in stored]
+        if partial:
+            result["partial"] = True
+            result["reasoning"] = "Partial analysis: some skills scored heuristically because the time budget ran out."
+        return result
+
+    def _local_chunk_matrix(self, resume_text):
+        """Normalized embeddings of the resume's chunks, cached per resume hash."""
+        r_hash = self.resume_hash if (resume_text is self.resume_text and self.resume_hash) else self._compute_resume_hash(resume_text)
+        if self._local_chunks and self._local_chunks[0] == r_hash:
+            return self._local_chunks[1]
+        chunks = split_text(resume_text, chunk_size=LOCAL_CHUNK_SIZE, chunk_overlap=50) or [resume_text]
+        matrix = np.asarray(self._get_embeddings().embed_documents(chunks), dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+        self._local_chunks = (r_hash, matrix)
+        return matrix
+
+    def skill_mentions(self, resume_text, skills):
+        """How often each skill is named in the resume (vocabulary matches under canonical names)."""
+        resume_text = resume_text or ""
+        mentions = {}
+        for _, _, term in SKILL_MATCHER.finditer(resume_text):
+            name = canonicalize(term, fuzzy=False)
+            mentions[name] = mentions.get(name, 0) + 1
+        return np.array([
+            mentions.get(s) or len(re.findall(r"(?<![\w+#.])" + re.escape(str(s)) + r"(?![\w+#])", resume_text, flags=re.IGNORECASE))
+            for s in skills
+        ], dtype=np.float32)
+
+    def embed_skills(self, skills):
+        """Normalized embeddings of the skill names (one row per skill)."""
+        vectors = np.asarray(self._get_embeddings().embed_documents([str(s) for s in skills]), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        return vectors
+
+    def local_result(self, skills, scores, similarity, hits):
+        """Analysis dict (same shape as the LLM path) from local per-skill scores."""
+        skill_scores, skill_reasoning, missing_skills = {}, {}, []
+        for skill, score, sim, n in zip(skills, np.asarray(scores).tolist(), np.asarray(similarity).tolist(), np.asarray(hits).tolist()):
+            skill_scores[skill] = int(score)
+            skill_reasoning[skill] = f"Local estimate: closest resume section similarity {sim:.2f}, {int(n)} mention(s)."
+            if score <= 5:
+                missing_skills.append(skill)
+
+        overall_score = int((sum(skill_scores.values()) / (10 * len(skills))) * 100) if skills else 0
+        selected = overall_score >= self.cutoff_score
+        strengths = [skill for skill, score in skill_scores.items() if score >= 7]
+        return {
+            "overall_score": overall_score,
+            "skill_scores": skill_scores,
+            "skill_reasoning": skill_reasoning,
+            "selected": selected,
+            "reasoning": "Local embedding analysis (no LLM).",
+            "missing_skills": missing_skills,
+            "strengths": strengths,
+            "improvement_areas": missing_skills if not selected else []
+        }
+
+    def local_skill_analysis(self, resume_text, skills):
+        """LLM-free skill scoring from embeddings and lexical hits.
+
+        Each skill scores the max cosine similarity between its embedding and
+        the resume chunk embeddings (one matrix product for all skills),
+        blended with how often the skill is mentioned, on the 0-10 scale.
+        """
+        resume_text = resume_text or ""
+        if not skills:
+            return self.semantic_skill_analysis(resume_text, skills)
+
+        hits = self.skill_mentions(resume_text, skills)
+        try:
+            chunks = self._local_chunk_matrix(resume_text)
+            similarity = (self.embed_skills(skills) @ chunks.T).max(axis=1)
+        except Exception as e:
+            print(f"Local embedding scoring unavailable, using lexical hits only: {e}")
+            similarity = np.zeros(len(skills), dtype=np.float32)
+
+        result = self.local_result(skills, calibrate_local_scores(similarity, hits), similarity, hits)
+        self.resume_strengths = result["strengths"]
+        return result
+
+    def _jd_skills_batch(self, jds, deadline: Deadline | None = None) -> list:
+        """Extract skills for several job descriptions in one LLM call (one list per JD)."""
+        max_tokens = self._json_max_tokens(len(jds), 120)
+        builder = PromptBuilder(self.model, max_completion=max_tokens).add(
+            "Extract the technical skills, technologies, and competencies required by each job description below. "
+            f"Return strict JSON with one key per job number: {JOB_SKILLS_FORMAT}.\n", priority=100)
+        for n, jd in enumerate(jds, 1):
+            builder.add(f"\nJob {n}:\n", priority=90)
+            builder.add(jd, priority=50, name=f"jd{n}")
+        data = self.llm_json([{"role": "user", "content": builder.build().prompt}], dict,
+                             temperature=0.1, max_tokens=max_tokens, deadline=deadline, fallback_calls=len(jds)) or {}
+        lists = []
+        for n in range(1, len(jds) + 1):
+            value = data.get(str(n)) or data.get(f"Job {n}") or []
+            lists.append(self._parse_skill_list(", ".join(map(str, value)) if isinstance(value, list) else str(value)))
+        return lists
 
-    def analyze_resume(self, resume_file, role_requirements=None, custom_jd=None, quick: bool = False):
-        """Analyze resume from file."""
+    def extract_skills_many(self, jds, use_llm: bool = True, deadline: Deadline | None = None) -> list:
+        """Skills for each job description, extracting uncached ones in batched LLM calls.
+
+        JDs a batch leaves empty (or all of them with `use_llm=False`) use
+        the heuristic extractor.
+        """
+        jds = [self.clean_job_description(jd or "") for jd in jds]
+        if not use_llm:
+            return [self.fast_extract_skills_from_jd(jd) for jd in jds]
+        hashes = [compute_hash(jd) for jd in jds]
+        pending = list(dict.fromkeys(h for h, jd in zip(hashes, jds) if jd and h not in self._jd_skills_cache))
+        if pending:
+            text_by_hash = dict(zip(hashes, jds))
+            batches = [pending[i:i + JD_SKILL_BATCH] for i in range(0, len(pending), JD_SKILL_BATCH)]
+            results = self.fan_out(lambda batch: self._jd_skills_batch([text_by_hash[h] for h in batch], deadline),
+                                   batches, on_error=lambda batch, e: [[] for _ in batch], deadline=deadline)
+            for batch, lists in zip(batches, results):
+                for h, skills in zip(batch, lists):
+                    if skills:
+                        self._jd_skills_cache[h] = skills
+        return [self._jd_skills_cache.get(h) or self.fast_extract_skills_from_jd(jd) for h, jd in zip(hashes, jds)]
+
+    def _llm_skill_scores(self, resume_text, skills, deadline: Deadline | None = None) -> dict:
+        """{skill: (score, reasoning)} from LLM scoring, reusing scores cached for this resume."""
+        r_hash = self.resume_hash if (resume_text is self.resume_text and self.resume_hash) else self._compute_resume_hash(resume_text)
+        todo = [sk for sk in skills if (r_hash, sk) not in self._skill_score_cache]
+        fresh = {}
+        if todo:
+            strengths = self.resume_strengths  # semantic_skill_analysis overwrites them
+            result = self.semantic_skill_analysis(resume_text, todo, deadline)
+            self.resume_strengths = strengths
+            fresh = {sk: (result["skill_scores"][sk], result["skill_reasoning"][sk]) for sk in todo}
+            # Heuristic stand-ins from a partial result are not worth keeping
+            if not result.get("partial"):
+                self._skill_score_cache.update({(r_hash, sk): value for sk, value in fresh.items()})
+        return {sk: fresh[sk] if sk in fresh else self._skill_score_cache[(r_hash, sk)] for sk in skills}
+
+    def match_many(self, jds, resume_text: str | None = None, intensity: str = "quick",
+                   deadline: Deadline | float | None = None) -> list:
+        """Rank job descriptions by how well the resume fits each.
+
+        The resume is processed once: skills from all JDs are merged and each
+        distinct skill is scored a single time, then every JD's score is the
+        average over its own skills. `intensity` follows `analyze_resume`:
+        "local" uses no LLM, "quick" extracts JD skills heuristically and
+        LLM-scores skills, "full" also extracts JD skills with the LLM.
+
+        Args:
+            jds: Job description strings, or job dicts with a "description"
+            resume_text: Defaults to the analyzed resume
+
+        Returns:
+            One dict per JD (index, job, overall_score, selected, skill_scores,
+            missing_skills, strengths), best match first
+        """
+        deadline = Deadline.coerce(deadline)
+        intensity = intensity if intensity in INTENSITIES else "quick"
+        resume_text = self.resume_text if resume_text is None else resume_text
+        jobs = list(jds or [])
+        if not jobs or not resume_text:
+            return []
+        texts = [(j.get("description") or j.get("snippet") or j.get("title") or "") if isinstance(j, dict) else str(j or "")
+                 for j in jobs]
+        skill_lists = self.extract_skills_many(texts, use_llm=intensity == "full", deadline=deadline)
+        union = list(dict.fromkeys(sk for skills in skill_lists for sk in skills))
+
+        if not union:
+            scores = {}
+        elif intensity == "local":
+            hits = self.skill_mentions(resume_text, union)
+            try:
+                similarity = (self.embed_skills(union) @ self._local_chunk_matrix(resume_text).T).max(axis=1)
+            except Exception as e:
+                print(f"Local embedding scoring unavailable, using lexical hits only: {e}")
+                similarity = np.zeros(len(union), dtype=np.float32)
+            scores = dict(zip(union, calibrate_local_scores(similarity, hits).tolist()))
+        else:
+            scores = {sk: score for sk, (score, _) in self._llm_skill_scores(resume_text, union, deadline).items()}
+
+        ranked = []
+        for index, (job, skills) in enumerate(zip(jobs, skill_lists)):
+            skill_scores = {sk: int(scores.get(sk, 0)) for sk in skills}
+            overall_score = int((sum(skill_scores.values()) / (10 * len(skills))) * 100) if skills else 0
+            ranked.append({
+                "index": index,
+                "job": job,
+                "overall_score": overall_score,
+                "selected": overall_score >= self.cutoff_score,
+                "skill_scores": skill_scores,
+                "missing_skills": [sk for sk, score in skill_scores.items() if score <= 5],
+                "strengths": [sk for sk, score in skill_scores.items() if score >= 7],
+            })
+        ranked.sort(key=lambda r: (-r["overall_score"], r["index"]))
+        return ranked
+
+    def _mark_partial(self):
+        """Flag `analysis_result` as partial and list what is still pending."""
+        pending = []
+        if self.jd_skills_partial:
+            pending.append("jd_skills")
+        if self.analysis_result.get("partial"):
+            pending.append("skill_scores")
+        if any(w.get("pending") for w in (self.resume_weaknesses or [])):
+            pending.append("weaknesses")
+        if pending:
+            self.analysis_result["partial"] = True
+            self.analysis_result["pending"] = pending
+        return bool(pending)
+
+    def analyze_resume(self, resume_file, role_requirements=None, custom_jd=None, quick: bool = False,
+                       deadline: Deadline | float | None = None, intensity: str | None = None):
+        """Analyze resume from file.
+
+        `intensity` is one of `INTENSITIES` ("quick" when `quick` is set and no
+        intensity is given); "local" makes no LLM calls at all.
+
+        `deadline` (a `Deadline` or seconds) bounds the whole pipeline; when it
+        passes, the best partial result is returned (heuristic scores, pending
+        weaknesses) and is not cached.
+        """
+        deadline = Deadline.coerce(deadline)
+        intensity = intensity if intensity in INTENSITIES else ('quick' if quick else 'full')
+        quick = intensity != 'full'
+        self.jd_skills_partial = False
         self.resume_text = self.extract_text_from_file(resume_file)
         self.resume_hash = self._compute_resume_hash(self.resume_text)
         
@@ -366,15 +856,15 @@ class ResumeAnalyzer:
         if custom_jd:
             raw_jd_text = self.extract_text_from_file(custom_jd) if hasattr(custom_jd, 'read') else str(custom_jd)
             self.jd_text = self.clean_job_description(raw_jd_text)
-            jd_skills = self.fast_extract_skills_from_jd(self.jd_text) if quick else self.extract_skills_from_jd(self.jd_text)
+            jd_skills = self.fast_extract_skills_from_jd(self.jd_text) if quick else self.extract_skills_from_jd(self.jd_text, deadline)
         else:
-            jd_skills = role_requirements or []
+            jd_skills = canonicalize_skills(role_requirements or [])
         
         if not jd_skills:
             jd_skills = ["teamwork"]
         
         # In quick mode, limit to 10 skills instead of 5 for better coverage
-        if quick and len(jd_skills) > 10:
+        if intensity == 'quick' and len(jd_skills) > 10:
             jd_skills = jd_skills[:10]
         
         self.extracted_skills = jd_skills
@@ -384,39 +874,48 @@ class ResumeAnalyzer:
             jd_hash = self._compute_jd_hash(self.jd_text, jd_skills)
             prov = getattr(self, 'provider', '')
             mdl = getattr(self, 'model', '')
-            intensity = 'quick' if quick else 'full'
             cached = get_cached_analysis(self.user_id, self.resume_hash, jd_hash, prov, mdl, intensity)
             if cached:
                 self.analysis_result = cached
                 self.resume_weaknesses = cached.get("detailed_weaknesses", [])
                 return self.analysis_result
         
-        self.analysis_result = self.semantic_skill_analysis(self.resume_text, jd_skills)
+        if intensity == 'local':
+            self.analysis_result = self.local_skill_analysis(self.resume_text, jd_skills)
+        else:
+            self.analysis_result = self.semantic_skill_analysis(self.resume_text, jd_skills, deadline)
         
         if not quick:
-            self.analyze_resume_weaknesses()
+            self.analyze_resume_weaknesses(deadline)
         
         self.analysis_result["detailed_weaknesses"] = getattr(self, "resume_weaknesses", [])
+        partial = self._mark_partial()
         
-        if quick:
+        if intensity == 'local':
+            self.analysis_result["note"] = "Local preview (no LLM). Run a quick or full analysis for detailed scoring."
+        elif quick:
             self.analysis_result["note"] = "Quick analysis completed. Click Analyze to run full detailed analysis."
         
         # Save cache
         try:
             from database import save_cached_analysis
-            if self.user_id and self.resume_hash:
+            if self.user_id and self.resume_hash and not partial:
                 jd_hash = self._compute_jd_hash(self.jd_text, jd_skills)
                 prov = getattr(self, 'provider', '')
                 mdl = getattr(self, 'model', '')
-                intensity = 'quick' if quick else 'full'
                 save_cached_analysis(self.user_id, self.resume_hash, jd_hash, prov, mdl, intensity, self.analysis_result)
         except Exception:
             pass
         
         return self.analysis_result
 
-    def analyze_resume_text(self, resume_text: str, role_requirements=None, custom_jd=None, quick: bool = False):
-        """Analyze resume from text string."""
+    def analyze_resume_text(self, resume_text: str, role_requirements=None, custom_jd=None, quick: bool = False,
+                            deadline: Deadline | float | None = None, intensity: str | None = None):
+        """Analyze resume from text string (see `analyze_resume` for `intensity` and `deadline`)."""
+        deadline = Deadline.coerce(deadline)
+        intensity = intensity if intensity in INTENSITIES else ('quick' if quick else 'full')
+        quick = intensity != 'full'
+        self.jd_skills_partial = False
         self.resume_text = resume_text or ""
         self.resume_hash = self._compute_resume_hash(self.resume_text)
         try:
@@ -428,15 +927,15 @@ class ResumeAnalyzer:
         # Process JD/skills
         if custom_jd:
             self.jd_text = self.clean_job_description(custom_jd)
-            jd_skills = self.fast_extract_skills_from_jd(self.jd_text) if quick else self.extract_skills_from_jd(self.jd_text)
+            jd_skills = self.fast_extract_skills_from_jd(self.jd_text) if quick else self.extract_skills_from_jd(self.jd_text, deadline)
         else:
-            jd_skills = role_requirements or []
+            jd_skills = canonicalize_skills(role_requirements or [])
         
         if not jd_skills:
             jd_skills = ["teamwork"]
         
         # In quick mode, limit to 10 skills instead of 5 for better coverage
-        if quick and len(jd_skills) > 10:
+        if intensity == 'quick' and len(jd_skills) > 10:
             jd_skills = jd_skills[:10]
         
         self.extracted_skills = jd_skills
@@ -447,38 +946,51 @@ class ResumeAnalyzer:
             jd_hash = self._compute_jd_hash(self.jd_text, jd_skills)
             prov = getattr(self, 'provider', '')
             mdl = getattr(self, 'model', '')
-            intensity = 'quick' if quick else 'full'
             cached = get_cached_analysis(self.user_id, self.resume_hash, jd_hash, prov, mdl, intensity)
             if cached:
                 self.analysis_result = cached
                 self.resume_weaknesses = cached.get("detailed_weaknesses", [])
                 return self.analysis_result
         
-        self.analysis_result = self.semantic_skill_analysis(self.resume_text, jd_skills)
+        if intensity == 'local':
+            self.analysis_result = self.local_skill_analysis(self.resume_text, jd_skills)
+        else:
+            self.analysis_result = self.semantic_skill_analysis(self.resume_text, jd_skills, deadline)
         
         if not quick:
-            self.analyze_resume_weaknesses()
+            self.analyze_resume_weaknesses(deadline)
         
         self.analysis_result["detailed_weaknesses"] = getattr(self, "resume_weaknesses", [])
+        partial = self._mark_partial()
         
-        if quick:
+        if intensity == 'local':
+            self.analysis_result["note"] = "Local preview (no LLM). Run a quick or full analysis for detailed scoring."
+        elif quick:
             self.analysis_result["note"] = "Quick analysis completed. Click Analyze to run full detailed analysis."
         
         # Save cache
         try:
-            if save_cached_analysis and self.user_id and self.resume_hash:
+            if save_cached_analysis and self.user_id and self.resume_hash and not partial:
                 jd_hash = self._compute_jd_hash(self.jd_text, jd_skills)
                 prov = getattr(self, 'provider', '')
                 mdl = getattr(self, 'model', '')
-                intensity = 'quick' if quick else 'full'
                 save_cached_analysis(self.user_id, self.resume_hash, jd_hash, prov, mdl, intensity, self.analysis_result)
         except Exception:
             pass
         
         return self.analysis_result
 
-    def analyze_resume_weaknesses(self):
-        """Analyze weaknesses in resume."""
+    def _pending_weaknesses(self, skills):
+        """Placeholder weaknesses for skills whose analysis did not finish in time."""
+        return [{"skill": sk, "detail": "Pending: detailed analysis did not finish within the time budget.",
+                 "suggestions": [], "example": "", "pending": True} for sk in skills]
+
+    def analyze_resume_weaknesses(self, deadline: Deadline | None = None):
+        """Analyze weaknesses in resume (marked pending if `deadline` passes first).
+
+        Skills whose supporting sections are unchanged since an earlier
+        revision reuse their stored weakness entries.
+        """
         weaknesses = []
         
         if not self.resume_text or not self.extracted_skills or not self.analysis_result:
@@ -489,39 +1001,75 @@ class ResumeAnalyzer:
             self.resume_weaknesses = []
             return []
         
-        try:
-            # Increased from 900 to 1500 characters for better context
-            resume_snip = clamp_text(self.resume_text, 1500)
-            skills_csv = ", ".join(missing)
-            prompt = (
-                "For each of these skills, analyze why the resume appears weak or missing, and provide 2-3 actionable suggestions and one example bullet. "
-                "Return STRICT JSON of the form {skill:{detail:str, suggestions:[str], example:str}} with only these keys.\n\n"
-                f"Resume (excerpt):\n{resume_snip}\n\nSkills: {skills_csv}\n"
-            )
-            resp = self.llm_chat(messages=[{"role": "user", "content": prompt}], temperature=0.2)
-            data = {}
+        evidence, stored = self._reusable_results(self.resume_text, missing, "weakness")
+        todo = [sk for sk in missing if sk not in stored]
+        answered = {}  # weakness entries the model actually returned (the only ones worth storing)
+        
+        if todo and deadline is not None and deadline.expired():
+            weaknesses = self._pending_weaknesses(todo)
+        elif todo:
             try:
-                data = json.loads(resp)
+                skills_csv = ", ".join(todo)
+                max_tokens = self._json_max_tokens(len(todo), per_item=160)
+                prompt = (
+                    PromptBuilder(self.model, max_completion=max_tokens)
+                    .add(
+                        "For each of these skills, analyze why the resume appears weak or missing, and provide 2-3 actionable suggestions and one example bullet. "
+                        f"Return STRICT JSON of the form {WEAKNESSES_FORMAT} with only these keys.\n\n"
+                        "Resume (excerpt):\n",
+                        priority=100,
+                    )
+                    .add(self.resume_context(), priority=50, name="resume")
+                    .add(f"\n\nSkills: {skills_csv}\n", priority=90)
+                    .build()
+                ).prompt
+                data = self.llm_json([{"role": "user", "content": prompt}], dict, temperature=0.2, max_tokens=max_tokens,
+                                     deadline=deadline, fallback_calls=len(todo)) or {}
+                # Answers may change a skill's case; key them back to the requested spelling
+                by_name = {str(k).lower(): v for k, v in data.items()}
+                
+                for sk in todo:
+                    entry = by_name.get(str(sk).lower()) or {}
+                    if not isinstance(entry, dict):
+                        entry = {"detail": str(entry)}
+                    weaknesses.append({
+                        "skill": sk,
+                        "detail": (entry.get("detail") or "Not clearly demonstrated."),
+                        "suggestions": (entry.get("suggestions") or [])[:3],
+                        "example": (entry.get("example") or ""),
+                    })
+                    if entry.get("detail"):
+                        answered[sk] = weaknesses[-1]
+            except DeadlineExceeded:
+                weaknesses = self._pending_weaknesses(todo)
             except Exception:
-                data = {}
+                # Fallback to per-skill analysis, fanned out concurrently
+                answered.clear()
+                resume_snip = self.resume_context()
+
+                def weakness(skill):
+                    prompt = (
+                        PromptBuilder(self.model)
+                        .add(f"Briefly state why '{skill}' seems weak in this resume and give 2 short fixes. Resume: ", priority=100)
+                        .add(resume_snip, priority=50, name="resume")
+                        .build()
+                    ).prompt
+                    response = self.llm_chat(messages=[{"role": "user", "content": prompt}], temperature=0.2, deadline=deadline)
+                    answered[skill] = {"skill": skill, "detail": response[:200]}
+                    return answered[skill]
+
+                def failed(skill, exc):
+                    if isinstance(exc, DeadlineExceeded):
+                        return self._pending_weaknesses([skill])[0]
+                    return {"skill": skill, "detail": "Error generating weakness"}
+
+                weaknesses = self.fan_out(weakness, todo, on_error=failed, deadline=deadline)
             
-            for sk in missing:
-                entry = data.get(sk) or {}
-                weaknesses.append({
-                    "skill": sk,
-                    "detail": (entry.get("detail") or "Not clearly demonstrated."),
-                    "suggestions": (entry.get("suggestions") or [])[:3],
-                    "example": (entry.get("example") or ""),
-                })
-        except Exception:
-            # Fallback to per-skill analysis
-            for skill in missing:
-                try:
-                    prompt = f"Briefly state why '{skill}' seems weak in this resume and give 2 short fixes. Resume: {resume_snip}"
-                    response = self.llm_chat(messages=[{"role": "user", "content": prompt}], temperature=0.2)
-                    weaknesses.append({"skill": skill, "detail": response[:200]})
-                except Exception:
-                    weaknesses.append({"skill": skill, "detail": "Error generating weakness"})
+            # Placeholders for skills the model skipped, errors and pending entries are not stored
+            self._remember_results(evidence, "weakness", answered)
         
+        # Back in the order of the missing skills
+        fresh = {w["skill"]: w for w in weaknesses}
+        weaknesses = [fresh.get(sk) or dict(stored[sk], skill=sk) for sk in missing]
         self.resume_weaknesses = weaknesses
         return weaknesses
@@ -2,9 +2,18 @@
 
 import os
 import re
-import json
+import asyncio
 import tempfile
-from utils.text_utils import clamp_text
+from utils.prompt_budget import (PromptBuilder, SAFETY_MARGIN, context_window, count_message_tokens, count_tokens,
+                                 max_completion_tokens)
+from utils.structured_output import parse_json
+
+# Completion tokens reserved for the improvement suggestions JSON and the full resume rewrite
+SUGGESTIONS_MAX_TOKENS = 2000
+IMPROVED_RESUME_MAX_TOKENS = 4000
+# Cover letters shorter than this are regenerated with an explicit length instruction
+COVER_LETTER_MIN_CHARS = 200
+COVER_LETTER_RETRY_HINT = "\nEnsure the letter is at least 250 words and no more than 600 words."
 
 
 class ResumeImprover:
@@ -76,71 +85,61 @@ class ResumeImprover:
                 # Get strengths and other analysis data
                 strengths_list = self.analyzer.analysis_result.get('strengths', []) if self.analyzer.analysis_result else []
                 
-                context = f"""
-Resume Content (first 2000 chars):
-{clamp_text(self.analyzer.resume_text, 2000)}
-
-Extracted Skills: {', '.join(self.analyzer.extracted_skills or [])}
-
-Strengths: {', '.join(strengths_list)}
-
-{weaknesses_text}
-
-Target role: {target_role if target_role else "Not specified"}
-"""
-
-                prompt = f"""You are an expert resume consultant. Analyze the resume and provide detailed, actionable improvement suggestions for these areas: {', '.join(remaining_areas)}.
-
-{context}
-
-For EACH improvement area listed above, provide:
+                prompt = (
+                    PromptBuilder(self.analyzer.model, max_completion=SUGGESTIONS_MAX_TOKENS)
+                    .add(
+                        "You are an expert resume consultant. Analyze the resume and provide detailed, actionable improvement "
+                        f"suggestions for these areas: {', '.join(remaining_areas)}.\n\n\nResume Digest:\n",
+                        priority=100,
+                    )
+                    .add(self.analyzer.resume_context(), priority=50, name="resume")
+                    .add(
+                        f"\n\nExtracted Skills: {', '.join(self.analyzer.extracted_skills or [])}\n\n"
+                        f"Strengths: {', '.join(strengths_list)}\n\n",
+                        priority=90,
+                    )
+                    .add(weaknesses_text, priority=60, name="weaknesses")
+                    .add(
+                        f"\n\nTarget role: {target_role if target_role else 'Not specified'}\n\n\n"
+                        """For EACH improvement area listed above, provide:
 1. A clear description explaining what needs improvement (2-3 sentences)
 2. 3-5 specific, actionable suggestions with concrete examples
 3. If applicable, a before/after example showing the improvement
 
 Return ONLY a valid JSON object with this exact structure:
-{{
-  "Area Name": {{
+{
+  "Area Name": {
     "description": "What needs improvement and why",
     "specific": [
       "First actionable suggestion with specific examples",
       "Second actionable suggestion with specific examples",
       "Third actionable suggestion with specific examples"
     ],
-    "before_after": {{
+    "before_after": {
       "before": "Original text example",
       "after": "Improved text example"
-    }}
-  }}
-}}
+    }
+  }
+}
 
-Be specific and practical. Reference actual content from the resume in your suggestions."""
+Be specific and practical. Reference actual content from the resume in your suggestions.""",
+                        priority=100,
+                    )
+                    .build()
+                ).prompt
 
                 print(f"DEBUG: Sending prompt to LLM for {len(remaining_areas)} areas")
                 response = self.analyzer.llm_chat(
                     messages=[{"role": "user", "content": prompt}], 
                     temperature=0.3,
-                    max_tokens=2000  # Increased for detailed suggestions
+                    max_tokens=SUGGESTIONS_MAX_TOKENS
                 )
                 print(f"DEBUG: LLM response length: {len(response)}")
                 print(f"DEBUG: LLM response preview: {response[:200]}")
                 
-                # Try to extract JSON
-                ai_improvements = {}
-                
-                # Try direct JSON parse first
-                try:
-                    ai_improvements = json.loads(response)
-                    improvements.update(ai_improvements)
-                except json.JSONDecodeError:
-                    # Try to find JSON in code blocks
-                    json_match = re.search(r'```(?:json)?\s*([\s\S]+?)\s*```', response)
-                    if json_match:
-                        try:
-                            ai_improvements = json.loads(json_match.group(1))
-                            improvements.update(ai_improvements)
-                        except json.JSONDecodeError:
-                            pass
+                # Extract JSON (code fences, surrounding prose, trailing commas, truncation)
+                ai_improvements = parse_json(response, dict) or {}
+                improvements.update(ai_improvements)
                 
                 # If still no improvements, try markdown parsing
                 if not ai_improvements:
@@ -209,106 +208,170 @@ Be specific and practical. Reference actual content from the resume in your sugg
             return "Please upload and analyze a resume first."
 
         try:
-            skills_to_highlight = []
-
-            if highlight_skills:
-                if len(highlight_skills) > 100:
-                    self.analyzer.jd_text = highlight_skills
-                    try:
-                        parsed_skills = self.analyzer.extract_skills_from_jd(highlight_skills)
-                        skills_to_highlight = parsed_skills if parsed_skills else [s.strip() for s in highlight_skills.split(",") if s.strip()]
-                    except:
-                        skills_to_highlight = [s.strip() for s in highlight_skills.split(",") if s.strip()]
-                else:
-                    skills_to_highlight = [s.strip() for s in highlight_skills.split(",") if s.strip()]
-
-            if not skills_to_highlight and self.analyzer.analysis_result:
-                skills_to_highlight = self.analyzer.analysis_result.get("missing_skills", [])
-                skills_to_highlight.extend([s for s in self.analyzer.analysis_result.get("strengths", []) if s not in skills_to_highlight])
-                if self.analyzer.extracted_skills:
-                    skills_to_highlight.extend([s for s in self.analyzer.extracted_skills if s not in skills_to_highlight])
-
-            weakness_context = ""
-            improvement_examples = ""
-
-            if self.analyzer.resume_weaknesses:
-                weakness_context = "Address these specific weaknesses:\n"
-                for weakness in self.analyzer.resume_weaknesses:
-                    skill_name = weakness.get('skill', '')
-                    weakness_context += f"- {skill_name}: {weakness.get('detail', '')}\n"
-                    if 'suggestions' in weakness:
-                        for suggestion in weakness['suggestions']:
-                            weakness_context += f" * {suggestion}\n"
-                    if 'example' in weakness and weakness['example']:
-                        improvement_examples += f"For {skill_name}: {weakness['example']}\n\n"
-
-            jd_context = ""
-            if self.analyzer.jd_text:
-                jd_context = f"Job Description:\n{self.analyzer.jd_text}\n\n"
-            elif target_role:
-                jd_context = f"Target Role: {target_role}\n\n"
-
-            prompt = f"""
-Rewrite and improve this resume to make it highly optimized for the target job.
-{jd_context}
-Original Resume:
-{clamp_text(self.analyzer.resume_text, 3000)}
-
-Skills to highlight (in order of priority): {', '.join(skills_to_highlight)}
-
-{weakness_context}
-
-Here are specific examples of content to add:
-{improvement_examples}
-
-Please improve the resume by:
-1. Adding strong, quantifiable achievements
-2. Highlighting the specified skills strategically for ATS scanning
-3. Addressing all the weakness areas identified with the specific suggestions provided
-4. Incorporating the example improvements provided above
-5. Structuring information in a clear, professional format
-6. Using industry-standard terminology
-7. Ensuring all relevant experience is properly emphasized
-8. Adding measurable outcomes and achievements
-
-Return only the improved resume text without any additional explanations.
-Format the resume in a modern, clean style with clear section headings.
-Make sure to include ALL sections from the original resume (contact info, summary, experience, education, skills, etc.).
-"""
-
-            print(f"DEBUG: Generating improved resume with target_role='{target_role}', skills_count={len(skills_to_highlight)}")
+            jd_skills = None
+            if highlight_skills and len(highlight_skills) > 100:
+                self.analyzer.jd_text = highlight_skills
+                try:
+                    jd_skills = self.analyzer.extract_skills_from_jd(highlight_skills)
+                except Exception:
+                    jd_skills = None
+            prompt = self._improved_resume_prompt(target_role, highlight_skills, jd_skills)
             # Use much higher max_tokens for full resume generation (Groq allows up to 8000)
             improved_resume = self.analyzer.llm_chat(
                 messages=[{"role": "user", "content": prompt}], 
                 temperature=0.3,
-                max_tokens=4000  # Increased from default 600 to 4000 for complete resume
+                max_tokens=IMPROVED_RESUME_MAX_TOKENS
             ).strip()
-            print(f"DEBUG: Generated improved resume length: {len(improved_resume)} characters")
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.txt', mode='w', encoding='utf-8') as tmp:
-                tmp.write(improved_resume)
-                self.improved_resume_path = tmp.name
-
-            return improved_resume
+            return self._save_improved_resume(improved_resume)
 
         except Exception as e:
             print(f"Error generating improved resume: {e}")
             return "Error generating improved resume. Please try again."
 
-    def generate_cover_letter(self, company: str, role: str, job_description: str = "", 
-                            tone: str = "professional", length: str = "one-page") -> str:
-        """Generate a tailored cover letter."""
+    async def get_improved_resume_async(self, target_role="", highlight_skills=""):
+        """Async variant of `get_improved_resume`."""
         if not self.analyzer.resume_text:
             return "Please upload and analyze a resume first."
 
         try:
-            jd_clean = self.analyzer.clean_job_description(job_description) if job_description else ""
-            skills_focus = ", ".join(self.analyzer.extracted_skills or [])
-            strengths = ", ".join(self.analyzer.analysis_result.get('strengths', [])) if self.analyzer.analysis_result else ""
-            weaknesses = ", ".join(self.analyzer.analysis_result.get('missing_skills', [])) if self.analyzer.analysis_result else ""
-            jd_section = f" - Job Description (cleaned):\n{jd_clean}" if jd_clean else ""
+            jd_skills = None
+            if highlight_skills and len(highlight_skills) > 100:
+                self.analyzer.jd_text = highlight_skills
+                jd_skills = await self.analyzer.extract_skills_from_jd_async(highlight_skills)
+            prompt = self._improved_resume_prompt(target_role, highlight_skills, jd_skills)
+            improved_resume = (await self.analyzer.llm_chat_async(
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=IMPROVED_RESUME_MAX_TOKENS
+            )).strip()
+            return await asyncio.to_thread(self._save_improved_resume, improved_resume)
+
+        except Exception as e:
+            print(f"Error generating improved resume: {e}")
+            return "Error generating improved resume. Please try again."
+
+    def get_improved_resume_stream(self, target_role="", highlight_skills=""):
+        """Streaming variant of `get_improved_resume` yielding text deltas."""
+        if not self.analyzer.resume_text:
+            yield "Please upload and analyze a resume first."
+            return
+        jd_skills = None
+        if highlight_skills and len(highlight_skills) > 100:
+            self.analyzer.jd_text = highlight_skills
+            jd_skills = self.analyzer.extract_skills_from_jd(highlight_skills)
+        prompt = self._improved_resume_prompt(target_role, highlight_skills, jd_skills)
+        parts = []
+        for delta in self.analyzer.llm_chat_stream(messages=[{"role": "user", "content": prompt}], temperature=0.3, max_tokens=IMPROVED_RESUME_MAX_TOKENS):
+            parts.append(delta)
+            yield delta
+        self._save_improved_resume("".join(parts).strip())
+
+    async def get_improved_resume_astream(self, target_role="", highlight_skills=""):
+        """Async-iterator variant of `get_improved_resume` yielding text deltas."""
+        if not self.analyzer.resume_text:
+            yield "Please upload and analyze a resume first."
+            return
+        jd_skills = None
+        if highlight_skills and len(highlight_skills) > 100:
+            self.analyzer.jd_text = highlight_skills
+            jd_skills = await self.analyzer.extract_skills_from_jd_async(highlight_skills)
+        prompt = self._improved_resume_prompt(target_role, highlight_skills, jd_skills)
+        parts = []
+        async for delta in self.analyzer.llm_chat_astream(messages=[{"role": "user", "content": prompt}], temperature=0.3, max_tokens=IMPROVED_RESUME_MAX_TOKENS):
+            parts.append(delta)
+            yield delta
+        await asyncio.to_thread(self._save_improved_resume, "".join(parts).strip())
+
+    def _improved_resume_prompt(self, target_role="", highlight_skills="", jd_skills=None):
+        """Build the full-resume rewrite prompt.
+
+        Args:
+            target_role: Optional target role used when no JD is set
+            highlight_skills: Comma-separated skills or a pasted job description
+            jd_skills: Skills already extracted from a pasted job description
+        """
+        skills_to_highlight = []
+
+        if highlight_skills:
+            skills_to_highlight = jd_skills or [s.strip() for s in highlight_skills.split(",") if s.strip()]
+
+        if not skills_to_highlight and self.analyzer.analysis_result:
+            skills_to_highlight = list(self.analyzer.analysis_result.get("missing_skills", []))
+            skills_to_highlight.extend([s for s in self.analyzer.analysis_result.get("strengths", []) if s not in skills_to_highlight])
+            if self.analyzer.extracted_skills:
+                skills_to_highlight.extend([s for s in self.analyzer.extracted_skills if s not in skills_to_highlight])
+
+        weakness_context = ""
+        improvement_examples = ""
+
+        if self.analyzer.resume_weaknesses:
+            weakness_context = "Address these specific weaknesses:\n"
+            for weakness in self.analyzer.resume_weaknesses:
+                skill_name = weakness.get('skill', '')
+                weakness_context += f"- {skill_name}: {weakness.get('detail', '')}\n"
+                if 'suggestions' in weakness:
+                    for suggestion in weakness['suggestions']:
+                        weakness_context += f" * {suggestion}\n"
+                if 'example' in weakness and weakness['example']:
+                    improvement_examples += f"For {skill_name}: {weakness['example']}\n\n"
+
+        jd_context = ""
+        if self.analyzer.jd_text:
+            jd_context = f"Job Description:\n{self.analyzer.jd_text}\n\n"
+        elif target_role:
+            jd_context = f"Target Role: {target_role}\n\n"
+
+        print(f"DEBUG: Generating improved resume with target_role='{target_role}', skills_count={len(skills_to_highlight)}")
+        # The whole original resume outranks the JD and the weakness notes: the rewrite must keep every section
+        return (
+            PromptBuilder(self.analyzer.model, max_completion=IMPROVED_RESUME_MAX_TOKENS)
+            .add("\nRewrite and improve this resume to make it highly optimized for the target job.\n", priority=100)
+            .add(jd_context, priority=40, name="jd")
+            .add("Original Resume:\n", priority=100)
+            .add(self.analyzer.resume_text, priority=80, name="resume")
+            .add(f"\n\nSkills to highlight (in order of priority): {', '.join(skills_to_highlight)}\n\n", priority=90)
+            .add(weakness_context, priority=60, name="weaknesses")
+            .add("\n\nHere are specific examples of content to add:\n", priority=100)
+            .add(improvement_examples, priority=50, name="examples")
+            .add("""
+
+Please improve the resume by:
+1. Adding strong, quantifiable achievements
+2. Highlighting the specified skills strategically for ATS scanning
+3. Addressing all the weakness areas identified with the specific suggestions provided
+4. Incorporating the example improvements provided above
+5. Structuring information in a clear, professional format
+6. Using industry-standard terminology
+7. Ensuring all relevant experience is properly emphasized
+8. Adding measurable outcomes and achievements
 
-            prompt = f"""
+Return only the improved resume text without any additional explanations.
+Format the resume in a modern, clean style with clear section headings.
+Make sure to include ALL sections from the original resume (contact info, summary, experience, education, skills, etc.).
+""", priority=100)
+            .build()
+        ).prompt
+
+    def _save_improved_resume(self, improved_resume):
+        """Persist the improved resume to a temp file and return the text."""
+        print(f"DEBUG: Generated improved resume length: {len(improved_resume)} characters")
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.txt', mode='w', encoding='utf-8') as tmp:
+            tmp.write(improved_resume)
+            self.improved_resume_path = tmp.name
+        return improved_resume
+
+    def _cover_letter_prompt(self, company: str, role: str, job_description: str = "",
+                             tone: str = "professional", length: str = "one-page") -> str:
+        """Build the cover letter prompt."""
+        jd_clean = self.analyzer.clean_job_description(job_description) if job_description else ""
+        skills_focus = ", ".join(self.analyzer.extracted_skills or [])
+        strengths = ", ".join(self.analyzer.analysis_result.get('strengths', [])) if self.analyzer.analysis_result else ""
+        weaknesses = ", ".join(self.analyzer.analysis_result.get('missing_skills', [])) if self.analyzer.analysis_result else ""
+        jd_section = f" - Job Description (cleaned):\n{jd_clean}" if jd_clean else ""
+
+        return (
+            PromptBuilder(self.analyzer.model)
+            .add(f"""
 You are an expert career writer. Draft a tailored cover letter.
 
 Context:
@@ -316,11 +379,15 @@ Context:
 - Role: {role}
 - Writing tone: {tone}
 - Desired length: {length}
-- Resume (excerpts, may be partial):\n{clamp_text(self.analyzer.resume_text, 1000)}
+- Resume digest (skills, roles, achievements):\n""", priority=100)
+            .add(self.analyzer.resume_context(), priority=60, name="resume")
+            .add(f"""
 - Skills to emphasize: {skills_focus}
 - Strengths from analysis: {strengths}
 - Potential gaps to address carefully: {weaknesses}
-{jd_section}
+""", priority=90)
+            .add(jd_section, priority=50, name="jd")
+            .add("""
 
 Requirements:
 - Start with a compelling intro aligned to the company and role.
@@ -332,11 +399,22 @@ Requirements:
 
 Output:
 Return ONLY the letter body, no extra commentary.
-"""
+""", priority=100)
+            .build()
+        ).prompt
+
+    def generate_cover_letter(self, company: str, role: str, job_description: str = "", 
+                            tone: str = "professional", length: str = "one-page") -> str:
+        """Generate a tailored cover letter."""
+        if not self.analyzer.resume_text:
+            return "Please upload and analyze a resume first."
+
+        try:
+            prompt = self._cover_letter_prompt(company, role, job_description, tone, length)
             letter = self.analyzer.llm_chat(messages=[{"role": "user", "content": prompt}]).strip()
             
-            if len(letter) < 200:
-                prompt2 = prompt + "\nEnsure the letter is at least 250 words and no more than 600 words."
+            if len(letter) < COVER_LETTER_MIN_CHARS:
+                prompt2 = prompt + COVER_LETTER_RETRY_HINT
                 letter = self.analyzer.llm_chat(messages=[{"role": "user", "content": prompt2}]).strip()
             
             return letter
@@ -344,6 +422,70 @@ Return ONLY the letter body, no extra commentary.
             print(f"Error generating cover letter: {e}")
             return "Error generating cover letter. Please try again."
 
+    async def generate_cover_letter_async(self, company: str, role: str, job_description: str = "",
+                                          tone: str = "professional", length: str = "one-page") -> str:
+        """Async variant of `generate_cover_letter`."""
+        if not self.analyzer.resume_text:
+            return "Please upload and analyze a resume first."
+
+        try:
+            prompt = self._cover_letter_prompt(company, role, job_description, tone, length)
+            letter = (await self.analyzer.llm_chat_async(messages=[{"role": "user", "content": prompt}])).strip()
+
+            if len(letter) < COVER_LETTER_MIN_CHARS:
+                prompt2 = prompt + COVER_LETTER_RETRY_HINT
+                letter = (await self.analyzer.llm_chat_async(messages=[{"role": "user", "content": prompt2}])).strip()
+
+            return letter
+        except Exception as e:
+            print(f"Error generating cover letter: {e}")
+            return "Error generating cover letter. Please try again."
+
+    def generate_cover_letter_stream(self, company: str, role: str, job_description: str = "",
+                                     tone: str = "professional", length: str = "one-page"):
+        """Streaming variant of `generate_cover_letter` yielding text deltas.
+
+        The first `COVER_LETTER_MIN_CHARS` characters are held back, so a
+        letter that ends before then is regenerated with a length
+        instruction (as in `generate_cover_letter`) and only the retry is
+        streamed.
+        """
+        if not self.analyzer.resume_text:
+            yield "Please upload and analyze a resume first."
+            return
+        prompt = self._cover_letter_prompt(company, role, job_description, tone, length)
+        head = ""
+        for delta in self.analyzer.llm_chat_stream(messages=[{"role": "user", "content": prompt}]):
+            if head is None:
+                yield delta
+                continue
+            head += delta
+            if len(head.strip()) >= COVER_LETTER_MIN_CHARS:
+                yield head
+                head = None
+        if head is not None:
+            yield from self.analyzer.llm_chat_stream(messages=[{"role": "user", "content": prompt + COVER_LETTER_RETRY_HINT}])
+
+    async def generate_cover_letter_astream(self, company: str, role: str, job_description: str = "",
+                                            tone: str = "professional", length: str = "one-page"):
+        """Async-iterator variant of `generate_cover_letter_stream` (short letters are retried the same way)."""
+        if not self.analyzer.resume_text:
+            yield "Please upload and analyze a resume first."
+            return
+        prompt = self._cover_letter_prompt(company, role, job_description, tone, length)
+        head = ""
+        async for delta in self.analyzer.llm_chat_astream(messages=[{"role": "user", "content": prompt}]):
+            if head is None:
+                yield delta
+                continue
+            head += delta
+            if len(head.strip()) >= COVER_LETTER_MIN_CHARS:
+                yield head
+                head = None
+        if head is not None:
+            async for delta in self.analyzer.llm_chat_astream(messages=[{"role": "user", "content": prompt + COVER_LETTER_RETRY_HINT}]):
+                yield delta
+
     def generate_updated_resume_latex(self, latex_source: str, job_description: str) -> str:
         """Update a LaTeX resume to match job description."""
         if not latex_source or latex_source.strip() == "":
@@ -352,21 +494,35 @@ Return ONLY the letter body, no extra commentary.
         jd_clean = self.analyzer.clean_job_description(job_description) if job_description else ""
         
         try:
-            context = f"Analyzed resume excerpts (for content ideas):\n{clamp_text((self.analyzer.resume_text or ''), 1500)}"
-            prompt = (
-                "You are an expert resume editor and LaTeX practitioner. Update the LaTeX resume below to match the given job description, "
-                "STRICTLY preserving the LaTeX format (documentclass, preamble, macros, environments). Only modify textual content (section text, bullets, achievements).\n\n"
-                f"Job Description (cleaned):\n{jd_clean}\n\n{context}\n\n"
-                "Return ONLY the updated LaTeX source with no explanations. Ensure it compiles."
-            )
+            model = self.analyzer.model
+            system = "Follow rules strictly; preserve LaTeX preamble and macros; output only LaTeX."
             user_content = (
                 "----- BEGIN ORIGINAL LATEX -----\n" + latex_source + "\n----- END ORIGINAL LATEX -----\n"
             )
+            # The answer is a full rewrite of the source, so size the completion from it
+            max_tokens = min(int(count_tokens(latex_source, model) * 1.25) + 256, max_completion_tokens(model))
+            # The source goes in its own message; the instructions get what the window has left after it
+            fixed = count_message_tokens([{"content": system}, {"content": user_content}], model)
+            prompt = (
+                PromptBuilder(model, max_completion=max_tokens,
+                              budget=max(1, context_window(model) - max_tokens - SAFETY_MARGIN - fixed))
+                .add(
+                    "You are an expert resume editor and LaTeX practitioner. Update the LaTeX resume below to match the given job description, "
+                    "STRICTLY preserving the LaTeX format (documentclass, preamble, macros, environments). Only modify textual content (section text, bullets, achievements).\n\n"
+                    "Job Description (cleaned):\n",
+                    priority=100,
+                )
+                .add(jd_clean, priority=60, name="jd")
+                .add("\n\nAnalyzed resume excerpts (for content ideas):\n", priority=100)
+                .add(self.analyzer.resume_context(), priority=40, name="resume")
+                .add("\n\nReturn ONLY the updated LaTeX source with no explanations. Ensure it compiles.", priority=100)
+                .build()
+            ).prompt
             updated = self.analyzer.llm_chat(messages=[
-                {"role": "system", "content": "Follow rules strictly; preserve LaTeX preamble and macros; output only LaTeX."},
+                {"role": "system", "content": system},
                 {"role": "user", "content": prompt},
                 {"role": "user", "content": user_content},
-            ]).strip()
+            ], max_tokens=max_tokens).strip()
             
             # Sanity check
             if "\\documentclass" not in updated and "\\begin{document}" not in updated:
@@ -377,7 +533,7 @@ Return ONLY the letter body, no extra commentary.
                     {"role": "system", "content": "Output only full LaTeX source; preserve preamble and macros exactly."},
                     {"role": "user", "content": repair_prompt},
                     {"role": "user", "content": user_content},
-                ]).strip()
+                ], max_tokens=max_tokens).strip()
             
             return updated
         except Exception as e:
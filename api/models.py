@@ -22,6 +22,12 @@ class QuestionType(str, Enum):
     CODING = "Coding"
 
 
+class AnalysisIntensity(str, Enum):
+    FULL = "full"
+    QUICK = "quick"
+    LOCAL = "local"
+
+
 class LLMProvider(str, Enum):
     OPENAI = "openai"
     GROQ = "groq"
@@ -76,6 +82,7 @@ class ResumeAnalysisRequest(BaseModel):
     cutoff_score: int = Field(default=75, ge=0, le=100)
     jd_text: Optional[str] = None
     custom_skills: Optional[List[str]] = None
+    intensity: AnalysisIntensity = AnalysisIntensity.FULL
 
 
 class SkillScore(BaseModel):
@@ -93,6 +100,8 @@ class ResumeAnalysisResponse(BaseModel):
     weaknesses: List[Dict[str, Any]]
     recommendations: List[str]
     resume_hash: str
+    partial: bool = False
+    pending: List[str] = []
 
 
 class ResumeImprovementRequest(BaseModel):
@@ -15,6 +15,7 @@ from frontend.tabs import (
 )
 import atexit
 import os
+from utils.embeddings import EMBEDDING_PRELOAD, warmup_embeddings
 
 st.set_page_config(
     page_title = "ResuMate - Your AI Career Companion",
@@ -37,6 +38,11 @@ if 'user' not in st.session_state:
 if 'user_settings' not in st.session_state:
     st.session_state.user_settings = {}
 
+@st.cache_resource(show_spinner="Loading embedding model...")
+def _warm_embeddings():
+    """Load the shared embedding model once per process (not once per session)."""
+    return warmup_embeddings()
+
 def cleanup():
     """clean up resources when the app exits"""
     if st.session_state.resume_agent:
@@ -45,6 +51,8 @@ atexit.register(cleanup)
 
 def main():
     ui.setup_page()
+    if EMBEDDING_PRELOAD:
+        _warm_embeddings()
     ui.display_header()
     
     config = ui.setup_sidebar() 
@@ -7,6 +7,7 @@ Version: 1.0.0
 from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Form, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
 import os
@@ -66,6 +67,16 @@ from agents.job_search_agent import JobAgent
 
 # Import utilities
 from utils.file_handlers import extract_text_from_file
+from utils.llm_providers import aclose_async_client
+from utils.deadline import Deadline
+from utils.structured_output import structured_output_stats
+from utils.embeddings import EMBEDDING_PRELOAD, embedding_stats, warmup_embeddings
+from utils.vector_store import VECTOR_STORE_CACHE
+from utils.vector_cache import get_vector_cache
+from utils.skill_evidence import SKILL_EVIDENCE_CACHE
+
+# Overall time budget for one analysis request (partial results after it)
+ANALYZE_DEADLINE_S = float(os.getenv("ANALYZE_DEADLINE_S", "25"))
 
 # In-memory storage for sessions and caches
 user_analysis_cache: Dict[int, Dict[str, Any]] = {}
@@ -85,12 +96,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"⚠️  Database initialization warning: {e}")
     
+    if EMBEDDING_PRELOAD:
+        # Load the shared embedding model once, before the first request needs it
+        await run_in_threadpool(warmup_embeddings)
+    
+    # Clean up the vector cache directory in the background (repeats while the app runs)
+    get_vector_cache().maybe_gc()
+    
     print("✅ ResuMate API is ready!")
     
     yield
     
     # Shutdown
     print("👋 Shutting down ResuMate API...")
+    await aclose_async_client()
 
 
 # ==================== FASTAPI APP INITIALIZATION ====================
@@ -154,6 +173,28 @@ def get_user_agent(user_id: int = Query(default=1, description="User ID for sess
     return agent
 
 
+def get_user_resume(user_id: int, resume_id: Optional[int] = None) -> dict:
+    """Get a stored resume by ID, or the user's latest one (404 if there is none)"""
+    if resume_id:
+        resume_data = get_user_resume_by_id(user_id, resume_id)
+    else:
+        all_resumes = get_user_resumes(user_id)
+        if not all_resumes:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No resume found"
+            )
+        latest_id = all_resumes[0].get("id") if isinstance(all_resumes[0], dict) else all_resumes[0]
+        resume_data = get_user_resume_by_id(user_id, latest_id)
+    
+    if not resume_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found"
+        )
+    return resume_data
+
+
 # ==================== ROOT & HEALTH ENDPOINTS ====================
 
 @app.get("/")
@@ -193,6 +234,11 @@ async def health_check():
     return {
         "status": "healthy",
         "database": db_status,
+        "structured_output": structured_output_stats(),
+        "embeddings": embedding_stats(),
+        "vector_stores": VECTOR_STORE_CACHE.stats(),
+        "vector_cache": get_vector_cache().stats(),
+        "skill_evidence": SKILL_EVIDENCE_CACHE.stats(),
         "version": "1.0.0",
         "timestamp": datetime.utcnow().isoformat()
     }
@@ -391,6 +437,7 @@ async def analyze_resume(
     - **cutoff_score**: Minimum score threshold (0-100)
     - **jd_text**: Optional job description text
     - **custom_skills**: Optional list of required skills
+    - **intensity**: "full", "quick" or "local" (embedding-only scoring, no LLM calls)
     - **resume_id**: Optional resume ID (uses latest if not provided)
     - **user_id**: User ID (default: 1)
     """
@@ -420,12 +467,15 @@ async def analyze_resume(
         # Set resume text in agent
         agent.resume_text = resume_text
         
-        # Analyze resume
-        result = agent.analyze_resume(
+        # Analyze resume (multi-call pipeline, run off the event loop, bounded by the request deadline)
+        result = await run_in_threadpool(
+            agent.analyze_resume,
             role=request.role,
             cutoff_score=request.cutoff_score,
             jd_text=request.jd_text,
-            custom_skills=request.custom_skills
+            custom_skills=request.custom_skills,
+            deadline=Deadline(ANALYZE_DEADLINE_S),
+            intensity=request.intensity.value
         )
         
         if not result:
@@ -448,7 +498,9 @@ async def analyze_resume(
             strengths=result.get("strengths", []),
             weaknesses=result.get("weaknesses", []),
             recommendations=result.get("recommendations", []),
-            resume_hash=result.get("resume_hash", "")
+            resume_hash=result.get("resume_hash", ""),
+            partial=result.get("partial", False),
+            pending=result.get("pending", [])
         )
     
     except HTTPException:
@@ -504,7 +556,7 @@ async def improve_resume(
             agent.resume_text = resume_data.get("resume_text", "")
         
         # Generate improvements
-        improvements = agent.suggest_improvements(focus_areas=request.focus_areas)
+        improvements = await run_in_threadpool(agent.suggest_improvements, focus_areas=request.focus_areas)
         
         if not improvements:
             raise HTTPException(
@@ -549,28 +601,10 @@ async def ask_resume_question(
         if cached:
             agent.resume_text = cached.get("resume_text")
         else:
-            if resume_id:
-                resume_data = get_user_resume_by_id(user_id, resume_id)
-            else:
-                all_resumes = get_user_resumes(user_id)
-                if not all_resumes:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="No resume found"
-                    )
-                latest_id = all_resumes[0].get("id") if isinstance(all_resumes[0], dict) else all_resumes[0]
-                resume_data = get_user_resume_by_id(user_id, latest_id)
-            
-            if not resume_data:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Resume not found"
-                )
-            
-            agent.resume_text = resume_data.get("resume_text", "")
+            agent.resume_text = get_user_resume(user_id, resume_id).get("resume_text", "")
         
         # Answer question
-        answer = agent.ask_question(
+        answer = await agent.ask_question_async(
             question=request.question,
             chat_history=request.chat_history
         )
@@ -589,6 +623,44 @@ async def ask_resume_question(
         )
 
 
+@app.post("/api/resume/ask/stream", tags=["Resume"])
+async def ask_resume_question_stream(
+    request: QuestionRequest,
+    resume_id: Optional[int] = None,
+    user_id: int = Query(default=1, description="User ID"),
+    agent: ResumeAnalysisAgent = Depends(get_user_agent)
+):
+    """
+    Ask questions about the resume, streaming the answer as server-sent events
+    
+    Each event is `data: {"delta": "..."}`; the stream ends with `data: [DONE]`.
+    
+    - **question**: Question to ask about the resume
+    - **chat_history**: Optional chat history for context
+    - **resume_id**: Optional resume ID
+    - **user_id**: User ID (default: 1)
+    """
+    cached = user_analysis_cache.get(user_id)
+    if cached:
+        agent.resume_text = cached.get("resume_text")
+    else:
+        agent.resume_text = get_user_resume(user_id, resume_id).get("resume_text", "")
+    
+    async def event_stream():
+        try:
+            async for delta in agent.ask_question_astream(request.question, request.chat_history):
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # ==================== INTERVIEW ROUTES ====================
 
 @app.post("/api/interview/start", response_model=InterviewStartResponse, tags=["Interview"])
@@ -646,8 +718,9 @@ async def start_interview(
                     skills = list(skill_scores.keys())
             agent.extracted_skills = skills
         
-        # Generate interview questions
-        questions = agent.generate_interview_questions(
+        # Generate interview questions (multi-call pipeline, run off the event loop)
+        questions = await run_in_threadpool(
+            agent.generate_interview_questions,
             question_types=[qt.value for qt in request.question_types],
             difficulty=request.difficulty.value,
             num_questions=request.num_questions
@@ -751,7 +824,8 @@ async def submit_answer(
         
         # Score the answer
         agent.resume_text = interview["resume_text"]
-        score = agent.score_interview_answer(
+        score = await run_in_threadpool(
+            agent.score_interview_answer,
             question=question_text,
             answer=submission.transcript
         )
@@ -0,0 +1,50 @@
+"""Shared pytest fixtures.
+
+LLM tests run against the in-repo stand-in (`utils.llm_standin`) and a
+response cache in a temporary directory, so they never reach Groq or touch
+the caches under ``.cache``.
+"""
+
+import uuid
+
+import pytest
+
+from utils import llm_providers
+from utils.llm_cache import ResponseCache
+from utils.llm_standin import StandinConfig, start_standin
+
+
+@pytest.fixture(autouse=True)
+def response_cache(tmp_path, monkeypatch):
+    """A fresh, enabled response cache for every test."""
+    cache = ResponseCache(str(tmp_path / "llm" / "responses.sqlite3"), enabled=True)
+    monkeypatch.setattr(llm_providers, "RESPONSE_CACHE", cache)
+    return cache
+
+
+@pytest.fixture
+def standin():
+    """Start a stand-in server with the given `StandinConfig` fields and send calls to it.
+
+    Budgets default high enough that the rate limiter never paces a test
+    unless it asks for tight ones.
+    """
+    servers = []
+
+    def start(**config):
+        server = start_standin(StandinConfig(**{"rpm": 100000, "tpm": 100000000, **config}))
+        servers.append(server)
+        llm_providers.set_base_url(server.base_url)
+        return server
+
+    yield start
+    llm_providers.set_base_url(None)
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def api_key():
+    """A key no other test uses, so each test gets its own rate limiter."""
+    return f"test-{uuid.uuid4().hex}"
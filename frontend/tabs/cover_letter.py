@@ -12,6 +12,11 @@ def generate_cover_letter(agent: ResumeAnalysisAgent, company: str, role: str, j
         return "Error generating cover letter."
 
 
+def stream_cover_letter(agent: ResumeAnalysisAgent, company: str, role: str, jd: str, tone: str, length: str):
+    """Yield cover letter deltas from the agent; errors propagate so a partial letter is not kept."""
+    yield from agent.generate_cover_letter_stream(company=company, role=role, job_description=jd, tone=tone, length=length)
+
+
 def render(agent):
     if st.session_state.resume_analyzed and agent:
         ui.cover_letter_section(
@@ -19,6 +24,9 @@ def render(agent):
             generate_cover_letter_func=lambda company, role, jd, tone, length: generate_cover_letter(
                 agent, company, role, jd, tone, length
             ),
+            stream_cover_letter_func=lambda company, role, jd, tone, length: stream_cover_letter(
+                agent, company, role, jd, tone, length
+            ),
         )
     else:
         st.warning("Please upload and analyze a resume first in the 'Resume Analysis' tab.")
@@ -38,10 +38,32 @@ def render(client=None):
 
     num_results = st.slider("Number of Results", 5, 30, 10)
 
+    fit_mode = st.radio(
+        "Rank by fit with my analyzed resume",
+        ["Off", "Local preview", "Quick", "Full"],
+        horizontal=True,
+        help="Local preview uses no LLM calls; Quick scores skills with the LLM; Full also extracts each posting's skills with the LLM.",
+    )
+
     if st.button("🔍 Search Jobs"):
         with st.spinner("Fetching jobs..."):
             jobs = _cached_job_search(platform, query, location, num_results)
 
+        fit = {}
+        agent = st.session_state.get("resume_agent")
+        if fit_mode != "Off" and jobs and isinstance(jobs, list) and not any(j.get("error") for j in jobs):
+            if not (agent and getattr(agent, "resume_text", None)):
+                st.info("Analyze a resume in the Resume Analysis tab to rank jobs by fit.")
+            else:
+                intensity = {"Local preview": "local", "Quick": "quick", "Full": "full"}[fit_mode]
+                with st.spinner("Matching your resume against the postings..."):
+                    try:
+                        ranked = agent.match_many(jobs, intensity=intensity)
+                        jobs = [r["job"] for r in ranked]
+                        fit = {id(r["job"]): r for r in ranked}
+                    except Exception as e:
+                        st.warning(f"Could not rank jobs by fit: {e}")
+
         if jobs and isinstance(jobs, list):
             if len(jobs) == 0:
                 st.info("No jobs found.")
@@ -53,6 +75,11 @@ def render(client=None):
                 st.markdown(f"### {title}")
                 st.write(f"**Company:** {company}")
                 st.write(f"**Location:** {loc}")
+                match = fit.get(id(job))
+                if match:
+                    st.write(f"**Fit:** {match['overall_score']}%")
+                    if match["missing_skills"]:
+                        st.caption("Missing: " + ", ".join(match["missing_skills"][:8]))
                 if link and link != '#':
                     st.markdown(f"[Apply Here]({link})", unsafe_allow_html=True)
                 st.markdown("---")
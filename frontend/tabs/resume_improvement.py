@@ -27,12 +27,21 @@ def get_improved_resume(_client_unused, target_role: str, highlight_skills: str)
         return "Error generating improved resume."
 
 
+def stream_improved_resume(target_role: str, highlight_skills: str):
+    """Yield improved-resume deltas from the local agent; errors propagate so a partial resume is not saved."""
+    agent: ResumeAnalysisAgent = st.session_state.get("resume_agent")
+    if not agent:
+        raise RuntimeError("Agent not initialized. Configure provider/API key in sidebar.")
+    yield from agent.get_improved_resume_stream(target_role=target_role, highlight_skills=highlight_skills)
+
+
 def render(client=None):
     if st.session_state.resume_analyzed:
         ui.resume_improvement_section(
             has_resume=True,
             improve_resume_func=lambda areas, role: improve_resume(None, areas, role),
             get_improved_resume_func=lambda role, skills: get_improved_resume(None, role, skills),
+            stream_improved_resume_func=stream_improved_resume,
         )
     else:
         st.warning("Please upload and analyze a resume first in the 'Resume Analysis' tab.")
@@ -14,11 +14,24 @@ def ask_question(_client_unused, question, chat_history=None):
         return f"Error: {e}"
 
 
+def stream_question(question, chat_history=None):
+    """Yield answer deltas from the local agent, surfacing errors inline."""
+    agent: ResumeAnalysisAgent = st.session_state.get("resume_agent")
+    if not agent:
+        yield "Agent not initialized. Configure provider/API key in sidebar."
+        return
+    try:
+        yield from agent.ask_question_stream(question, chat_history or [])
+    except Exception as e:
+        yield f"Error: {e}"
+
+
 def render(client=None):
     if st.session_state.resume_analyzed:
         ui.resume_qa_section(
             has_resume=True,
             ask_question_func=lambda q, h=None: ask_question(None, q, h),
+            stream_question_func=stream_question,
         )
     else:
         st.warning("Please upload and analyze a resume first in the 'Resume Analysis' tab.")
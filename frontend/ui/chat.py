@@ -1,8 +1,8 @@
-from typing import Callable
+from typing import Callable, Optional
 import streamlit as st
 
 
-def resume_qa_section(has_resume: bool, ask_question_func: Callable):
+def resume_qa_section(has_resume: bool, ask_question_func: Callable, stream_question_func: Optional[Callable] = None):
     st.subheader("💬 Resume AI Chatbot")
     st.markdown("Ask me anything about the resume!")
     if has_resume:
@@ -20,8 +20,18 @@ def resume_qa_section(has_resume: bool, ask_question_func: Callable):
         user_question = st.chat_input("Ask a question about the resume...")
         if user_question:
             st.session_state.chat_history.append({'role': 'user', 'content': user_question})
-            with st.spinner("🤔 Thinking..."):
-                response = ask_question_func(user_question, st.session_state.chat_history[:-1])
+            if stream_question_func:
+                # Render tokens as they arrive instead of waiting for the full answer
+                with chat_container:
+                    with st.chat_message("user", avatar="👤"):
+                        st.markdown(user_question)
+                    with st.chat_message("assistant", avatar="🤖"):
+                        response = st.write_stream(stream_question_func(user_question, st.session_state.chat_history[:-1]))
+                if not isinstance(response, str):
+                    response = "".join(str(part) for part in response or [])
+            else:
+                with st.spinner("🤔 Thinking..."):
+                    response = ask_question_func(user_question, st.session_state.chat_history[:-1])
             st.session_state.chat_history.append({'role': 'assistant', 'content': response})
             st.rerun()
         if st.session_state.chat_history:
@@ -1,8 +1,8 @@
-from typing import Callable
+from typing import Callable, Optional
 import streamlit as st
 
 
-def cover_letter_section(has_resume: bool, generate_cover_letter_func: Callable):
+def cover_letter_section(has_resume: bool, generate_cover_letter_func: Callable, stream_cover_letter_func: Optional[Callable] = None):
     st.subheader("Generate a Tailored Cover Letter")
     if has_resume:
         col1, col2 = st.columns(2)
@@ -17,13 +17,29 @@ def cover_letter_section(has_resume: bool, generate_cover_letter_func: Callable)
             if not company or not role:
                 st.warning("Please provide both company and role.")
             else:
-                with st.spinner("Writing your letter..."):
-                    letter = generate_cover_letter_func(company, role, jd, tone, "one-page" if length.startswith("one-page") else "short")
+                length_key = "one-page" if length.startswith("one-page") else "short"
+                letter = None
+                if stream_cover_letter_func:
+                    # A stream that fails midway is discarded rather than offered as the finished letter
+                    placeholder = st.empty()
+                    try:
+                        with placeholder.container(border=True):
+                            letter = st.write_stream(stream_cover_letter_func(company, role, jd, tone, length_key))
+                    except Exception as e:
+                        placeholder.empty()
+                        st.error(f"Error generating cover letter: {e}. The incomplete letter was discarded.")
+                    else:
+                        if not isinstance(letter, str):
+                            letter = "".join(str(part) for part in letter or [])
+                        letter = letter.strip()
+                else:
+                    with st.spinner("Writing your letter..."):
+                        letter = generate_cover_letter_func(company, role, jd, tone, length_key)
                 if letter and not letter.startswith("Error"):
                     st.markdown("### Cover Letter")
                     st.text_area("Letter", letter, height=500, key="cover_letter_output")
                     st.download_button(label="Download Cover Letter", data=letter, file_name="cover_letter.txt", mime="text/plain")
-                else:
+                elif letter is not None:
                     st.error(letter or "No letter generated.")
     else:
         st.warning("Please upload and analyze a resume first")
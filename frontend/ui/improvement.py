@@ -1,36 +1,21 @@
-from typing import Callable
+from typing import Callable, Optional
 import json
-import re
-import ast
 import streamlit as st
+from utils.structured_output import extract_json
 
 
-def resume_improvement_section(has_resume: bool, improve_resume_func: Callable, get_improved_resume_func: Callable):
+def resume_improvement_section(has_resume: bool, improve_resume_func: Callable, get_improved_resume_func: Callable,
+                               stream_improved_resume_func: Optional[Callable] = None):
     st.subheader("✨ Resume Improvement Suggestions")
     st.markdown("Get AI-powered suggestions to enhance your resume and make it stand out!")
 
     def normalize_improvements(raw):
         def try_parse(text):
-            cleaned = text.strip()
-            if cleaned.startswith("```"):
-                cleaned = cleaned.strip("`")
-                if cleaned.lower().startswith("json"):
-                    cleaned = cleaned[4:].strip()
-
-            if not cleaned.startswith("{"):
-                match = re.search(r"\{[\s\S]*\}", cleaned)
-                if match:
-                    cleaned = match.group(0)
-
-            for _ in range(2):
-                try:
-                    return json.loads(cleaned)
-                except json.JSONDecodeError:
-                    try:
-                        return ast.literal_eval(cleaned)
-                    except (ValueError, SyntaxError):
-                        return None
-            return None
+            try:
+                # May decode to a string holding JSON; the caller parses that again
+                return json.loads(text.strip())
+            except json.JSONDecodeError:
+                return extract_json(text)
 
         if isinstance(raw, dict):
             for key in ["content", "text", "message", "output"]:
@@ -238,12 +223,29 @@ def resume_improvement_section(has_resume: bool, improve_resume_func: Callable,
             with col2:
                 st.markdown("")
                 st.markdown("")
-                if st.button("✨ Generate Improved Resume", use_container_width=True):
+                generate_clicked = st.button("✨ Generate Improved Resume", use_container_width=True)
+
+            if generate_clicked:
+                improved_resume = None
+                if stream_improved_resume_func:
+                    # Show the rewrite as it is generated; a stream that fails midway is discarded, not saved
+                    placeholder = st.empty()
+                    try:
+                        with placeholder.container(border=True):
+                            improved_resume = st.write_stream(stream_improved_resume_func(target_role or "", highlight_skills))
+                    except Exception as e:
+                        placeholder.empty()
+                        st.error(f"Error generating improved resume: {e}. The incomplete output was discarded.")
+                    else:
+                        if not isinstance(improved_resume, str):
+                            improved_resume = "".join(str(part) for part in improved_resume or [])
+                else:
                     with st.spinner("Generating your improved resume..."):
                         improved_resume = get_improved_resume_func(target_role or "", highlight_skills)
-                        st.session_state['improved_resume_text'] = improved_resume
-                        st.success("✅ Improved resume generated!")
-                        st.rerun()
+                if improved_resume is not None:
+                    st.session_state['improved_resume_text'] = improved_resume.strip()
+                    st.success("✅ Improved resume generated!")
+                    st.rerun()
 
             if 'improved_resume_text' in st.session_state and st.session_state['improved_resume_text']:
                 st.markdown("---")
@@ -0,0 +1,95 @@
+"""Tests for batch resume ranking (`agents.batch_ranker`)."""
+
+import pytest
+
+from agents import batch_ranker, resume_analyzer
+from agents.batch_ranker import BatchRanker, collect_resume_paths
+from agents.resume_analyzer import ResumeAnalyzer
+from test_vector_store import HashEmbeddings
+from utils.skill_evidence import SkillEvidenceCache
+
+SKILLS = ["Python", "Docker", "AWS"]
+
+RESUMES = {
+    "strong.txt": "Experience\n- Built Python services shipped in Docker on AWS\n- Python data pipelines on AWS",
+    "partial.txt": "Experience\n- Wrote Python scripts for reporting",
+    "none.txt": "Experience\n- Managed a retail store team",
+    "empty.txt": "",
+}
+
+
+@pytest.fixture
+def resumes(tmp_path):
+    folder = tmp_path / "resumes"
+    folder.mkdir()
+    for name, text in RESUMES.items():
+        (folder / name).write_text(text)
+    return sorted(str(folder / name) for name in RESUMES)
+
+
+@pytest.fixture
+def analyzer(tmp_path, api_key, monkeypatch):
+    """An analyzer with hashing embeddings; per-resume workers share them."""
+    monkeypatch.setattr(resume_analyzer, "SKILL_EVIDENCE_CACHE",
+                        SkillEvidenceCache(str(tmp_path / "evidence.sqlite3"), enabled=True))
+    analyzer = ResumeAnalyzer(api_key, vector_cache_dir=str(tmp_path / "vectors"))
+    analyzer._embeddings = HashEmbeddings()
+    return analyzer
+
+
+def test_collect_resume_paths(tmp_path, capsys):
+    (tmp_path / "sub").mkdir()
+    for name in ("a.txt", "sub/b.PDF", "notes.md"):
+        (tmp_path / name).write_text("x")
+    loose = tmp_path / "c.docx"
+    loose.write_text("x")
+
+    paths = collect_resume_paths([str(tmp_path), str(tmp_path / "a.txt"), str(loose)])
+    assert paths == [str(tmp_path / "a.txt"), str(tmp_path / "sub" / "b.PDF")]
+    assert "Skipping unsupported file" in capsys.readouterr().err
+
+
+def test_local_only_ranking(resumes, analyzer):
+    records = list(BatchRanker(analyzer, top_k=0).rank(resumes, skills=SKILLS))
+    order = [r["path"].rsplit("/", 1)[-1] for r in records]
+    assert order[:2] == ["strong.txt", "partial.txt"]
+    assert [r["rank"] for r in records] == [1, 2, 3, 4]
+    assert all(r["stage"] == "local" and r["llm_score"] is None for r in records)
+    empty = next(r for r in records if r["path"].endswith("empty.txt"))
+    assert empty["error"] and empty["score"] == 0
+
+
+def test_top_k_resumes_are_scored_by_the_llm(resumes, analyzer, standin):
+    server = standin()
+    ranker = BatchRanker(analyzer, top_k=2)
+    records = list(ranker.rank(resumes, skills=SKILLS))
+    assert [r["stage"] for r in records] == ["llm", "llm", "local", "local"]
+    assert {r["path"].rsplit("/", 1)[-1] for r in records[:2]} == {"strong.txt", "partial.txt"}
+    assert all(set(r["skill_scores"]) == set(SKILLS) for r in records[:2])
+    # One batched scoring call per shortlisted resume
+    assert server.stats["requests"] == ranker.token_usage["calls"] == 2
+
+
+def test_shortlist_workers_reuse_their_analyzer(resumes, analyzer, standin, monkeypatch):
+    from utils import fanout
+
+    created = []
+
+    def counting_analyzer(*args, **kwargs):
+        created.append(1)
+        return ResumeAnalyzer(*args, **kwargs)
+
+    # One worker: every shortlisted resume is scored on this thread
+    monkeypatch.setattr(fanout, "FANOUT_WORKERS", 1)
+    monkeypatch.setattr(batch_ranker, "ResumeAnalyzer", counting_analyzer)
+    standin()
+    ranker = BatchRanker(analyzer, top_k=3)
+    records = list(ranker.rank(resumes, skills=SKILLS))
+    assert [r["stage"] for r in records].count("llm") == 3
+    assert len(created) == 1
+    assert ranker.token_usage["calls"] == 3
+
+
+def test_missing_skills_are_an_error(resumes, analyzer):
+    with pytest.raises(ValueError):
+        list(BatchRanker(analyzer, top_k=0).rank(resumes, jd_text="", use_llm_jd=False))
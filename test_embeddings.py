@@ -0,0 +1,94 @@
+"""Tests for the process-wide embedding model (`utils.embeddings`)."""
+
+import threading
+
+import pytest
+
+from agents.resume_analyzer import ResumeAnalyzer
+from test_vector_store import HashEmbeddings
+from utils import embeddings
+from utils.embedding_cache import EmbeddingCache
+from utils.embeddings import SharedEmbeddings, get_embeddings, warmup_embeddings
+
+
+class CountingModel(HashEmbeddings):
+    """Stand-in for the FastEmbed model that counts how often it is built."""
+
+    built = 0
+
+    def __init__(self):
+        super().__init__()
+        CountingModel.built += 1
+
+
+class LocalEmbeddings(SharedEmbeddings):
+    """`SharedEmbeddings` over `CountingModel`, so no model is downloaded."""
+
+    def _load(self):
+        with self._load_lock:
+            if self._model is None:
+                self._model = CountingModel()
+                self._stats["loaded"] = True
+        return self._model
+
+
+class MissingModel(SharedEmbeddings):
+    def _load(self):
+        self._stats["error"] = "fastembed is not installed"
+        raise ImportError(self._stats["error"])
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    monkeypatch.setattr(embeddings, "_SHARED", None)
+    CountingModel.built = 0
+
+
+def test_one_instance_per_process(shared, api_key):
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(get_embeddings())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(e) for e in seen}) == 1
+    first, second = ResumeAnalyzer(api_key), ResumeAnalyzer(api_key)
+    assert first._get_embeddings() is second._get_embeddings() is seen[0]
+
+
+def test_model_is_loaded_once_on_first_use(shared):
+    model = LocalEmbeddings(cache=None)
+    assert not model.loaded and model.stats()["calls"] == 0
+    threads = [threading.Thread(target=model.embed_documents, args=([f"text {n}"],)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert CountingModel.built == 1
+    assert model.stats()["calls"] == 8 and model.stats()["texts"] == 8
+
+
+def test_warmup_runs_the_model_once(shared, monkeypatch):
+    monkeypatch.setattr(embeddings, "_SHARED", LocalEmbeddings(cache=None))
+    stats = warmup_embeddings()
+    assert stats["loaded"] and stats["warmup_s"] is not None
+    assert stats["calls"] == 1 and CountingModel.built == 1
+    # Warming again reuses the loaded model
+    warmup_embeddings()
+    assert CountingModel.built == 1
+
+
+def test_warmup_failure_is_reported_not_raised(shared, monkeypatch):
+    monkeypatch.setattr(embeddings, "_SHARED", MissingModel(cache=None))
+    stats = warmup_embeddings()
+    assert stats["loaded"] is False
+    assert stats["error"] == "fastembed is not installed"
+
+
+def test_cached_texts_skip_the_model(shared, tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "vectors.sqlite3"), max_bytes=1 << 20)
+    model = LocalEmbeddings(cache=cache)
+    first = model.embed_documents(["python", "docker", "python"])
+    assert model.stats()["texts"] == 2
+    assert LocalEmbeddings(cache=cache).embed_documents(["docker", "python"]) == [first[1], first[0]]
+    assert CountingModel.built == 1
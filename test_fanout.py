@@ -0,0 +1,69 @@
+"""Tests for bounded-concurrency fan-out (`utils.fanout`)."""
+
+import threading
+import time
+
+from utils import fanout
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.fanout import fan_out
+
+
+def test_results_keep_input_order():
+    # Later items finish first
+    results = fan_out(lambda n: time.sleep(0.01 * (5 - n)) or n * n, range(5), max_workers=5)
+    assert results == [0, 1, 4, 9, 16]
+    assert fan_out(str, []) == []
+
+
+def test_failures_stay_in_their_slot():
+    def fn(n):
+        if n == 2:
+            raise ValueError("bad item")
+        return n
+
+    results = fan_out(fn, range(4), max_workers=2)
+    assert results[:2] == [0, 1] and results[3] == 3
+    assert isinstance(results[2], ValueError)
+
+    replaced = fan_out(fn, range(4), max_workers=2, on_error=lambda item, exc: f"failed {item}")
+    assert replaced == [0, 1, "failed 2", 3]
+
+
+def _peak_concurrency(n_items, **kwargs):
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def fn(_):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    fan_out(fn, range(n_items), **kwargs)
+    return peak[0]
+
+
+def test_parallelism_is_bounded(monkeypatch):
+    assert _peak_concurrency(8, max_workers=3) <= 3
+    monkeypatch.setattr(fanout, "FANOUT_WORKERS", 2)
+    assert _peak_concurrency(8) <= 2
+
+
+def test_limiter_budget_caps_parallelism():
+    class Limiter:
+        def stats(self):
+            return {"requests_remaining": 1}
+
+    threads = set()
+    fan_out(lambda _: threads.add(threading.current_thread().name), range(4), max_workers=4, limiter=Limiter())
+    # One request left: items run one at a time on the calling thread
+    assert threads == {threading.current_thread().name}
+
+
+def test_items_not_started_before_the_deadline_fail():
+    deadline = Deadline(0.05)
+    results = fan_out(lambda n: time.sleep(0.1) or n, range(3), max_workers=1,
+                      on_error=lambda item, exc: type(exc).__name__, deadline=deadline)
+    assert results == [0, "DeadlineExceeded", "DeadlineExceeded"]
+    assert isinstance(fan_out(str, [1], deadline=Deadline(0.0))[0], DeadlineExceeded)
@@ -0,0 +1,138 @@
+"""Tests for hedged LLM calls and the per-model circuit breaker (`utils.llm`)."""
+
+import threading
+import time
+
+import pytest
+import requests
+
+from utils import llm
+from utils.deadline import DeadlineExceeded
+from utils.llm import ModelHealth, get_model_health, hedged_chat
+
+MESSAGES = [{"role": "user", "content": "Rate Python from 0 to 10."}]
+
+
+@pytest.fixture(autouse=True)
+def models(monkeypatch):
+    """Fresh breaker state, two candidate models and short hedge delays."""
+    monkeypatch.setattr(llm, "_HEALTH", {})
+    monkeypatch.setattr(llm, "HEDGE_MODELS", ["primary", "backup"])
+    monkeypatch.setattr(llm, "HEDGE_MIN_DELAY", 0.05)
+    monkeypatch.setattr(llm, "HEDGE_DEFAULT_DELAY", 0.05)
+
+
+def fake_chat(monkeypatch, slow=(), fail=None):
+    """Replace the provider call: `slow` models wait until their deadline is cancelled."""
+    calls, stopped = [], threading.Event()
+
+    def chat(api_key, messages, model, temperature, max_tokens, cache, deadline=None, response_format=None):
+        calls.append((model, threading.current_thread().name))
+        if fail is not None:
+            raise fail
+        if model in slow:
+            started = time.monotonic()
+            while not deadline.expired():
+                if time.monotonic() - started > 5:
+                    return f"late answer from {model}"
+                time.sleep(0.005)
+            stopped.set()
+            raise DeadlineExceeded("cancelled")
+        return f"answer from {model}"
+
+    monkeypatch.setattr(llm, "_groq_chat", chat)
+    return calls, stopped
+
+
+def test_slow_primary_is_hedged_and_first_success_wins(monkeypatch):
+    calls, _ = fake_chat(monkeypatch, slow=("primary",))
+    assert hedged_chat(None, MESSAGES, "primary", cache=False) == "answer from backup"
+    assert [model for model, _ in calls] == ["primary", "backup"]
+    stats = get_model_health("primary").stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_losing_call_is_cancelled(monkeypatch):
+    _, stopped = fake_chat(monkeypatch, slow=("primary",))
+    hedged_chat(None, MESSAGES, "primary", cache=False)
+    # The primary stops at its next deadline check instead of running to completion
+    assert stopped.wait(1)
+    # Our own cancellation says nothing about the model's health
+    assert get_model_health("primary").consecutive_failures == 0
+
+
+def test_fast_primary_is_not_hedged(monkeypatch):
+    calls, _ = fake_chat(monkeypatch)
+    assert hedged_chat(None, MESSAGES, "primary", cache=False) == "answer from primary"
+    assert [model for model, _ in calls] == ["primary"]
+    assert get_model_health("primary").stats()["hedges"] == 0
+
+
+def test_concurrent_hedges_are_capped(monkeypatch):
+    monkeypatch.setattr(llm, "_HEDGE_SLOTS", threading.BoundedSemaphore(1))
+    calls, _ = fake_chat(monkeypatch, slow=("primary", "backup"))
+    llm._HEDGE_SLOTS.acquire()  # another request's hedge holds the only slot
+    try:
+        with pytest.raises(DeadlineExceeded):
+            hedged_chat(None, MESSAGES, "primary", cache=False, deadline=0.3)
+    finally:
+        llm._HEDGE_SLOTS.release()
+    assert [model for model, _ in calls] == ["primary"]
+
+
+def test_long_generations_run_unhedged_on_the_caller_thread(monkeypatch):
+    calls, _ = fake_chat(monkeypatch)
+    hedged_chat(None, MESSAGES, "primary", max_tokens=llm.HEDGE_MAX_TOKENS + 1, cache=False)
+    assert calls == [("primary", threading.current_thread().name)]
+
+
+def test_breaker_opens_after_consecutive_failures_and_half_opens(monkeypatch):
+    monkeypatch.setattr(llm, "BREAKER_COOLDOWN", 0.05)
+    health = ModelHealth("primary")
+    for _ in range(llm.BREAKER_FAILURES - 1):
+        health.record_failure()
+    assert health.allow() and health.stats()["state"] == "closed"
+
+    health.record_failure()
+    assert health.stats()["state"] == "open" and not health.allow()
+
+    time.sleep(0.06)
+    assert health.stats()["state"] == "half-open"
+    # One probe call is let through; others wait for its outcome
+    assert health.allow() and not health.allow()
+    health.record_success(0.1)
+    assert health.stats()["state"] == "closed" and health.allow()
+
+
+def test_failed_probe_reopens_the_breaker(monkeypatch):
+    monkeypatch.setattr(llm, "BREAKER_COOLDOWN", 0.05)
+    health = ModelHealth("primary")
+    for _ in range(llm.BREAKER_FAILURES):
+        health.record_failure()
+    time.sleep(0.06)
+    assert health.allow()
+    health.record_failure()
+    assert health.stats()["state"] == "open" and not health.allow()
+
+
+def test_open_breaker_routes_to_the_next_model(monkeypatch):
+    calls, _ = fake_chat(monkeypatch)
+    for _ in range(llm.BREAKER_FAILURES):
+        get_model_health("primary").record_failure()
+    assert hedged_chat(None, MESSAGES, "primary", hedge=False, cache=False) == "answer from backup"
+
+
+def test_rate_limits_do_not_trip_the_breaker(monkeypatch):
+    fake_chat(monkeypatch, fail=requests.HTTPError("429 Too Many Requests: slow down"))
+    for _ in range(llm.BREAKER_FAILURES + 2):
+        with pytest.raises(requests.HTTPError):
+            hedged_chat(None, MESSAGES, "primary", hedge=False, cache=False)
+    assert get_model_health("primary").stats()["state"] == "closed"
+
+
+def test_server_errors_trip_the_breaker(monkeypatch):
+    fake_chat(monkeypatch, fail=requests.HTTPError("503 Service Unavailable: overloaded"))
+    for _ in range(llm.BREAKER_FAILURES):
+        with pytest.raises(requests.HTTPError):
+            hedged_chat(None, MESSAGES, "primary", hedge=False, cache=False)
+    assert get_model_health("primary").stats()["state"] == "open"
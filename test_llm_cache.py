@@ -0,0 +1,101 @@
+"""Tests for the persistent LLM response cache (`utils.llm_cache`)."""
+
+from utils.llm_cache import ResponseCache, request_key
+from utils.llm_providers import groq_chat
+
+MESSAGES = [{"role": "user", "content": "Summarize this resume in one line."}]
+
+
+def test_request_key_ignores_key_order():
+    a = {"model": "m", "messages": MESSAGES, "temperature": 0.2}
+    b = {"temperature": 0.2, "messages": MESSAGES, "model": "m"}
+    assert request_key(a) == request_key(b)
+    assert request_key(a) != request_key(dict(a, temperature=0.3))
+
+
+def test_get_set_and_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), enabled=True)
+    cache.set("k", "answer")
+    assert cache.get("k") == "answer"
+    cache.set("old", "stale", ttl=-1)
+    assert cache.get("old") is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), max_bytes=300, enabled=True)
+    for i in range(3):
+        cache.set(f"k{i}", "x" * 100)
+    cache.get("k0")  # k1 is now the least recently used
+    cache.set("k3", "x" * 100)
+    assert cache.get("k1") is None
+    assert cache.get("k0") == "x" * 100
+    assert cache.stats()["bytes"] <= 300
+
+
+def test_replacing_an_entry_keeps_the_byte_count_exact(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), max_bytes=1000, enabled=True)
+    for _ in range(20):
+        cache.set("k", "x" * 100)
+    assert cache._approx_bytes == cache.stats()["bytes"] == 100
+    cache.set("k2", "y" * 100)
+    assert cache.get("k") == "x" * 100  # nothing evicted early
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), enabled=False)
+    cache.set("k", "answer")
+    assert cache.get("k") is None
+
+
+def test_identical_requests_hit_the_api_once(standin, api_key, response_cache):
+    server = standin()
+    first = groq_chat(api_key, MESSAGES)
+    assert groq_chat(api_key, MESSAGES) == first
+    assert server.stats["requests"] == 1
+    assert response_cache.hits == 1
+
+    # cache=False asks for a fresh sample
+    groq_chat(api_key, MESSAGES, cache=False)
+    assert server.stats["requests"] == 2
+
+
+def test_answers_are_keyed_by_endpoint(standin, api_key):
+    first = standin()
+    groq_chat(api_key, MESSAGES)
+    second = standin()
+    groq_chat(api_key, MESSAGES)
+    assert first.stats["requests"] == 1
+    assert second.stats["requests"] == 1
+
+
+def test_forget_cached_drops_an_unusable_answer(standin, api_key):
+    from utils.llm import forget_cached
+
+    server = standin()
+    fmt = {"type": "json_object"}
+    groq_chat(api_key, MESSAGES, model="openai/gpt-oss-20b", response_format=fmt)
+    forget_cached(MESSAGES, "openai/gpt-oss-20b", response_format=fmt)
+    groq_chat(api_key, MESSAGES, model="openai/gpt-oss-20b", response_format=fmt)
+    assert server.stats["requests"] == 2
+
+
+def test_unparseable_json_is_not_served_from_cache(standin, api_key, monkeypatch):
+    from utils import llm_standin
+    from agents.resume_analyzer import ResumeAnalyzer
+
+    monkeypatch.setattr(llm_standin, "SYNTHESIZERS", list(llm_standin.SYNTHESIZERS))
+    llm_standin.register_synthesizer("<broken>", lambda prompt, rng: "no JSON here")
+    llm_standin.register_synthesizer("<good>", lambda prompt, rng: '{"ok": true}')
+    server = standin()
+    analyzer = ResumeAnalyzer(api_key, model="openai/gpt-oss-20b")
+
+    broken = [{"role": "user", "content": "Answer as <broken>."}]
+    assert analyzer.llm_json(broken, dict) is None
+    assert analyzer.llm_json(broken, dict) is None
+    assert server.stats["requests"] == 2
+
+    good = [{"role": "user", "content": "Answer as <good>."}]
+    assert analyzer.llm_json(good, dict) == {"ok": True}
+    assert analyzer.llm_json(good, dict) == {"ok": True}
+    assert server.stats["requests"] == 3
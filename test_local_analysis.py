@@ -0,0 +1,64 @@
+"""Tests for LLM-free skill scoring (`ResumeAnalyzer.local_skill_analysis`)."""
+
+import numpy as np
+import pytest
+
+from agents.resume_analyzer import LOCAL_SIM_CEIL, LOCAL_SIM_FLOOR, ResumeAnalyzer, calibrate_local_scores
+from test_vector_store import HashEmbeddings
+
+RESUME = """Experience
+- Built data pipelines in Python and Airflow
+- Wrote Python services deployed with Docker
+"""
+
+
+def test_calibration_blends_similarity_and_mentions():
+    scores = calibrate_local_scores([LOCAL_SIM_CEIL, LOCAL_SIM_FLOOR, LOCAL_SIM_FLOOR, 0.0], [2, 2, 0, 0])
+    assert scores.tolist() == [10, 4, 0, 0]
+    # Mentions past two add nothing
+    assert calibrate_local_scores([LOCAL_SIM_CEIL], [9]).tolist() == [10]
+
+
+def test_unmentioned_skills_are_capped_at_partial_evidence():
+    assert calibrate_local_scores([1.0], [0]).tolist() == [5]
+
+
+def test_calibration_works_on_matrices():
+    scores = calibrate_local_scores(np.full((3, 2), LOCAL_SIM_CEIL), np.array([[2, 0]] * 3))
+    assert scores.shape == (3, 2)
+    assert scores.tolist() == [[10, 5]] * 3
+
+
+@pytest.fixture
+def analyzer(tmp_path, api_key):
+    analyzer = ResumeAnalyzer(api_key, vector_cache_dir=str(tmp_path / "vectors"))
+    analyzer._embeddings = HashEmbeddings()
+    return analyzer
+
+
+def test_local_analysis_makes_no_llm_calls(analyzer, standin):
+    server = standin()
+    result = analyzer.local_skill_analysis(RESUME, ["Python", "Docker", "Kubernetes"])
+    assert server.stats["requests"] == 0
+    scores = result["skill_scores"]
+    assert list(scores) == ["Python", "Docker", "Kubernetes"]
+    assert scores["Python"] > scores["Kubernetes"] and scores["Docker"] > scores["Kubernetes"]
+    assert scores["Kubernetes"] <= 5 and "Kubernetes" in result["missing_skills"]
+    assert result["skill_reasoning"]["Python"].startswith("Local estimate")
+    assert analyzer.resume_strengths == result["strengths"]
+
+
+def test_mentions_use_canonical_names(analyzer):
+    hits = analyzer.skill_mentions("Node.js and node; Golang and Go", ["Node.js", "Go", "Rust"])
+    assert hits.tolist() == [2, 2, 0]
+
+
+def test_lexical_hits_are_used_when_embeddings_fail(analyzer):
+    class Broken:
+        def embed_documents(self, texts):
+            raise RuntimeError("no model")
+
+    analyzer._embeddings = Broken()
+    result = analyzer.local_skill_analysis(RESUME, ["Python", "Kubernetes"])
+    assert result["skill_scores"]["Python"] > result["skill_scores"]["Kubernetes"] == 0
+    assert "similarity 0.00" in result["skill_reasoning"]["Python"]
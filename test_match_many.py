@@ -0,0 +1,91 @@
+"""Tests for matching one resume against many job descriptions (`ResumeAnalyzer.match_many`)."""
+
+import re
+
+import pytest
+
+from agents import resume_analyzer
+from agents.resume_analyzer import ResumeAnalyzer
+from test_vector_store import HashEmbeddings
+from utils import llm_standin, skill_ontology
+from utils.skill_evidence import SkillEvidenceCache
+from utils.structured_output import JOB_SKILLS_FORMAT, SKILL_SCORES_FORMAT
+
+RESUME = """Experience
+- Built data pipelines in Python and Airflow, deployed with Docker
+- Wrote Python services on AWS
+"""
+
+JDS = [
+    "Frontend role: React, TypeScript and Figma",
+    "Data engineer: Python, Airflow and Docker on AWS",
+    {"title": "Platform engineer", "description": "Python and Kubernetes on AWS"},
+]
+
+
+@pytest.fixture
+def analyzer(tmp_path, api_key, monkeypatch):
+    monkeypatch.setattr(skill_ontology, "SKILL_ONTOLOGY_EMBEDDINGS", False)
+    analyzer = ResumeAnalyzer(api_key, vector_cache_dir=str(tmp_path / "vectors"))
+    analyzer._embeddings = HashEmbeddings()
+    analyzer.evidence_cache = SkillEvidenceCache(str(tmp_path / "evidence.sqlite3"), enabled=False)
+    analyzer.resume_text = RESUME
+    return analyzer
+
+
+def test_local_matching_ranks_best_fit_first(analyzer, standin):
+    server = standin()
+    ranked = analyzer.match_many(JDS, intensity="local")
+    assert server.stats["requests"] == 0
+    assert [r["index"] for r in ranked] == [1, 2, 0]
+    assert ranked[0]["skill_scores"].keys() == {"Python", "Airflow", "Docker", "AWS"}
+    assert ranked[1]["job"] is JDS[2]
+    assert "React" in ranked[2]["missing_skills"]
+    assert analyzer.match_many([], intensity="local") == [] and analyzer.match_many(JDS, resume_text="") == []
+
+
+def _record_scored_skills(monkeypatch):
+    scored = []
+
+    def skill_scores(prompt, rng):
+        skills = [s.strip() for s in re.findall(r"^Skills: (.+)$", prompt, re.MULTILINE)[-1].split(",")]
+        scored.append(skills)
+        return llm_standin._skill_scores(prompt, rng)
+
+    monkeypatch.setattr(llm_standin, "SYNTHESIZERS", list(llm_standin.SYNTHESIZERS))
+    llm_standin.register_synthesizer(SKILL_SCORES_FORMAT, skill_scores)
+    return scored
+
+
+def test_shared_skills_are_scored_once(analyzer, standin, monkeypatch):
+    scored = _record_scored_skills(monkeypatch)
+    server = standin()
+    ranked = analyzer.match_many(JDS, intensity="quick")
+    # Heuristic JD extraction, then one call scoring the union of the JD skills
+    assert server.stats["requests"] == 1
+    assert len(scored) == 1 and len(scored[0]) == len(set(scored[0]))
+    assert scored[0].count("Python") == 1 and scored[0].count("AWS") == 1
+    assert {r["index"] for r in ranked} == {0, 1, 2}
+
+    # Skills scored for this resume are not sent again
+    analyzer.match_many(JDS[1:], intensity="quick")
+    assert server.stats["requests"] == 1
+
+
+def test_full_matching_extracts_jd_skills_in_batches(analyzer, standin, monkeypatch):
+    monkeypatch.setattr(resume_analyzer, "JD_SKILL_BATCH", 2)
+    batches = []
+
+    def job_skills(prompt, rng):
+        batches.append(len(re.findall(r"^Job \d+:$", prompt, re.MULTILINE)))
+        return llm_standin._job_skills(prompt, rng)
+
+    monkeypatch.setattr(llm_standin, "SYNTHESIZERS", list(llm_standin.SYNTHESIZERS))
+    llm_standin.register_synthesizer(JOB_SKILLS_FORMAT, job_skills)
+    standin()
+    ranked = analyzer.match_many(JDS, intensity="full")
+    assert sorted(batches) == [1, 2]
+    assert len(ranked) == 3
+    assert all(r["skill_scores"] for r in ranked)
+    scores = [r["overall_score"] for r in ranked]
+    assert scores == sorted(scores, reverse=True)
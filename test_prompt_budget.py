@@ -0,0 +1,62 @@
+"""Tests for token-budget-aware prompt assembly (`utils.prompt_budget`)."""
+
+from utils.llm import DEFAULTS
+from utils.prompt_budget import (
+    SAFETY_MARGIN, PromptBuilder, clamp_tokens, context_window, count_tokens, max_completion_tokens,
+)
+
+MODEL = DEFAULTS["groq"]
+
+WORDS = " ".join(f"word{i}" for i in range(400))
+
+
+def test_clamp_keeps_the_requested_end():
+    head = clamp_tokens(WORDS, 20, MODEL)
+    tail = clamp_tokens(WORDS, 20, MODEL, keep="tail")
+    assert count_tokens(head, MODEL) <= 20 and WORDS.startswith(head)
+    assert count_tokens(tail, MODEL) <= 20 and WORDS.endswith(tail)
+    assert clamp_tokens("short", 20, MODEL) == "short"
+    assert clamp_tokens(None, 20, MODEL) == "" and clamp_tokens(WORDS, 0, MODEL) == ""
+
+
+def test_budget_is_bounded_by_the_context_window():
+    builder = PromptBuilder(MODEL, max_completion=10**9, budget=10**9)
+    assert builder.max_completion == max_completion_tokens(MODEL)
+    assert builder.budget == context_window(MODEL) - builder.max_completion - SAFETY_MARGIN
+    assert PromptBuilder(MODEL, budget=100).budget == 100
+
+
+def test_segments_fit_without_trimming():
+    plan = PromptBuilder(MODEL, budget=1000).add("Intro. ", priority=100).add("Resume. ", priority=10).build()
+    assert plan.prompt == "Intro. Resume. "
+    assert plan.truncated == [] and plan.dropped == []
+
+
+def test_low_priority_segments_are_trimmed_first():
+    instructions = "Score the resume against the job description."
+    budget = count_tokens(instructions, MODEL) + 30
+    plan = (
+        PromptBuilder(MODEL, budget=budget)
+        .add(instructions, priority=100, name="instructions")
+        .add(WORDS, priority=10, name="resume")
+        .add(WORDS, priority=50, name="jd", keep="tail")
+        .build()
+    )
+    # The job description fills the remaining budget before the resume gets any
+    assert plan.truncated == ["jd"] and plan.dropped == ["resume"]
+    # Segments keep the order they were added in, whatever their priority
+    assert plan.prompt.startswith(instructions)
+    assert plan.prompt.endswith(WORDS[-20:])
+    assert plan.prompt_tokens <= budget + 1
+
+
+def test_segment_cap_applies_within_the_budget():
+    plan = PromptBuilder(MODEL, budget=1000).add(WORDS, priority=10, max_tokens=25, name="resume").build()
+    assert plan.truncated == ["resume"]
+    assert count_tokens(plan.prompt, MODEL) <= 25
+
+
+def test_empty_segments_are_ignored():
+    plan = PromptBuilder(MODEL, budget=100).add("", priority=100).add(None).add("kept").build()
+    assert plan.prompt == "kept"
+    assert plan.dropped == []
@@ -0,0 +1,97 @@
+"""Tests for the header-driven rate limiter (`utils.rate_limit`)."""
+
+import time
+
+import pytest
+
+from utils.deadline import DeadlineExceeded
+from utils.llm_providers import groq_chat
+from utils.rate_limit import RateLimiter, get_limiter, parse_duration
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("2m59.56s", 179.56),
+    ("7.66s", 7.66),
+    ("120ms", 0.12),
+    ("12", 12.0),
+    (3, 3.0),
+    ("", None),
+    (None, None),
+    ("soon", None),
+])
+def test_parse_duration(value, seconds):
+    if seconds is None:
+        assert parse_duration(value) is None
+    else:
+        assert parse_duration(value) == pytest.approx(seconds)
+
+
+def _headers(remaining_requests, reset="10s", limit_requests=10, remaining_tokens=10000):
+    return {
+        "x-ratelimit-limit-requests": str(limit_requests),
+        "x-ratelimit-remaining-requests": str(remaining_requests),
+        "x-ratelimit-reset-requests": reset,
+        "x-ratelimit-limit-tokens": "10000",
+        "x-ratelimit-remaining-tokens": str(remaining_tokens),
+        "x-ratelimit-reset-tokens": reset,
+    }
+
+
+def test_unknown_budget_does_not_wait():
+    limiter = RateLimiter()
+    assert limiter.acquire(500) < 0.01
+    assert limiter.stats()["waits"] == 0
+
+
+def test_budget_follows_headers():
+    limiter = RateLimiter()
+    limiter.update_from_headers(_headers(remaining_requests=3, remaining_tokens=800))
+    stats = limiter.stats()
+    assert stats["requests_remaining"] == 3
+    assert stats["tokens_remaining"] == 800
+
+
+def test_exhausted_budget_waits_for_refill():
+    limiter = RateLimiter()
+    # One request per 0.2s refills the empty bucket quickly
+    limiter.update_from_headers(_headers(remaining_requests=0, reset="2s"))
+    waited = limiter.acquire(1)
+    assert 0.1 < waited < 1.0
+
+
+def test_wait_longer_than_timeout_fails_fast():
+    limiter = RateLimiter()
+    limiter.update_from_headers(_headers(remaining_requests=0, reset="60s"))
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        limiter.acquire(1, timeout=0.5)
+    assert time.monotonic() - start < 0.5
+
+
+def test_block_for_holds_every_caller():
+    limiter = RateLimiter()
+    limiter.block_for(0.3)
+    assert limiter.acquire(1) >= 0.25
+
+
+def test_limiter_is_shared_per_key_and_model():
+    assert get_limiter("k", "m") is get_limiter("k", "m")
+    assert get_limiter("k", "m") is not get_limiter("k", "other")
+
+
+def test_calls_are_paced_by_the_advertised_budget(standin, api_key):
+    standin(rpm=2)
+    groq_chat(api_key, [{"role": "user", "content": "one"}])
+    groq_chat(api_key, [{"role": "user", "content": "two"}])
+    # The stand-in reported no requests left this minute: the next call queues instead of
+    # drawing a 429, and gives up as soon as the wait is known to outlast its deadline
+    with pytest.raises(DeadlineExceeded):
+        groq_chat(api_key, [{"role": "user", "content": "three"}], deadline=1.0)
+
+
+def test_429_is_retried_after_the_hinted_delay(standin, api_key):
+    server = standin(rate_429=0.5, retry_after_s=1, seed=3)
+    answer = groq_chat(api_key, [{"role": "user", "content": "retry me"}])
+    assert answer
+    assert server.stats["injected_429"] >= 1
+    assert server.stats["requests"] == server.stats["injected_429"] + 1
@@ -0,0 +1,78 @@
+"""Tests for the shared resume digest (`utils.resume_digest`)."""
+
+from utils import resume_digest
+from utils.resume_digest import build_resume_digest, cached_resume_digest, digest_to_text
+
+RESUME = """Jane Doe
+Summary
+Backend engineer focused on data platforms.
+
+Skills
+Languages: Python, Go, SQL
+Tools: Docker | Kubernetes; Python
+
+Experience
+Senior Software Engineer, Acme Corp  Jan 2020 - Present
+- Reduced p95 latency by 40% across 12 services
+- Built data pipelines in Python and Airflow
+- Built data pipelines in Python and Airflow.
+Software Engineer Intern, Beta Labs  2018 - 2019
+- Wrote internal tooling for the ops team
+
+Education
+B.Tech Computer Science, Example University, 2018
+"""
+
+
+def test_digest_extracts_each_section():
+    digest = build_resume_digest(RESUME)
+    assert digest["summary"] == "Backend engineer focused on data platforms."
+    assert digest["skills"] == ["Python", "Go", "SQL", "Docker", "Kubernetes"]
+    assert digest["roles"] == ["Senior Software Engineer, Acme Corp Jan 2020 - Present",
+                               "Software Engineer Intern, Beta Labs 2018 - 2019"]
+    assert digest["education"] == ["B.Tech Computer Science, Example University, 2018"]
+    assert digest["source_chars"] == len(RESUME)
+
+
+def test_achievements_are_deduplicated_with_metrics_first():
+    achievements = build_resume_digest(RESUME)["achievements"]
+    assert achievements[0] == "Reduced p95 latency by 40% across 12 services"
+    assert achievements.count("Built data pipelines in Python and Airflow") == 1
+    assert len(achievements) == 3
+    assert build_resume_digest(RESUME)["metrics"] == ["40% across"]
+
+
+def test_known_skills_come_first_and_are_not_repeated():
+    skills = build_resume_digest(RESUME, skills=["Terraform", "python"])["skills"]
+    assert skills[:2] == ["Terraform", "python"]
+    assert "Python" not in skills
+
+
+def test_digest_text_covers_every_part_and_can_be_clamped():
+    digest = build_resume_digest(RESUME)
+    text = digest_to_text(digest)
+    for label in ("Summary:", "Skills:", "Roles:", "Achievements:", "Metrics:", "Education:"):
+        assert label in text
+    assert len(digest_to_text(digest, max_tokens=10)) < len(text)
+    assert digest_to_text({}) == ""
+
+
+def test_cached_digest_builds_once_per_hash(monkeypatch):
+    monkeypatch.setattr(resume_digest, "_DIGESTS", type(resume_digest._DIGESTS)())
+    monkeypatch.setattr(resume_digest, "DIGEST_CACHE_SIZE", 2)
+    builds = []
+
+    def build(text):
+        builds.append(text)
+        return build_resume_digest(text)
+
+    first = cached_resume_digest("h1", lambda: build(RESUME))
+    assert cached_resume_digest("h1", lambda: build(RESUME)) is first
+    assert len(builds) == 1
+
+    # Least recently used entries are evicted beyond the size limit
+    cached_resume_digest("h2", lambda: build("Experience\n- Led a team of 5"))
+    cached_resume_digest("h1", lambda: build(RESUME))
+    cached_resume_digest("h3", lambda: build("Education\nMSc Physics, 2015"))
+    assert list(resume_digest._DIGESTS) == [("h1", resume_digest.DIGEST_VERSION), ("h3", resume_digest.DIGEST_VERSION)]
+    assert len(builds) == 3
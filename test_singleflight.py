@@ -0,0 +1,103 @@
+"""Tests for single-flight coalescing (`utils.singleflight`)."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.deadline import DeadlineExceeded
+from utils.llm_providers import groq_chat
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flights.do, "key", work) for _ in range(4)]
+        while flights.stats()["coalesced"] < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [f.result(5) for f in futures]
+
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+    assert flights.stats() == {"leaders": 1, "coalesced": 3, "retried": 0}
+
+
+def test_leader_exception_reaches_every_waiter():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def work():
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flights.do, "key", work) for _ in range(3)]
+        while flights.stats()["coalesced"] < 2:
+            time.sleep(0.01)
+        release.set()
+        for f in futures:
+            with pytest.raises(ValueError):
+                f.result(5)
+
+
+def test_key_is_released_after_the_call():
+    flights = SingleFlight()
+    assert flights.do("key", lambda: 1) == 1
+    assert flights.do("key", lambda: 2) == 2
+    assert flights.stats()["leaders"] == 2
+
+
+def test_identical_in_flight_requests_send_one_http_call(standin, api_key):
+    server = standin(latency_ms=300)
+    messages = [{"role": "user", "content": "List three strengths of this resume."}]
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        answers = list(pool.map(lambda _: groq_chat(api_key, messages), range(5)))
+    assert len(set(answers)) == 1
+    assert server.stats["requests"] == 1
+
+
+def test_waiter_reruns_when_the_leader_fails_for_its_own_reasons():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def leader_work():
+        started.set()
+        release.wait(5)
+        raise TimeoutError("leader's own deadline")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, "key", leader_work, retry_on=(TimeoutError,))
+        started.wait(5)
+        follower = pool.submit(flights.do, "key", lambda: "fresh", retry_on=(TimeoutError,))
+        while flights.stats()["coalesced"] < 1:
+            time.sleep(0.01)
+        release.set()
+        with pytest.raises(TimeoutError):
+            leader.result(5)
+        assert follower.result(5) == "fresh"
+    assert flights.stats()["retried"] == 1
+
+
+def test_leader_deadline_does_not_fail_followers(standin, api_key):
+    server = standin(latency_ms=1000)
+    messages = [{"role": "user", "content": "Describe the candidate's leadership experience."}]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(groq_chat, api_key, messages, deadline=0.3)
+        time.sleep(0.1)
+        follower = pool.submit(groq_chat, api_key, messages)
+        with pytest.raises(DeadlineExceeded):
+            leader.result(10)
+        assert follower.result(10)
+    assert server.stats["requests"] == 2
@@ -0,0 +1,121 @@
+"""Tests for per-skill evidence reuse (`utils.skill_evidence`)."""
+
+import pytest
+
+from agents.resume_analyzer import ResumeAnalyzer
+from test_vector_store import HashEmbeddings
+from utils.deadline import Deadline
+from utils.skill_evidence import SkillEvidenceCache, evidence_key
+
+RESUME = """Summary
+Backend engineer building data platforms.
+
+Experience
+- Built data pipelines in Python and Airflow
+- Deployed services on AWS with Terraform
+
+Education
+BSc Computer Science, 2018
+"""
+
+
+def test_evidence_key_ignores_section_order():
+    assert evidence_key("u", "m", "score", "Python", ["a", "b"]) == evidence_key("u", "m", "score", "python", ["b", "a", "a"])
+
+
+def test_evidence_key_changes_with_its_inputs():
+    key = evidence_key("u", "m", "score", "Python", ["a", "b"])
+    assert key != evidence_key("u", "m", "score", "Python", ["a", "c"])
+    assert key != evidence_key("u", "m", "weakness", "Python", ["a", "b"])
+    assert key != evidence_key("other", "m", "score", "Python", ["a", "b"])
+    assert key != evidence_key("u", "other", "score", "Python", ["a", "b"])
+
+
+def test_put_many_and_get_many_round_trip(tmp_path):
+    cache = SkillEvidenceCache(str(tmp_path / "evidence.sqlite3"), enabled=True)
+    cache.put_many("score", {"k1": ({"score": 8, "reasoning": "used daily"}, ["a"]), "k2": ({"score": 3}, ["b"])})
+    assert cache.get_many(["k1", "k2", "k3"]) == {"k1": {"score": 8, "reasoning": "used daily"}, "k2": {"score": 3}}
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["hits"] == 2 and stats["misses"] == 1
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = SkillEvidenceCache(str(tmp_path / "evidence.sqlite3"), enabled=False)
+    cache.put_many("score", {"k": ({"score": 8}, ["a"])})
+    assert cache.get_many(["k"]) == {}
+
+
+@pytest.fixture
+def analyzer_factory(tmp_path, api_key):
+    """Analyzers sharing one evidence cache in `tmp_path`, with hashing embeddings."""
+    cache = SkillEvidenceCache(str(tmp_path / "evidence.sqlite3"), enabled=True)
+
+    def make():
+        analyzer = ResumeAnalyzer(api_key, user_id=1, vector_cache_dir=str(tmp_path / "vectors"))
+        analyzer._embeddings = HashEmbeddings()
+        analyzer.evidence_cache = cache
+        return analyzer
+
+    return make
+
+
+def test_unchanged_sections_reuse_their_scores(standin, analyzer_factory):
+    server = standin()
+    skills = ["Python", "Terraform"]
+    first = analyzer_factory().semantic_skill_analysis(RESUME, skills)
+    assert "reused_skills" not in first
+    calls = server.stats["requests"]
+
+    # The summary names neither skill, so both keep their stored scores
+    revised = RESUME.replace("Backend engineer", "Senior backend engineer")
+    second = analyzer_factory().semantic_skill_analysis(revised, skills)
+    assert second["reused_skills"] == skills
+    assert second["skill_scores"] == first["skill_scores"]
+    assert server.stats["requests"] == calls
+
+
+def test_edited_evidence_is_scored_again(standin, analyzer_factory):
+    server = standin()
+    analyzer_factory().semantic_skill_analysis(RESUME, ["Python"])
+    calls = server.stats["requests"]
+
+    revised = RESUME.replace("Python and Airflow", "Python, Spark and Airflow")
+    result = analyzer_factory().semantic_skill_analysis(revised, ["Python"])
+    assert "reused_skills" not in result
+    assert server.stats["requests"] == calls + 1
+
+
+def _weakness_analyzer(make, missing):
+    analyzer = make()
+    analyzer.resume_text = RESUME
+    analyzer.extracted_skills = missing
+    analyzer.analysis_result = {"missing_skills": missing}
+    return analyzer
+
+
+def test_pending_weaknesses_are_not_stored(analyzer_factory):
+    analyzer = _weakness_analyzer(analyzer_factory, ["Kubernetes", "Go"])
+    expired = Deadline(0.0)
+    weaknesses = analyzer.analyze_resume_weaknesses(deadline=expired)
+    assert all(w.get("pending") for w in weaknesses)
+    assert analyzer.evidence_cache.stats()["entries"] == 0
+
+
+def test_skipped_skills_are_not_stored(standin, analyzer_factory, monkeypatch):
+    from utils import llm_standin
+    from utils.structured_output import WEAKNESSES_FORMAT
+
+    # The model answers for Kubernetes only; Go gets a placeholder that must not be reused
+    monkeypatch.setattr(llm_standin, "SYNTHESIZERS", list(llm_standin.SYNTHESIZERS))
+    llm_standin.register_synthesizer(
+        WEAKNESSES_FORMAT,
+        lambda prompt, rng: '{"Kubernetes": {"detail": "No cluster work shown.", "suggestions": [], "example": ""}}',
+    )
+    standin()
+    analyzer = _weakness_analyzer(analyzer_factory, ["Kubernetes", "Go"])
+    weaknesses = analyzer.analyze_resume_weaknesses()
+    assert [w["skill"] for w in weaknesses] == ["Kubernetes", "Go"]
+    assert analyzer.evidence_cache.stats()["entries"] == 1
+
+    again = _weakness_analyzer(analyzer_factory, ["Kubernetes", "Go"]).analyze_resume_weaknesses()
+    assert again[0]["detail"] == "No cluster work shown."
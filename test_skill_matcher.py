@@ -0,0 +1,37 @@
+"""Tests for the precompiled skill-vocabulary matcher (`utils.skill_matcher`)."""
+
+from utils.skill_matcher import SKILL_MATCHER, SkillMatcher, find_skills
+
+
+def test_matches_need_token_boundaries():
+    assert find_skills("A good rustic role writing javascripts") == []
+    assert find_skills("Python, Django and PostgreSQL") == ["python", "django", "postgresql"]
+
+
+def test_symbols_are_part_of_the_term():
+    assert find_skills("C++ and C# engineers, some C") == ["c++", "c#", "c"]
+    assert find_skills("Deploy with Node.js and CI/CD") == ["node.js", "ci/cd"]
+
+
+def test_longest_term_wins_and_spacing_is_normalised():
+    assert find_skills("Spring   Boot services") == ["spring boot"]
+    assert find_skills("Ruby on Rails and plain Ruby") == ["ruby on rails", "ruby"]
+
+
+def test_ambiguous_terms_only_count_in_skill_case():
+    assert find_skills("We go fast, r and c are letters") == []
+    assert find_skills("Go, GO and R services") == ["go", "r"]
+    # Abbreviations built from single letters are not languages
+    assert find_skills("R&D for C-level staff") == []
+
+
+def test_other_terms_ignore_case_and_keep_first_appearance_order():
+    assert find_skills("DOCKER then aws then docker") == ["docker", "aws"]
+    spans = SKILL_MATCHER.find_all("Use Kafka")
+    assert spans == [(4, 9, "kafka")]
+
+
+def test_custom_vocabulary_and_case_rules():
+    matcher = SkillMatcher(["Go", "data warehouse"], case_sensitive={})
+    assert matcher.find_skills("go build a Data  Warehouse") == ["go", "data warehouse"]
+    assert matcher.find_skills("") == []
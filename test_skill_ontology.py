@@ -0,0 +1,33 @@
+"""Tests for skill canonicalization (`utils.skill_ontology`)."""
+
+from utils.skill_ontology import canonicalize, canonicalize_skills, skill_category, skill_id
+
+
+def test_aliases_map_to_one_display_name():
+    for spelling in ("node", "Node.js", "NodeJS", "node-js", "Node JS"):
+        assert canonicalize(spelling, fuzzy=False) == "Node.js"
+    assert canonicalize("k8s", fuzzy=False) == "Kubernetes"
+    assert canonicalize("postgres", fuzzy=False) == "PostgreSQL"
+    assert canonicalize("c++", fuzzy=False) == "C++" and canonicalize("C#", fuzzy=False) == "C#"
+
+
+def test_parenthesised_abbreviations_resolve():
+    assert canonicalize("Natural Language Processing (NLP)", fuzzy=False) == "NLP"
+    # A parenthesised list of examples is a group, not one skill
+    assert skill_id("Testing (Jest, Cypress)", fuzzy=False) is None
+
+
+def test_unknown_skills_are_tidied_not_dropped():
+    assert skill_id("Underwater basket weaving", fuzzy=False) is None
+    assert canonicalize("  Underwater   basket weaving. ", fuzzy=False) == "Underwater basket weaving"
+
+
+def test_canonicalize_skills_dedupes_in_order():
+    skills = ["python3", "Kubernetes", "Python", "k8s", "", "Go", "golang"]
+    assert canonicalize_skills(skills, fuzzy=False) == ["Python", "Kubernetes", "Go"]
+
+
+def test_categories_come_from_the_ontology():
+    assert skill_category("postgres") == "database"
+    assert skill_category("golang") == "language"
+    assert skill_category("Underwater basket weaving") is None
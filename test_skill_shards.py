@@ -0,0 +1,70 @@
+"""Tests for sharded batch skill scoring (`ResumeAnalyzer.semantic_skill_analysis`)."""
+
+import json
+
+import pytest
+
+from agents import resume_analyzer
+from agents.resume_analyzer import ResumeAnalyzer
+from test_vector_store import HashEmbeddings
+from utils import llm_standin
+from utils.skill_evidence import SkillEvidenceCache
+from utils.structured_output import SKILL_SCORES_FORMAT
+
+RESUME = """Experience
+- Built data pipelines in Python and Airflow
+- Deployed services on AWS with Terraform
+"""
+
+SKILLS = [f"Skill{n:02d}" for n in range(40)]
+
+
+@pytest.fixture
+def analyzer(tmp_path, api_key):
+    analyzer = ResumeAnalyzer(api_key, vector_cache_dir=str(tmp_path / "vectors"))
+    analyzer._embeddings = HashEmbeddings()
+    analyzer.evidence_cache = SkillEvidenceCache(str(tmp_path / "evidence.sqlite3"), enabled=False)
+    return analyzer
+
+
+def test_shards_are_contiguous_balanced_and_within_budget(analyzer, monkeypatch):
+    monkeypatch.setattr(resume_analyzer, "SKILL_SHARD_MAX_TOKENS", 200)
+    shards = analyzer._skill_shards(SKILLS)
+    assert len(shards) > 1
+    assert [sk for shard in shards for sk in shard] == SKILLS
+    assert max(map(len, shards)) - min(map(len, shards)) <= 1
+    budget = 200 - 64
+    assert all(sum(analyzer._skill_answer_tokens(sk) for sk in shard) <= budget for shard in shards)
+
+
+def test_small_lists_are_one_shard(analyzer):
+    assert analyzer._skill_shards(SKILLS[:3]) == [SKILLS[:3]]
+    assert analyzer._skill_shards([]) == []
+
+
+def test_each_shard_is_one_call(analyzer, standin, monkeypatch):
+    monkeypatch.setattr(resume_analyzer, "SKILL_SHARD_MAX_TOKENS", 200)
+    server = standin()
+    result = analyzer.semantic_skill_analysis(RESUME, SKILLS)
+    assert server.stats["requests"] == len(analyzer._skill_shards(SKILLS))
+    assert list(result["skill_scores"]) == SKILLS
+    assert all(result["skill_reasoning"][sk] for sk in SKILLS)
+    assert "partial" not in result
+
+
+def test_skills_a_shard_drops_are_scored_one_by_one(analyzer, standin, monkeypatch):
+    skills = ["Python", "Terraform", "Kafka"]
+
+    def without_kafka(prompt, rng):
+        return json.dumps({"skill_scores": {"python": 9, "Terraform": "8/10"}, "skill_reasoning": {}})
+
+    monkeypatch.setattr(llm_standin, "SYNTHESIZERS", list(llm_standin.SYNTHESIZERS))
+    llm_standin.register_synthesizer(SKILL_SCORES_FORMAT, without_kafka)
+    llm_standin.register_synthesizer("how clearly does the candidate mention proficiency",
+                                     lambda prompt, rng: "3 - Only adjacent streaming work.")
+    server = standin()
+    result = analyzer.semantic_skill_analysis(RESUME, skills)
+    # Answers keyed in another case map back to the requested spelling
+    assert result["skill_scores"] == {"Python": 9, "Terraform": 8, "Kafka": 3}
+    assert result["skill_reasoning"]["Kafka"] == "Only adjacent streaming work."
+    assert server.stats["requests"] == 2
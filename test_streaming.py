@@ -0,0 +1,109 @@
+"""Tests for streamed completions (`groq_chat(stream=True)`, `groq_chat_stream_async`, SSE routes)."""
+
+import asyncio
+import json
+
+import pytest
+
+from agents import ResumeAnalysisAgent
+from agents.resume_improver import COVER_LETTER_RETRY_HINT, ResumeImprover
+from test_vector_store import HashEmbeddings
+from utils import llm_standin
+from utils.llm_providers import _iter_sse_deltas, aclose_async_client, groq_chat, groq_chat_stream_async
+
+MESSAGES = [{"role": "user", "content": "Summarize this resume in one paragraph."}]
+
+RESUME = """Experience
+- Built data pipelines in Python and Airflow
+- Deployed services on AWS with Terraform
+"""
+
+
+def _collect_async(agen):
+    async def run():
+        try:
+            return [delta async for delta in agen]
+        finally:
+            await aclose_async_client()
+    return asyncio.run(run())
+
+
+def test_sse_lines_are_parsed():
+    lines = [
+        b'data: {"choices": [{"delta": {"content": "Hello"}}]}',
+        "",
+        ": keep-alive",
+        "data: not json",
+        'data: {"choices": [{"delta": {}}]}',
+        'data: {"choices": [{"delta": {"content": " world"}}]}',
+        "data: [DONE]",
+        'data: {"choices": [{"delta": {"content": "late"}}]}',
+    ]
+    assert list(_iter_sse_deltas(lines)) == ["Hello", " world"]
+
+
+def test_stream_yields_deltas_and_fills_the_cache(standin, api_key):
+    server = standin()
+    deltas = list(groq_chat(api_key, MESSAGES, stream=True))
+    assert len(deltas) > 1
+    # The finished stream is cached under the same key as a plain call
+    assert groq_chat(api_key, MESSAGES) == "".join(deltas)
+    assert server.stats["requests"] == 1
+
+
+def test_async_stream_is_replayed_from_the_cache(standin, api_key):
+    server = standin()
+    first = _collect_async(groq_chat_stream_async(api_key, MESSAGES))
+    assert len(first) > 1
+    assert _collect_async(groq_chat_stream_async(api_key, MESSAGES)) == ["".join(first)]
+    assert server.stats["requests"] == 1
+
+
+@pytest.fixture
+def agent(tmp_path, api_key):
+    agent = ResumeAnalysisAgent(api_key, vector_cache_dir=str(tmp_path / "vectors"))
+    agent._embeddings = HashEmbeddings()
+    agent.resume_text = RESUME
+    return agent
+
+
+def test_short_streamed_cover_letter_is_retried(standin, agent, monkeypatch):
+    short, long_letter = "Dear team, hire me.", "Dear hiring team, " + "I built pipelines. " * 30
+    monkeypatch.setattr(llm_standin, "SYNTHESIZERS", list(llm_standin.SYNTHESIZERS))
+    llm_standin.register_synthesizer("tailored cover letter", lambda prompt, rng: short)
+    llm_standin.register_synthesizer(COVER_LETTER_RETRY_HINT.strip(), lambda prompt, rng: long_letter)
+    server = standin()
+
+    letter = "".join(ResumeImprover(agent).generate_cover_letter_stream("Acme", "Data Engineer"))
+    assert letter == long_letter
+    assert server.stats["requests"] == 2
+
+
+def test_long_streamed_cover_letter_is_not_retried(standin, agent):
+    server = standin()
+    deltas = list(ResumeImprover(agent).generate_cover_letter_stream("Acme", "Data Engineer"))
+    # The held-back head is released as one delta, the rest streams through
+    assert len(deltas) > 1
+    assert server.stats["requests"] == 1
+
+
+def test_ask_stream_route_sends_sse_events(standin, agent, monkeypatch):
+    import backend
+    from fastapi.testclient import TestClient
+
+    standin()
+    monkeypatch.setitem(backend.app.dependency_overrides, backend.get_user_agent, lambda: agent)
+    monkeypatch.setitem(backend.user_analysis_cache, 7, {"resume_text": RESUME})
+
+    response = TestClient(backend.app).post(
+        "/api/resume/ask/stream", params={"user_id": 7},
+        json={"question": "Which cloud does the candidate use?", "chat_history": []},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    payloads = [json.loads(event) for event in events[:-1]]
+    assert payloads and all("delta" in payload for payload in payloads)
+    assert "".join(payload["delta"] for payload in payloads).strip()
@@ -0,0 +1,85 @@
+"""Tests for tolerant JSON parsing of LLM answers (`utils.structured_output`)."""
+
+import json
+
+import requests
+
+from utils.structured_output import (
+    _close_truncated, _loads_lenient, extract_json, failed_generation, matches_schema, parse_json,
+    structured_output_stats,
+)
+
+SCORES = {"skill_scores": {"Python": 8, "Go": 3}}
+
+
+def test_fenced_output():
+    text = 'Here you go:\n```json\n{"skill_scores": {"Python": 8, "Go": 3}}\n```\nHope it helps!'
+    assert extract_json(text) == SCORES
+
+
+def test_prose_wrapped_output():
+    text = 'Sure! The scores are {"skill_scores": {"Python": 8, "Go": 3}} as requested.'
+    assert extract_json(text) == SCORES
+    # Braces inside strings do not end the value
+    assert extract_json('Result: {"reason": "uses {curly} braces", "n": 1} done') == {"reason": "uses {curly} braces", "n": 1}
+
+
+def test_trailing_commas_comments_and_smart_quotes():
+    text = """{
+        // scores out of ten
+        "skill_scores": {"Python": 8, "Go": 3,},
+    }"""
+    assert _loads_lenient(text) == SCORES
+    assert _loads_lenient("{“a”: [1, 2,]}") == {"a": [1, 2]}
+
+
+def test_python_literal_dicts():
+    assert _loads_lenient("{'Python': 8, 'remote': True, 'notes': None}") == {"Python": 8, "remote": True, "notes": None}
+    assert _loads_lenient("'just a string'") is None
+    assert _loads_lenient("not json at all") is None
+
+
+def test_truncated_objects_are_closed():
+    # The last member may be incomplete ("2" could have been "25"), so it is dropped
+    assert _close_truncated('{"a": 1, "b": [1, 2') == '{"a": 1, "b": [1]}'
+    assert json.loads(_close_truncated('{"a": 1, "b": "cut off he')) == {"a": 1}
+    truncated = '{"skill_scores": {"Python": 8, "Go": 3, "Rust": '
+    assert extract_json(truncated) == SCORES
+
+
+def test_expect_picks_the_value_type():
+    text = 'Skills: ["Python", "Go"] and scores {"Python": 8}'
+    assert extract_json(text) == ["Python", "Go"]
+    assert extract_json(text, expect=dict) == {"Python": 8}
+    assert extract_json(text, expect=list) == ["Python", "Go"]
+    assert extract_json('{"only": "an object"}', expect=list) is None
+    assert extract_json("") is None
+
+
+def test_schema_checks():
+    schema = {"skill_scores": dict, "skill_reasoning?": dict}
+    assert matches_schema(SCORES, schema)
+    assert not matches_schema({"skill_reasoning": {}}, schema)
+    assert not matches_schema({"skill_scores": [], "skill_reasoning": {}}, schema)
+    assert matches_schema([{"q": "x"}], [{"q": str}]) and not matches_schema([{"q": 1}], [{"q": str}])
+
+
+def test_parse_json_counts_repairs_and_saved_calls():
+    before = structured_output_stats()
+    assert parse_json(json.dumps(SCORES), {"skill_scores": dict}) == SCORES
+    assert parse_json("```json\n" + json.dumps(SCORES) + ",\n```", {"skill_scores": dict}, fallback_calls=3) == SCORES
+    assert parse_json('{"other": 1}', {"skill_scores": dict}) is None
+    assert parse_json('[{"question": "Why?"}]', [{"question": str}]) == [{"question": "Why?"}]
+    after = structured_output_stats()
+    assert after["parsed"] - before["parsed"] == 2
+    assert after["repaired"] - before["repaired"] == 1
+    assert after["calls_saved"] - before["calls_saved"] == 3
+    assert after["failed"] - before["failed"] == 1
+
+
+def test_failed_generation_is_read_from_json_mode_errors():
+    body = {"error": {"code": "json_validate_failed", "failed_generation": '{"Python": 8,}'}}
+    exc = requests.HTTPError("400 Bad Request: " + json.dumps(body))
+    assert failed_generation(exc) == '{"Python": 8,}'
+    assert failed_generation(requests.HTTPError("500 Internal Server Error: boom")) is None
+    assert failed_generation(ValueError("json_validate_failed")) is None
@@ -0,0 +1,28 @@
+"""Tests for text helpers (`utils.text_utils`)."""
+
+from utils.text_utils import _split_recursive, split_text
+
+TEXT = "\n\n".join(
+    f"Role {i}\n- Built service {i} in Python\n- Cut latency by {i * 10}% with caching" for i in range(8)
+)
+
+
+def test_chunks_fit_the_size_and_cover_the_text():
+    chunks = _split_recursive(TEXT, chunk_size=120, chunk_overlap=0)
+    assert len(chunks) > 1
+    assert all(len(c) <= 120 for c in chunks)
+    assert "".join(c.replace("\n", "") for c in chunks).replace(" ", "") == TEXT.replace("\n", "").replace(" ", "")
+
+
+def test_consecutive_chunks_overlap():
+    chunks = _split_recursive("one two three four five six seven eight", chunk_size=14, chunk_overlap=6)
+    assert chunks == ["one two three", "three four", "four five six", "six seven", "seven eight"]
+
+
+def test_oversized_words_are_cut():
+    assert _split_recursive("x" * 25, chunk_size=10, chunk_overlap=0) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_split_text_handles_empty_input():
+    assert split_text("", chunk_size=100) == []
+    assert split_text("short", chunk_size=100) == ["short"]
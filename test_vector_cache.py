@@ -0,0 +1,148 @@
+"""Tests for the on-disk vector cache manager (`utils.vector_cache`)."""
+
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.vector_cache import VectorCacheManager
+from utils.vector_store import NumpyVectorStore
+
+
+def _write_entry(root, rel, n_chunks=1):
+    path = os.path.join(root, *rel.split("/"))
+    texts = [f"chunk {i}" for i in range(n_chunks)]
+    NumpyVectorStore(texts, np.ones((n_chunks, 8), dtype=np.float32), None, model_id="test").save_local(path)
+    return path
+
+
+def _age(path, seconds=3600):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def _manager(root, **kwargs):
+    return VectorCacheManager(str(root), gc_interval=0, **kwargs)
+
+
+def test_record_evicts_least_recently_used_entries(tmp_path):
+    manager = _manager(tmp_path, max_entries=2)
+    a = _write_entry(tmp_path, "u1/h1/resume")
+    manager.record(a)
+    b = _write_entry(tmp_path, "u1/h2/resume")
+    manager.record(b)
+    time.sleep(0.01)
+    c = _write_entry(tmp_path, "u2/h3/resume")
+    manager.record(c)
+
+    assert not os.path.exists(a)
+    assert os.path.exists(b) and os.path.exists(c)
+    # Emptied parent directories go with the entry
+    assert not os.path.exists(os.path.join(tmp_path, "u1", "h1"))
+    stats = manager.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+
+
+def test_record_enforces_the_byte_budget(tmp_path):
+    entry = _write_entry(tmp_path, "u/h0/resume", n_chunks=50)
+    manager = _manager(tmp_path, max_bytes=int(os.path.getsize(os.path.join(entry, "vectors.npy")) * 1.5))
+    manager.record(entry)
+    newer = _write_entry(tmp_path, "u/h1/resume", n_chunks=50)
+    manager.record(newer)
+    assert not os.path.exists(entry)
+    assert os.path.exists(newer)
+
+
+def test_gc_removes_stale_partial_and_scratch_directories(tmp_path):
+    manager = _manager(tmp_path)
+    complete = _write_entry(tmp_path, "u/h1/resume")
+    partial = os.path.join(tmp_path, "u", "h2", "resume")
+    os.makedirs(partial)
+    scratch = _write_entry(tmp_path, "u/h3/resume.tmp-abc")
+    fresh_partial = os.path.join(tmp_path, "u", "h4", "resume")
+    os.makedirs(fresh_partial)
+    for path in (partial, scratch):
+        _age(path)
+
+    stats = manager.gc()
+
+    assert os.path.exists(complete)
+    assert not os.path.exists(partial) and not os.path.exists(scratch)
+    # A young incomplete entry may still be being written
+    assert os.path.exists(fresh_partial)
+    assert stats["removed"] == 2
+    # The complete entry written without `record` is adopted by the index
+    assert stats["entries"] == 1
+
+
+def test_gc_drops_index_rows_whose_directory_is_gone(tmp_path):
+    manager = _manager(tmp_path)
+    entry = _write_entry(tmp_path, "u/h1/resume")
+    manager.record(entry)
+    # Deleted behind the manager's back (e.g. by another worker)
+    shutil.rmtree(entry)
+    assert manager.gc()["entries"] == 0
+
+
+def test_build_lock_serializes_builders_of_one_entry(tmp_path):
+    manager = _manager(tmp_path)
+    path = os.path.join(tmp_path, "u", "h1", "resume")
+    builds, inside, overlap = [], [0], []
+
+    def build():
+        with manager.build_lock(path) as acquired:
+            assert acquired
+            inside[0] += 1
+            overlap.append(inside[0] > 1)
+            # Later builders find the first one's store and skip the work
+            if not NumpyVectorStore.exists(path):
+                time.sleep(0.1)
+                _write_entry(tmp_path, "u/h1/resume")
+                builds.append(1)
+            inside[0] -= 1
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: build(), range(4)))
+    assert builds == [1]
+    assert not any(overlap)
+
+
+def test_build_lock_times_out_instead_of_waiting_forever(tmp_path):
+    manager = _manager(tmp_path)
+    path = os.path.join(tmp_path, "u", "h1", "resume")
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with manager.build_lock(path):
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait(5)
+    try:
+        with manager.build_lock(path, timeout=0.2) as acquired:
+            assert acquired is False
+    finally:
+        release.set()
+        thread.join()
+    with manager.build_lock(path, timeout=0.2) as acquired:
+        assert acquired is True
+
+
+def test_concurrent_saves_publish_one_complete_store(tmp_path):
+    path = str(tmp_path / "store")
+
+    def save(n):
+        texts = [f"version {n} chunk {i}" for i in range(n + 1)]
+        NumpyVectorStore(texts, np.ones((n + 1, 8), dtype=np.float32), None, model_id="test").save_local(path)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(save, range(6)))
+    store = NumpyVectorStore.load_local(path, None)
+    assert store is not None and len(store) == store.vectors.shape[0]
+    assert os.listdir(tmp_path) == ["store"]
@@ -0,0 +1,84 @@
+"""Tests for the NumPy vector store (`utils.vector_store`)."""
+
+import hashlib
+import os
+
+import numpy as np
+
+from utils.vector_store import NumpyVectorStore, VectorStoreLRU
+
+
+class HashEmbeddings:
+    """Deterministic bag-of-words embeddings, so tests need no model download."""
+
+    def __init__(self, model_id="hash-64", dim=64):
+        self.model_id = model_id
+        self.dim = dim
+
+    def embed_documents(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, int(hashlib.md5(word.strip(",.").encode()).hexdigest(), 16) % self.dim] += 1
+        return vectors + 0.01
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+CHUNKS = [
+    "Built data pipelines in Python and Airflow",
+    "Led a team of five engineers",
+    "Deployed services on AWS with Terraform",
+]
+
+
+def test_similarity_search_ranks_the_closest_chunk_first():
+    store = NumpyVectorStore.from_texts(CHUNKS, HashEmbeddings())
+    docs = store.as_retriever(search_kwargs={"k": 2}).invoke("terraform aws")
+    assert len(docs) == 2
+    assert docs[0].page_content == CHUNKS[2]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "store")
+    NumpyVectorStore.from_texts(CHUNKS, HashEmbeddings(), metadatas=[{"i": i} for i in range(3)]).save_local(path)
+    loaded = NumpyVectorStore.load_local(path, HashEmbeddings())
+    assert loaded.texts == CHUNKS
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.similarity_search("team engineers", k=1)[0].metadata == {"i": 1}
+
+
+def test_load_rejects_other_models_and_missing_stores(tmp_path):
+    path = str(tmp_path / "store")
+    NumpyVectorStore.from_texts(CHUNKS, HashEmbeddings()).save_local(path)
+    assert NumpyVectorStore.load_local(path, HashEmbeddings(model_id="other")) is None
+    assert NumpyVectorStore.load_local(str(tmp_path / "missing"), HashEmbeddings()) is None
+
+
+def test_save_replaces_an_existing_store_without_leftovers(tmp_path):
+    path = str(tmp_path / "store")
+    NumpyVectorStore.from_texts(CHUNKS, HashEmbeddings()).save_local(path)
+    NumpyVectorStore.from_texts(CHUNKS[:1], HashEmbeddings()).save_local(path)
+    assert NumpyVectorStore.load_local(path, HashEmbeddings()).texts == CHUNKS[:1]
+    assert os.listdir(tmp_path) == ["store"]
+
+
+def test_empty_store():
+    store = NumpyVectorStore.from_texts([], HashEmbeddings())
+    assert len(store) == 0
+    assert store.similarity_search("python") == []
+
+
+def test_lru_evicts_by_bytes():
+    stores = [NumpyVectorStore.from_texts(CHUNKS, HashEmbeddings()) for _ in range(3)]
+    cache = VectorStoreLRU(max_bytes=2 * stores[0].nbytes)
+    cache.put("a", stores[0])
+    cache.put("b", stores[1])
+    assert cache.get("a") is stores[0]  # "b" is now the least recently used
+    cache.put("c", stores[2])
+    assert cache.get("b") is None
+    assert cache.get("a") is stores[0]
+    stats = cache.stats()
+    assert stats["stores"] == 2 and stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
@@ -1,14 +1,27 @@
 """Utility modules for Resume Tracking and AI Mock Interview system."""
 
-from .llm_providers import groq_chat, SESSION
+from .llm_providers import groq_chat, groq_chat_async, groq_chat_stream_async, SESSION
 from .text_utils import clamp_text, compute_hash
+from .prompt_budget import PromptBuilder, count_tokens, clamp_tokens
+from .skill_matcher import find_skills
+from .skill_ontology import canonicalize, canonicalize_skills
+from .embeddings import get_embeddings
 from .file_handlers import extract_text_from_pdf, extract_text_from_txt, extract_text_from_file
 
 __all__ = [
     'groq_chat',
+    'groq_chat_async',
+    'groq_chat_stream_async',
     'SESSION',
     'clamp_text',
     'compute_hash',
+    'PromptBuilder',
+    'count_tokens',
+    'clamp_tokens',
+    'find_skills',
+    'canonicalize',
+    'canonicalize_skills',
+    'get_embeddings',
     'extract_text_from_pdf',
     'extract_text_from_txt',
     'extract_text_from_file',
@@ -0,0 +1,66 @@
+"""Request-level deadlines shared by every call in a pipeline.
+
+A `Deadline` is created once per request (e.g. in a FastAPI route) and
+passed down through `ResumeAnalyzer` into `groq_chat`. HTTP timeouts,
+retry sleeps and queueing are capped by the time left, and once it runs
+out `DeadlineExceeded` is raised so callers can return partial results.
+"""
+
+import time
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request's time budget is used up."""
+
+
+class Deadline:
+    """Absolute point in (monotonic) time by which a request must finish."""
+
+    def __init__(self, seconds: float | None = None):
+        self.expires_at = None if seconds is None else time.monotonic() + max(0.0, float(seconds))
+
+    @classmethod
+    def coerce(cls, value) -> "Deadline | None":
+        """Accept a Deadline, a number of seconds, or None."""
+        if value is None or isinstance(value, Deadline):
+            return value
+        return cls(float(value))
+
+    def remaining(self) -> float | None:
+        """Seconds left (never negative), or None for an unbounded deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, what: str = "request") -> None:
+        """Raise `DeadlineExceeded` if the deadline has passed."""
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline exceeded before {what}")
+
+    def timeout(self, cap: float) -> float:
+        """Timeout for one blocking step: `cap`, shortened to the time left."""
+        self.check()
+        remaining = self.remaining()
+        return cap if remaining is None else min(cap, remaining)
+
+    def child(self) -> "Deadline":
+        """A deadline with the same expiry that can be cancelled without touching this one."""
+        child = Deadline()
+        child.expires_at = self.expires_at
+        return child
+
+    def cancel(self) -> None:
+        """Expire now, so the call holding this deadline stops at its next check (e.g. a losing hedge)."""
+        self.expires_at = time.monotonic()
+
+    def allows(self, seconds: float) -> bool:
+        """True if waiting `seconds` still leaves time before the deadline."""
+        remaining = self.remaining()
+        return remaining is None or seconds < remaining
+
+    def __repr__(self):
+        remaining = self.remaining()
+        return "Deadline(unbounded)" if remaining is None else f"Deadline({remaining:.2f}s left)"
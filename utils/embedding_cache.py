@@ -0,0 +1,72 @@
+"""Persistent, content-addressed cache for text embeddings.
+
+Vectors are keyed by a SHA-256 of (embedding model id, text) and stored as
+float32 blobs in a small SQLite database with size-bounded LRU eviction
+(see `utils.sqlite_lru`). Identical chunks from different users, resumes
+or revisions are embedded once.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+
+import numpy as np
+
+from .sqlite_lru import SQLiteLRU
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH") or os.path.join(".cache", "embeddings", "vectors.sqlite3")
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+EMBEDDING_CACHE_ENABLED = (os.getenv("EMBEDDING_CACHE_DISABLED") or "").lower() not in ("1", "true", "yes")
+
+
+def vector_key(model_id: str, text: str) -> str:
+    """Content address of one text under one embedding model."""
+    return hashlib.sha256(f"{model_id}\n{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache(SQLiteLRU):
+    """(model, text) -> float32 vector."""
+
+    table = "vectors"
+    columns = "model TEXT NOT NULL, vector BLOB NOT NULL"
+    label = "Embedding cache"
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+                 enabled: bool = EMBEDDING_CACHE_ENABLED):
+        super().__init__(path, max_bytes, enabled)
+
+    def get_many(self, model_id: str, texts) -> dict:
+        """Cached vectors for `texts` under `model_id`, as {text: list of floats} (misses are absent)."""
+        if not self.enabled:
+            return {}
+        keys = {vector_key(model_id, t): t for t in dict.fromkeys(texts)}
+        try:
+            with self._lock:
+                rows = self._select(self._connect(), keys, "vector", time.time())
+                found = {keys[key]: np.frombuffer(blob, dtype=np.float32).tolist() for key, blob in rows}
+                self.hits += len(found)
+                self.misses += len(keys) - len(found)
+        except sqlite3.Error as e:
+            print(f"Embedding cache read failed: {e}")
+            return {}
+        return found
+
+    def put_many(self, model_id: str, vectors: dict) -> None:
+        """Store {text: vector} under `model_id` and evict least-recently-used entries if over budget."""
+        if not self.enabled or not vectors:
+            return
+        now = time.time()
+        rows = []
+        for text, vector in vectors.items():
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((vector_key(model_id, text), model_id, blob, len(blob), now))
+        try:
+            with self._lock:
+                self._upsert(self._connect(), ("key", "model", "vector", "size", "accessed_at"), rows)
+        except sqlite3.Error as e:
+            print(f"Embedding cache write failed: {e}")
+
+
+# Process-wide cache used by `utils.embeddings`
+EMBEDDING_CACHE = EmbeddingCache()
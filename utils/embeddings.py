@@ -0,0 +1,178 @@
+"""Process-wide embedding model.
+
+Analyzers used to create their own `FastEmbedEmbeddings` lazily, so every
+request-scoped or session-scoped agent re-initialised the ONNX model and
+kept another copy in RAM. `get_embeddings()` returns one shared,
+thread-safe instance instead. Servers preload it with
+`warmup_embeddings()` (FastAPI lifespan, Streamlit `cache_resource`), and
+`embedding_stats()` reports load/warmup time and the memory the model took.
+
+Document embeddings go through `utils.embedding_cache`: only texts the
+cache has never seen for this model reach the model, and a fully cached
+call does not even load it.
+"""
+
+import os
+import time
+import threading
+
+from .embedding_cache import EMBEDDING_CACHE
+
+try:
+    from langchain_core.embeddings import Embeddings
+except Exception:  # the wrapper only needs embed_documents/embed_query
+    Embeddings = object
+
+try:
+    import psutil
+except Exception:
+    psutil = None
+
+# Model name for FastEmbed (empty: FastEmbed's default)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+FASTEMBED_DEFAULT_MODEL = "BAAI/bge-small-en-v1.5"
+# Load and warm the model when the server starts
+EMBEDDING_PRELOAD = os.getenv("EMBEDDING_PRELOAD", "1").lower() not in ("0", "false", "no")
+
+
+def _rss_mb() -> float | None:
+    """Resident memory of this process in MB, if it can be read."""
+    try:
+        if psutil is not None:
+            return psutil.Process().memory_info().rss / (1024 * 1024)
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except Exception:
+        pass
+    return None
+
+
+class SharedEmbeddings(Embeddings):
+    """One FastEmbed model, loaded on first use and shared by every caller.
+
+    Inference is serialized with a lock, so analyzers on request threads,
+    fan-out workers and Streamlit sessions can all embed concurrently.
+    """
+
+    def __init__(self, model_name: str | None = None, cache=EMBEDDING_CACHE):
+        self.model_name = model_name or EMBEDDING_MODEL or None
+        self.cache = cache
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._infer_lock = threading.Lock()
+        self._stats = {"loaded": False, "load_s": None, "warmup_s": None, "memory_mb": None,
+                       "calls": 0, "texts": 0, "error": None}
+
+    def _load(self):
+        if self._model is not None:
+            return self._model
+        with self._load_lock:
+            if self._model is None:
+                from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
+                rss_before = _rss_mb()
+                started = time.perf_counter()
+                try:
+                    model = FastEmbedEmbeddings(model_name=self.model_name) if self.model_name else FastEmbedEmbeddings()
+                except Exception as e:
+                    self._stats["error"] = str(e)
+                    raise
+                self._stats["load_s"] = round(time.perf_counter() - started, 3)
+                rss_after = _rss_mb()
+                if rss_before is not None and rss_after is not None:
+                    self._stats["memory_mb"] = round(rss_after - rss_before, 1)
+                self._stats["loaded"], self._stats["error"] = True, None
+                self._model = model
+        return self._model
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the vector space in cache keys."""
+        return self.model_name or FASTEMBED_DEFAULT_MODEL
+
+    def _embed_uncached(self, texts: list) -> list:
+        model = self._load()
+        with self._infer_lock:
+            vectors = model.embed_documents(texts)
+            self._stats["calls"] += 1
+            self._stats["texts"] += len(texts)
+        return vectors
+
+    def embed_documents(self, texts):
+        """Embed texts, sending only ones missing from the embedding cache to the model."""
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self.cache.get_many(self.model_id, texts) if self.cache is not None else {}
+        missing = [t for t in dict.fromkeys(texts) if t not in vectors]
+        if missing:
+            fresh = dict(zip(missing, self._embed_uncached(missing)))
+            if self.cache is not None:
+                self.cache.put_many(self.model_id, fresh)
+            vectors.update(fresh)
+        return [list(vectors[t]) for t in texts]
+
+    def embed_query(self, text):
+        """Embed a search query (cached separately: models may prefix queries differently)."""
+        query_model = self.model_id + "#query"
+        cached = self.cache.get_many(query_model, [text]) if self.cache is not None else {}
+        if text in cached:
+            return cached[text]
+        model = self._load()
+        with self._infer_lock:
+            vector = model.embed_query(text)
+            self._stats["calls"] += 1
+            self._stats["texts"] += 1
+        if self.cache is not None:
+            self.cache.put_many(query_model, {text: vector})
+        return list(vector)
+
+    def warmup(self) -> dict:
+        """Load the model and run one inference so the first real request is not slowed down."""
+        started = time.perf_counter()
+        # Bypass the cache: the point is to run the model once
+        self._embed_uncached(["warmup: python developer with docker and aws experience"])
+        if self._stats["warmup_s"] is None:
+            self._stats["warmup_s"] = round(time.perf_counter() - started, 3)
+        return self.stats()
+
+    def stats(self) -> dict:
+        """Load/warmup time (s), memory the load added (MB), inference counters and cache stats."""
+        cache = self.cache.stats() if self.cache is not None else None
+        return {"model": self.model_id, **self._stats, "cache": cache}
+
+
+_SHARED = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_embeddings() -> SharedEmbeddings:
+    """The process-wide embedding model (loaded on first embed call)."""
+    global _SHARED
+    if _SHARED is None:
+        with _SHARED_LOCK:
+            if _SHARED is None:
+                _SHARED = SharedEmbeddings()
+    return _SHARED
+
+
+def warmup_embeddings() -> dict:
+    """Preload and warm the shared model; failures are reported, not raised."""
+    try:
+        stats = get_embeddings().warmup()
+        print(f"Embedding model ready in {stats['load_s']}s "
+              f"(warmup {stats['warmup_s']}s, ~{stats['memory_mb']} MB)")
+        return stats
+    except Exception as e:
+        print(f"Embedding model warmup failed: {e}")
+        return embedding_stats()
+
+
+def embedding_stats() -> dict:
+    """Stats of the shared model (``loaded`` is False until something used it)."""
+    return get_embeddings().stats()
@@ -0,0 +1,66 @@
+"""Bounded-concurrency fan-out for independent per-item LLM calls.
+
+`fan_out` runs `fn(item)` for every item on a small thread pool and
+returns the results in input order. Parallelism is capped by
+`LLM_FANOUT_WORKERS` and, when a rate limiter is passed, by the requests
+it still has left, so a fan-out never floods a budget that would only make
+the extra calls queue. Each item fails on its own: its slot gets
+`on_error(item, exc)` (or the exception itself) and the others carry on.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .deadline import Deadline
+
+FANOUT_WORKERS = int(os.getenv("LLM_FANOUT_WORKERS", "6"))
+
+
+def _parallelism(n_items: int, max_workers: int | None, limiter) -> int:
+    workers = min(n_items, max_workers or FANOUT_WORKERS)
+    if limiter is not None:
+        try:
+            remaining = limiter.stats().get("requests_remaining")
+            if remaining is not None:
+                workers = min(workers, int(remaining))
+        except Exception:
+            pass
+    return max(1, workers)
+
+
+def _run_one(fn, item, on_error, deadline: Deadline | None):
+    try:
+        if deadline is not None:
+            deadline.check("fan-out item")
+        return fn(item)
+    except Exception as e:
+        if on_error is None:
+            return e
+        return on_error(item, e)
+
+
+def fan_out(fn, items, max_workers: int | None = None, on_error=None, limiter=None,
+            deadline: Deadline | None = None) -> list:
+    """Call `fn` on every item concurrently and return results in input order.
+
+    Args:
+        fn: Callable taking one item (typically making one LLM call)
+        items: Items to process
+        max_workers: Parallelism cap (defaults to `LLM_FANOUT_WORKERS`)
+        on_error: `on_error(item, exc)` returns the value for a failed item;
+            when omitted the exception object is returned in its slot
+        limiter: Optional `RateLimiter` whose remaining requests cap parallelism
+        deadline: Items not started before it passes fail with `DeadlineExceeded`
+
+    Returns:
+        List of results, one per item, in the same order as `items`
+    """
+    items = list(items or [])
+    if not items:
+        return []
+    workers = _parallelism(len(items), max_workers, limiter)
+    if workers == 1:
+        return [_run_one(fn, item, on_error, deadline) for item in items]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-fanout") as pool:
+        futures = [pool.submit(_run_one, fn, item, on_error, deadline) for item in items]
+        return [f.result() for f in futures]
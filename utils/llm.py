@@ -7,10 +7,25 @@ exposes a small, unified interface for chat calls.
 from __future__ import annotations
 
 import os
+import re
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait as _wait_futures
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 
-from .llm_providers import groq_chat as _groq_chat
+import requests
+
+from .llm_providers import (
+    groq_chat as _groq_chat,
+    groq_chat_async as _groq_chat_async,
+    groq_cached as _groq_cached,
+    groq_forget as _groq_forget,
+    REQUEST_TIMEOUT,
+)
+from .deadline import Deadline, DeadlineExceeded
 
 # Catalog of commonly used models per provider
 AVAILABLE_MODELS: Dict[str, List[str]] = {
@@ -18,13 +33,52 @@ AVAILABLE_MODELS: Dict[str, List[str]] = {
         "openai/gpt-oss-20b",
         "openai/gpt-oss-120b",
         "llama-3.3-70b-versatile",
+        "llama-3.1-8b-instant",
     ],
 }
 
+# Token limits per model (used by `utils.prompt_budget`)
+MODEL_LIMITS: Dict[str, Dict[str, int]] = {
+    "openai/gpt-oss-20b": {"context_window": 131072, "max_completion_tokens": 65536},
+    "openai/gpt-oss-120b": {"context_window": 131072, "max_completion_tokens": 65536},
+    "llama-3.3-70b-versatile": {"context_window": 131072, "max_completion_tokens": 32768},
+    "llama-3.1-8b-instant": {"context_window": 131072, "max_completion_tokens": 131072},
+}
+
+# Models that accept `response_format={"type": "json_object"}` (JSON mode)
+JSON_MODE_MODELS = {
+    "openai/gpt-oss-20b",
+    "openai/gpt-oss-120b",
+    "llama-3.3-70b-versatile",
+    "llama-3.1-8b-instant",
+}
+JSON_MODE_ENABLED = (os.getenv("LLM_JSON_MODE") or "1").lower() not in ("0", "false", "no")
+
 DEFAULTS = {
     "groq": os.getenv("GROQ_MODEL") or "openai/gpt-oss-20b",
 }
 
+# Hedging: after a p95-based delay, race a second model against a slow first one
+HEDGE_ENABLED = (os.getenv("LLM_HEDGE") or "1").lower() not in ("0", "false", "no")
+HEDGE_MODELS = [m.strip() for m in (os.getenv("LLM_HEDGE_MODELS") or "").split(",") if m.strip()]
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "6.0"))  # until a model has latency samples
+# Pool for hedged calls; a call only takes a worker that is free, so nothing queues behind it
+HEDGE_WORKERS = int(os.getenv("LLM_HEDGE_WORKERS", "16"))
+# Long generations are not hedged: they routinely outlast the p95 of short calls, and a
+# second full generation would double the cost of the most expensive requests
+HEDGE_MAX_TOKENS = int(os.getenv("LLM_HEDGE_MAX_TOKENS", "1024"))
+# Hedge requests in flight at once (the rest of the pool stays free for primaries)
+HEDGE_MAX_CONCURRENT = int(os.getenv("LLM_HEDGE_MAX_CONCURRENT", "4"))
+# Circuit breaker: open after this many consecutive failures or this error rate
+BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+_HEDGE_POOL_FREE = threading.BoundedSemaphore(HEDGE_WORKERS)
+_HEDGE_SLOTS = threading.BoundedSemaphore(HEDGE_MAX_CONCURRENT)
+
 
 @dataclass
 class LLMConfig:
@@ -55,17 +109,350 @@ class LLMConfig:
             )
 
 
-def llm_chat(config: LLMConfig, messages: List[Dict[str, Any]], temperature: float = 0.2, max_tokens: int = 600) -> str:
+class ModelHealth:
+    """Rolling latency/error statistics and circuit-breaker state for one model."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self._lock = threading.Lock()
+        self.latencies = deque(maxlen=100)  # seconds, successful calls only
+        self.outcomes = deque(maxlen=20)    # True = success
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.trial_until = 0.0  # half-open probe reservation (expires if never reported)
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+            self.trial_until = 0.0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            self.trial_until = 0.0
+            errors = self.outcomes.count(False)
+            if (self.consecutive_failures >= BREAKER_FAILURES or
+                    (len(self.outcomes) >= 5 and errors / len(self.outcomes) >= BREAKER_ERROR_RATE)):
+                self.open_until = time.monotonic() + BREAKER_COOLDOWN
+
+    def allow(self) -> bool:
+        """True if the breaker is closed, or half-open and no trial call is running."""
+        with self._lock:
+            if self.open_until <= 0:
+                return True
+            now = time.monotonic()
+            if now < self.open_until or now < self.trial_until:
+                return False
+            self.trial_until = now + REQUEST_TIMEOUT  # half-open: let one call probe the model
+            return True
+
+    def note_hedge(self, won: bool = False) -> None:
+        with self._lock:
+            if won:
+                self.hedge_wins += 1
+            else:
+                self.hedges += 1
+
+    def p95(self) -> float | None:
+        with self._lock:
+            if len(self.latencies) < 5:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for this model before sending a hedged request."""
+        p95 = self.p95()
+        delay = HEDGE_DEFAULT_DELAY if p95 is None else p95
+        return min(max(delay, HEDGE_MIN_DELAY), REQUEST_TIMEOUT)
+
+    def stats(self) -> dict:
+        p95 = self.p95()
+        with self._lock:
+            n = len(self.outcomes)
+            now = time.monotonic()
+            state = "closed" if self.open_until <= 0 else ("open" if now < self.open_until else "half-open")
+            return {
+                "state": state,
+                "samples": len(self.latencies),
+                "p95_s": None if p95 is None else round(p95, 3),
+                "error_rate": round(self.outcomes.count(False) / n, 3) if n else 0.0,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+            }
+
+
+_HEALTH: Dict[str, ModelHealth] = {}
+_HEALTH_LOCK = threading.Lock()
+
+
+def get_model_health(model: str) -> ModelHealth:
+    with _HEALTH_LOCK:
+        health = _HEALTH.get(model)
+        if health is None:
+            health = _HEALTH[model] = ModelHealth(model)
+        return health
+
+
+def model_health_stats() -> Dict[str, dict]:
+    """Per-model latency, error rate, breaker state and hedge counters."""
+    with _HEALTH_LOCK:
+        models = list(_HEALTH.values())
+    return {h.model: h.stats() for h in models}
+
+
+def _counts_against_model(exc: BaseException) -> bool:
+    # Our own deadline, bad requests and rate limits (429: our quota, not the model's health)
+    # say nothing about whether the model is up
+    if isinstance(exc, DeadlineExceeded):
+        return False
+    if isinstance(exc, requests.HTTPError):
+        m = re.match(r"(\d{3})\b", str(exc))
+        return not m or int(m.group(1)) >= 500
+    return isinstance(exc, (requests.RequestException, OSError, asyncio.TimeoutError)) or \
+        type(exc).__module__.startswith("httpx")
+
+
+def _next_model(model: str, exclude: tuple = ()) -> Optional[str]:
+    """First model (requested one first, then hedge candidates) whose breaker admits a call."""
+    others = HEDGE_MODELS or AVAILABLE_MODELS.get("groq", [])
+    for m in [model] + [m for m in others if m != model]:
+        if m not in exclude and get_model_health(m).allow():
+            return m
+    return None
+
+
+def supports_json_mode(model: Optional[str]) -> bool:
+    """True if `model` accepts JSON mode (and it is not disabled via LLM_JSON_MODE)."""
+    return JSON_MODE_ENABLED and (model or DEFAULTS["groq"]) in JSON_MODE_MODELS
+
+
+def _timed_call(api_key, messages, model, temperature, max_tokens, cache, deadline=None, response_format=None):
+    health = get_model_health(model)
+    start = time.monotonic()
+    try:
+        text = _groq_chat(api_key, messages=messages, model=model, temperature=temperature,
+                          max_tokens=max_tokens, cache=cache, deadline=deadline, response_format=response_format)
+    except Exception as e:
+        if _counts_against_model(e):
+            health.record_failure()
+        raise
+    health.record_success(time.monotonic() - start)
+    return text
+
+
+async def _atimed_call(api_key, messages, model, temperature, max_tokens, cache, deadline=None, response_format=None):
+    health = get_model_health(model)
+    start = time.monotonic()
+    try:
+        text = await _groq_chat_async(api_key, messages=messages, model=model, temperature=temperature,
+                                      max_tokens=max_tokens, cache=cache, deadline=deadline,
+                                      response_format=response_format)
+    except Exception as e:
+        if _counts_against_model(e):
+            health.record_failure()
+        raise
+    health.record_success(time.monotonic() - start)
+    return text
+
+
+def _should_hedge(hedge: bool, max_tokens: int) -> bool:
+    return hedge and HEDGE_ENABLED and max_tokens <= HEDGE_MAX_TOKENS
+
+
+def _take_hedge_slot() -> bool:
+    """Reserve one of the `HEDGE_MAX_CONCURRENT` hedge slots without waiting."""
+    return _HEDGE_SLOTS.acquire(blocking=False)
+
+
+def _submit_if_free(fn, *args):
+    """Run `fn(*args)` on an idle hedge pool worker, or return None when every worker is busy.
+
+    Calls never wait in the pool's queue, so a call starts as soon as it is
+    submitted and the hedge timer measures the model, not local queueing.
+    """
+    if not _HEDGE_POOL_FREE.acquire(blocking=False):
+        return None
+    try:
+        fut = _HEDGE_POOL.submit(fn, *args)
+    except Exception:
+        _HEDGE_POOL_FREE.release()
+        raise
+    fut.add_done_callback(lambda _: _HEDGE_POOL_FREE.release())
+    return fut
+
+
+def _hedge_wait(primary: str, deadline: Optional[Deadline]) -> float:
+    """How long to wait for the primary model before hedging (or giving up)."""
+    wait_s = get_model_health(primary).hedge_delay()
+    remaining = deadline.remaining() if deadline is not None else None
+    return wait_s if remaining is None else min(wait_s, remaining)
+
+
+def hedged_chat(api_key: Optional[str], messages: List[Dict[str, Any]], model: str, temperature: float = 0.2,
+                max_tokens: int = 600, cache: bool = True, hedge: bool = True,
+                deadline: Deadline | float | None = None, response_format: Optional[dict] = None) -> str:
+    """Chat call with per-model circuit breaking and hedging.
+
+    The first healthy model is called; if it has not answered within its
+    p95 latency, the same request is also sent to the next healthy model
+    and the first successful answer wins. The slower call's deadline is
+    cancelled, so it stops at its next retry or queue wait instead of
+    holding a pool worker. Calls above `HEDGE_MAX_TOKENS` are not hedged
+    and run on the caller's thread, and at most `HEDGE_MAX_CONCURRENT`
+    hedges are in flight at once. The pool is never a queue: when all
+    `HEDGE_WORKERS` are busy (e.g. under many concurrent fan-outs) the call
+    runs unhedged on the caller's thread rather than waiting for a worker.
+    With a `deadline`, `DeadlineExceeded` is raised once it passes.
+    """
+    deadline = Deadline.coerce(deadline)
+    if cache:
+        cached = _groq_cached(messages, model, temperature, max_tokens, response_format)
+        if cached is not None:
+            return cached
+    # If every breaker is open, still try the requested model rather than fail outright
+    primary = _next_model(model) or model
+    args = (api_key, messages)
+    if not _should_hedge(hedge, max_tokens):
+        return _timed_call(*args, primary, temperature, max_tokens, cache, deadline, response_format)
+
+    futures = {}  # future -> (model, its own cancellable deadline)
+
+    def submit(m, fmt):
+        call_deadline = deadline.child() if deadline is not None else Deadline()
+        fut = _submit_if_free(_timed_call, *args, m, temperature, max_tokens, cache, call_deadline, fmt)
+        if fut is not None:
+            futures[fut] = (m, call_deadline)
+        return fut
+
+    if submit(primary, response_format) is None:
+        return _timed_call(*args, primary, temperature, max_tokens, cache, deadline, response_format)
+    done, _ = _wait_futures(list(futures), timeout=_hedge_wait(primary, deadline))
+    hedge_model = _next_model(model, exclude=(primary,)) if not done else None
+    if hedge_model and (deadline is None or not deadline.expired()) and _take_hedge_slot():
+        hedge_format = response_format if supports_json_mode(hedge_model) else None
+        hedge_future = submit(hedge_model, hedge_format)
+        if hedge_future is None:
+            _HEDGE_SLOTS.release()
+        else:
+            get_model_health(primary).note_hedge()
+            hedge_future.add_done_callback(lambda _: _HEDGE_SLOTS.release())
+
+    last_err = None
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = _wait_futures(pending, timeout=deadline.remaining() if deadline else None,
+                                          return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("Deadline exceeded waiting for the LLM")
+            for fut in done:
+                if fut.exception() is None:
+                    if futures[fut][0] != primary:
+                        get_model_health(primary).note_hedge(won=True)
+                    return fut.result()
+                last_err = fut.exception()
+        raise last_err
+    finally:
+        # The losing call stops at its next check; its in-flight HTTP request still lands in the cache
+        for fut in pending:
+            fut.cancel()
+            futures[fut][1].cancel()
+
+
+async def hedged_chat_async(api_key: Optional[str], messages: List[Dict[str, Any]], model: str, temperature: float = 0.2,
+                            max_tokens: int = 600, cache: bool = True, hedge: bool = True,
+                            deadline: Deadline | float | None = None, response_format: Optional[dict] = None) -> str:
+    """Async counterpart of `hedged_chat`; the losing request is cancelled."""
+    deadline = Deadline.coerce(deadline)
+    if cache:
+        cached = _groq_cached(messages, model, temperature, max_tokens, response_format)
+        if cached is not None:
+            return cached
+    primary = _next_model(model) or model
+    args = (api_key, messages)
+    if not _should_hedge(hedge, max_tokens):
+        return await _atimed_call(*args, primary, temperature, max_tokens, cache, deadline, response_format)
+    tasks = {asyncio.ensure_future(_atimed_call(*args, primary, temperature, max_tokens, cache, deadline, response_format)): primary}
+
+    done, _ = await asyncio.wait(list(tasks), timeout=_hedge_wait(primary, deadline))
+    hedge_model = _next_model(model, exclude=(primary,)) if not done else None
+    if hedge_model and (deadline is None or not deadline.expired()) and _take_hedge_slot():
+        get_model_health(primary).note_hedge()
+        hedge_format = response_format if supports_json_mode(hedge_model) else None
+        task = asyncio.ensure_future(_atimed_call(*args, hedge_model, temperature, max_tokens, cache, deadline, hedge_format))
+        task.add_done_callback(lambda _: _HEDGE_SLOTS.release())
+        tasks[task] = hedge_model
+
+    last_err = None
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=deadline.remaining() if deadline else None,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("Deadline exceeded waiting for the LLM")
+            for task in done:
+                if task.exception() is None:
+                    if tasks[task] != primary:
+                        get_model_health(primary).note_hedge(won=True)
+                    return task.result()
+                last_err = task.exception()
+        raise last_err
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def forget_cached(messages: List[Dict[str, Any]], model: str, temperature: float = 0.2, max_tokens: int = 600,
+                  response_format: Optional[dict] = None) -> None:
+    """Drop a cached answer, whichever model (primary or hedge) produced it."""
+    # Hedges drop JSON mode on models without it, so forget both variants for every candidate
+    formats = [response_format, None] if response_format else [None]
+    others = HEDGE_MODELS or AVAILABLE_MODELS.get("groq", [])
+    for m in [model] + [m for m in others if m != model]:
+        for fmt in formats:
+            _groq_forget(messages, m, temperature, max_tokens, fmt)
+
+
+def llm_chat(config: LLMConfig, messages: List[Dict[str, Any]], temperature: float = 0.2, max_tokens: int = 600,
+             cache: bool = True, hedge: bool = True, deadline: Deadline | float | None = None,
+             response_format: Optional[dict] = None) -> str:
     """Unified chat interface.
 
     - For provider == "groq": uses `_groq_chat(api_key, messages, model, temperature, max_tokens)`.
+    - `cache=False` bypasses the persistent response cache (fresh sample).
+    - `GROQ_BASE_URL` (or `utils.llm_providers.set_base_url`) redirects calls to an OpenAI-compatible
+      endpoint such as `utils.llm_standin`.
+    - Calls go through `hedged_chat`; `hedge=False` keeps them on the configured model
+      (the circuit breaker still applies).
+    - `deadline` bounds the whole call (see `utils.deadline`).
+    - `response_format` requests JSON mode (see `supports_json_mode`).
     """
     prov = (config.provider or "groq").lower()
     model = config.resolved_model()
 
     # default to groq
     api_key = config.api_key or os.getenv("GROQ_API_KEY")
-    return _groq_chat(api_key, messages=messages, model=model, temperature=temperature, max_tokens=max_tokens)
+    return hedged_chat(api_key, messages=messages, model=model, temperature=temperature, max_tokens=max_tokens,
+                       cache=cache, hedge=hedge, deadline=deadline, response_format=response_format)
+
+
+async def llm_chat_async(config: LLMConfig, messages: List[Dict[str, Any]], temperature: float = 0.2, max_tokens: int = 600,
+                         cache: bool = True, hedge: bool = True, deadline: Deadline | float | None = None,
+                         response_format: Optional[dict] = None) -> str:
+    """Async variant of `llm_chat` (non-blocking for event-loop callers)."""
+    model = config.resolved_model()
+    api_key = config.api_key or os.getenv("GROQ_API_KEY")
+    return await hedged_chat_async(api_key, messages=messages, model=model, temperature=temperature,
+                                   max_tokens=max_tokens, cache=cache, hedge=hedge, deadline=deadline,
+                                   response_format=response_format)
 
 
 def list_models(provider: Optional[str] = None) -> List[str]:
@@ -0,0 +1,96 @@
+"""Persistent, content-addressed cache for LLM responses.
+
+Responses are keyed by a SHA-256 of the full request payload (model,
+messages, temperature, max_tokens, ...) and stored in a small SQLite
+database with a per-entry TTL and size-bounded LRU eviction (see
+`utils.sqlite_lru`).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+from .sqlite_lru import SQLiteLRU
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH") or os.path.join(".cache", "llm", "responses.sqlite3")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_ENABLED = (os.getenv("LLM_CACHE_DISABLED") or "").lower() not in ("1", "true", "yes")
+
+
+def request_key(payload: dict) -> str:
+    """Compute the content address of a chat-completions request.
+
+    Args:
+        payload: JSON-serialisable request body
+
+    Returns:
+        Hex digest of the canonical JSON encoding
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(SQLiteLRU):
+    """Request key -> response text, with a TTL per entry."""
+
+    table = "responses"
+    columns = "value TEXT NOT NULL, expires_at REAL NOT NULL"
+    label = "LLM cache"
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 default_ttl: float = LLM_CACHE_TTL, enabled: bool = LLM_CACHE_ENABLED):
+        super().__init__(path, max_bytes, enabled)
+        self.default_ttl = default_ttl
+
+    def get(self, key: str, record_miss: bool = True) -> str | None:
+        """Return the cached value for `key`, or None on miss/expiry.
+
+        `record_miss=False` is for look-ups that are followed by a regular
+        `get` on a miss, so misses are not counted twice.
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                rows = self._select(conn, [key], "value, expires_at", now)
+                if not rows or rows[0][2] < now:
+                    if rows:
+                        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        conn.commit()
+                    if record_miss:
+                        self.misses += 1
+                    return None
+                self.hits += 1
+                return rows[0][1]
+        except sqlite3.Error as e:
+            print(f"LLM cache read failed: {e}")
+            return None
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """Store `value` under `key` and evict least-recently-used entries if over budget."""
+        if not self.enabled or value is None:
+            return
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        expires_at = now + (ttl if ttl is not None else self.default_ttl)
+        try:
+            with self._lock:
+                self._upsert(self._connect(), ("key", "value", "size", "expires_at", "accessed_at"),
+                             [(key, value, size, expires_at, now)])
+        except sqlite3.Error as e:
+            print(f"LLM cache write failed: {e}")
+
+    def _expire(self, conn, now: float) -> None:
+        # Expired rows go before any live entry is evicted
+        conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+
+
+# Process-wide cache used by `utils.llm_providers`
+RESPONSE_CACHE = ResponseCache()
@@ -4,59 +4,451 @@ import os
 import re
 import json
 import time
+import asyncio
+import threading
+import weakref
+from contextlib import contextmanager
+
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+
+from .llm_cache import RESPONSE_CACHE, request_key
+from .singleflight import LLM_FLIGHTS
+from .rate_limit import get_limiter, estimate_tokens, parse_duration
+from .deadline import Deadline, DeadlineExceeded
+
+GROQ_DEFAULT_BASE_URL = "https://api.groq.com/openai/v1"
+
+# Connection pool sizing (shared by the sync session and the async client)
+POOL_CONNECTIONS = int(os.getenv("GROQ_POOL_CONNECTIONS", "20"))
+POOL_KEEPALIVE = int(os.getenv("GROQ_POOL_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30"))
+# Maximum number of Groq requests allowed in flight at once
+MAX_INFLIGHT = int(os.getenv("GROQ_MAX_INFLIGHT", "16"))
+# Retries after a 429/5xx (rate-limited calls are queued, not failed)
+MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "4"))
+REQUEST_TIMEOUT = 30
 
 # Reuse a single HTTP session for all outbound requests
 SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_CONNECTIONS)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
 
+_SYNC_INFLIGHT = threading.BoundedSemaphore(MAX_INFLIGHT)
 
-def groq_chat(api_key: str, messages: list, model: str = None, temperature: float = 0.2, max_tokens: int = 600) -> str:
-    """Minimal Groq chat-completions helper returning assistant content as text.
+# Set by `set_base_url` / `use_base_url`; takes precedence over the GROQ_BASE_URL env var
+_BASE_URL_OVERRIDE = None
 
-    Token-optimized: enforce a single model (llama-3.1-8b-instant) with no fallbacks.
-    """
-    if not api_key:
-        raise RuntimeError("Groq API key missing")
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+# One pooled AsyncClient + in-flight semaphore per event loop (both are loop-bound)
+_ASYNC_STATE: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+
+
+def groq_base_url() -> str:
+    """Base URL calls go to, resolved per call: `set_base_url` override, else GROQ_BASE_URL, else Groq."""
+    return (_BASE_URL_OVERRIDE or os.getenv("GROQ_BASE_URL") or GROQ_DEFAULT_BASE_URL).rstrip("/")
+
+
+def set_base_url(url: str | None) -> None:
+    """Send every following call to an OpenAI-compatible endpoint such as `utils.llm_standin` (None: reset)."""
+    global _BASE_URL_OVERRIDE
+    _BASE_URL_OVERRIDE = url.rstrip("/") if url else None
+
+
+@contextmanager
+def use_base_url(url: str | None):
+    """Temporarily redirect calls, e.g. ``with use_base_url(server.base_url): ...``."""
+    previous = _BASE_URL_OVERRIDE
+    set_base_url(url)
+    try:
+        yield
+    finally:
+        set_base_url(previous)
+
+
+def _chat_url() -> str:
+    return groq_base_url() + "/chat/completions"
+
+
+def _build_payload(messages: list, model: str | None, temperature: float, max_tokens: int,
+                   response_format: dict | None = None) -> dict:
     model = (model or os.getenv("GROQ_MODEL") or "llama-3.1-8b-instant")
     payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
-    # Simple retry/backoff for rate limits and transient errors
-    attempts = 0
-    last_err = None
-    while attempts < 2:
-        resp = SESSION.post(url, headers=headers, json=payload, timeout=30)
-        if resp.status_code == 429:
-            # Parse suggested wait from message, else sleep a small backoff
-            wait_s = 2.5
+    if response_format:
+        payload["response_format"] = response_format
+    return payload
+
+
+def _build_request(api_key: str, messages: list, model: str | None, temperature: float, max_tokens: int,
+                   response_format: dict | None = None):
+    """Return (headers, payload) for a chat-completions call."""
+    if not api_key:
+        if groq_base_url() == GROQ_DEFAULT_BASE_URL:
+            raise RuntimeError("Groq API key missing")
+        api_key = "standin"  # local stand-ins do not check credentials
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    return headers, _build_payload(messages, model, temperature, max_tokens, response_format)
+
+
+def _retry_delay(status_code: int, body: str, attempts: int, headers=None) -> float | None:
+    """Seconds to wait before retrying, or None if the status is not retryable."""
+    if status_code == 429:
+        # Prefer the retry-after header, then the hint in the message, else a small backoff
+        wait_s = parse_duration((headers or {}).get("retry-after"))
+        if wait_s is None:
             try:
-                msg = resp.text or ""
-                m = re.search(r"try again in\s([\d\.]+)s", msg)
+                m = re.search(r"try again in\s([\d\.]+)s", body or "")
                 if m:
-                    wait_s = min(max(float(m.group(1)) * 1.2, 2.0), 8.0)
+                    wait_s = float(m.group(1)) * 1.2
             except Exception:
                 pass
-            time.sleep(wait_s)
-            attempts += 1
-            last_err = resp
+        if wait_s is None:
+            wait_s = 2.5 * (attempts + 1)
+        return min(max(wait_s, 1.0), 60.0)
+    if 500 <= status_code < 600:
+        # transient server error
+        return 1.5 * (attempts + 1)
+    return None
+
+
+def _cache_key(payload: dict) -> str:
+    """Response-cache key; answers from a non-default endpoint never mix with real ones."""
+    base_url = groq_base_url()
+    if base_url == GROQ_DEFAULT_BASE_URL:
+        return request_key(payload)
+    return request_key(dict(payload, _base_url=base_url))
+
+
+def _extract_content(data: dict, cache_key: str | None = None) -> str:
+    try:
+        content = data["choices"][0]["message"]["content"]
+    except Exception:
+        return json.dumps(data)
+    if cache_key:
+        RESPONSE_CACHE.set(cache_key, content)
+    return content
+
+
+def _remaining(deadline: Deadline | None) -> float | None:
+    return deadline.remaining() if deadline is not None else None
+
+
+def _check_retry(deadline: Deadline | None, wait_s: float) -> None:
+    """Fail fast when a retry wait would run past the deadline."""
+    if deadline is not None and not deadline.allows(wait_s):
+        raise DeadlineExceeded(f"Deadline exceeded: retry in {wait_s:.1f}s would pass it")
+
+
+def _acquire_budget(limiter, cost: int, deadline: Deadline | None) -> None:
+    if deadline is None:
+        limiter.acquire(cost)
+        return
+    deadline.check("rate-limit wait")
+    try:
+        limiter.acquire(cost, timeout=deadline.remaining())
+    except TimeoutError as e:
+        raise DeadlineExceeded(f"Deadline exceeded: {e}") from None
+
+
+@contextmanager
+def _sync_slot(deadline: Deadline | None):
+    """Hold one of the `GROQ_MAX_INFLIGHT` slots, waiting no longer than the deadline."""
+    if not _SYNC_INFLIGHT.acquire(timeout=_remaining(deadline)):
+        raise DeadlineExceeded("Deadline exceeded waiting for a free connection")
+    try:
+        yield
+    finally:
+        _SYNC_INFLIGHT.release()
+
+
+def _sync_post(headers: dict, body: dict, deadline: Deadline | None, **kwargs):
+    """POST with the HTTP timeout capped by the deadline."""
+    timeout = deadline.timeout(REQUEST_TIMEOUT) if deadline is not None else REQUEST_TIMEOUT
+    try:
+        return SESSION.post(_chat_url(), headers=headers, json=body, timeout=timeout, **kwargs)
+    except requests.Timeout:
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded("Deadline exceeded during the Groq request") from None
+        raise
+
+
+def _iter_sse_deltas(lines):
+    """Yield content deltas from OpenAI-style `data: {...}` server-sent event lines."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", "replace")
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+            delta = (chunk["choices"][0].get("delta") or {}).get("content")
+        except (ValueError, KeyError, IndexError, TypeError):
             continue
-        if 500 <= resp.status_code < 600:
-            # transient server error
-            time.sleep(1.5 * (attempts + 1))
+        if delta:
+            yield delta
+
+
+def groq_cached(messages: list, model: str = None, temperature: float = 0.2, max_tokens: int = 600,
+                response_format: dict | None = None) -> str | None:
+    """Return the cached answer for a request without calling the API, or None."""
+    payload = _build_payload(messages, model, temperature, max_tokens, response_format)
+    return RESPONSE_CACHE.get(_cache_key(payload), record_miss=False)
+
+
+def groq_forget(messages: list, model: str = None, temperature: float = 0.2, max_tokens: int = 600,
+                response_format: dict | None = None) -> None:
+    """Drop the cached answer for a request so the next identical call asks the API again."""
+    payload = _build_payload(messages, model, temperature, max_tokens, response_format)
+    RESPONSE_CACHE.delete(_cache_key(payload))
+
+
+def groq_chat(api_key: str, messages: list, model: str = None, temperature: float = 0.2, max_tokens: int = 600,
+              cache: bool = True, stream: bool = False, deadline: Deadline | float | None = None,
+              response_format: dict | None = None):
+    """Minimal Groq chat-completions helper returning assistant content as text.
+
+    Calls exactly the model it is given (``GROQ_MODEL`` or llama-3.1-8b-instant
+    when none is); picking another model when one is slow or failing is left
+    to `utils.llm.hedged_chat`. Identical requests are served from the persistent response cache, and
+    identical requests already in flight are coalesced onto one HTTP call;
+    pass `cache=False` for calls that need a fresh sample.
+
+    With `stream=True` a generator of content deltas is returned instead of a
+    string; the assembled text is written to the response cache once complete.
+
+    `deadline` (a `utils.deadline.Deadline` or seconds) caps queueing, HTTP
+    timeouts and retry sleeps; `DeadlineExceeded` is raised once it passes.
+
+    `response_format` (e.g. ``{"type": "json_object"}``) is sent as-is for
+    models that support JSON mode.
+    """
+    deadline = Deadline.coerce(deadline)
+    headers, payload = _build_request(api_key, messages, model, temperature, max_tokens, response_format)
+    limiter = get_limiter(api_key, payload["model"])
+    if stream:
+        return _stream_with_retries(headers, payload, limiter, _cache_key(payload) if cache else None, deadline)
+    if not cache:
+        return _post_with_retries(headers, payload, limiter, deadline=deadline)
+    cache_key = _cache_key(payload)
+    cached = RESPONSE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        # The shared call runs under the leader's deadline; if that runs out, callers with
+        # more time left re-run the request instead of inheriting the leader's timeout
+        return LLM_FLIGHTS.do(cache_key, lambda: _post_with_retries(headers, payload, limiter, cache_key, deadline),
+                              timeout=_remaining(deadline), retry_on=(DeadlineExceeded,))
+    except DeadlineExceeded:
+        raise
+    except TimeoutError:
+        # Waited on an identical in-flight call that outlived our deadline
+        raise DeadlineExceeded("Deadline exceeded waiting for an identical in-flight request") from None
+
+
+def _post_with_retries(headers: dict, payload: dict, limiter, cache_key: str | None = None,
+                       deadline: Deadline | None = None) -> str:
+    # Pace against the shared rate limiter; retry rate limits and transient errors
+    cost = estimate_tokens(payload["messages"], payload["max_tokens"], payload.get("model"))
+    attempts = 0
+    last_err = None
+    while attempts <= MAX_RETRIES:
+        _acquire_budget(limiter, cost, deadline)
+        with _sync_slot(deadline):
+            resp = _sync_post(headers, payload, deadline)
+        limiter.update_from_headers(resp.headers)
+        wait_s = _retry_delay(resp.status_code, resp.text, attempts, resp.headers)
+        if wait_s is not None:
+            _check_retry(deadline, wait_s)
+            if resp.status_code == 429:
+                # Queue every caller behind the provider's hint instead of failing
+                limiter.block_for(wait_s)
+            else:
+                time.sleep(wait_s)
             attempts += 1
             last_err = resp
             continue
         if resp.status_code >= 400:
             raise requests.HTTPError(f"{resp.status_code} {resp.reason}: {resp.text}")
-        data = resp.json()
-        try:
-            return data["choices"][0]["message"]["content"]
-        except Exception:
-            return json.dumps(data)
+        return _extract_content(resp.json(), cache_key)
     # if we exhausted retries
     if last_err is not None:
         raise requests.HTTPError(f"{last_err.status_code} {last_err.reason}: {last_err.text}")
     raise RuntimeError("Groq request failed after retries")
 
 
+def _stream_with_retries(headers: dict, payload: dict, limiter, cache_key: str | None = None,
+                         deadline: Deadline | None = None):
+    if cache_key:
+        cached = RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+    body = dict(payload, stream=True)
+    cost = estimate_tokens(payload["messages"], payload["max_tokens"], payload.get("model"))
+    attempts = 0
+    last_err = None
+    while attempts <= MAX_RETRIES:
+        _acquire_budget(limiter, cost, deadline)
+        wait_s = None
+        with _sync_slot(deadline):
+            with _sync_post(headers, body, deadline, stream=True) as resp:
+                limiter.update_from_headers(resp.headers)
+                if resp.status_code >= 400:
+                    wait_s = _retry_delay(resp.status_code, resp.text, attempts, resp.headers)
+                    if wait_s is None:
+                        raise requests.HTTPError(f"{resp.status_code} {resp.reason}: {resp.text}")
+                    last_err = resp
+                else:
+                    parts = []
+                    for delta in _iter_sse_deltas(resp.iter_lines()):
+                        parts.append(delta)
+                        yield delta
+                    if cache_key and parts:
+                        RESPONSE_CACHE.set(cache_key, "".join(parts))
+                    return
+        _check_retry(deadline, wait_s)
+        if last_err is not None and last_err.status_code == 429:
+            limiter.block_for(wait_s)
+        else:
+            time.sleep(wait_s)
+        attempts += 1
+    raise requests.HTTPError(f"{last_err.status_code} {last_err.reason}: {last_err.text}")
+
+
+def _get_async_state():
+    """Return the (AsyncClient, Semaphore) pair bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    state = _ASYNC_STATE.get(loop)
+    if state is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=POOL_CONNECTIONS,
+                max_keepalive_connections=POOL_KEEPALIVE,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=10.0),
+        )
+        state = (client, asyncio.Semaphore(MAX_INFLIGHT))
+        _ASYNC_STATE[loop] = state
+    return state
+
+
+async def aclose_async_client():
+    """Close the pooled AsyncClient of the running event loop (call on shutdown)."""
+    state = _ASYNC_STATE.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state[0].aclose()
+
+
+async def groq_chat_async(api_key: str, messages: list, model: str = None, temperature: float = 0.2, max_tokens: int = 600,
+                          cache: bool = True, deadline: Deadline | float | None = None,
+                          response_format: dict | None = None) -> str:
+    """Async counterpart of `groq_chat` built on a pooled, keep-alive httpx client.
+
+    At most `GROQ_MAX_INFLIGHT` requests per event loop are on the wire at once;
+    extra callers wait on the semaphore instead of opening new connections.
+    With a `deadline` the whole call (queueing, retries, HTTP) is bounded by it.
+    """
+    deadline = Deadline.coerce(deadline)
+    headers, payload = _build_request(api_key, messages, model, temperature, max_tokens, response_format)
+    limiter = get_limiter(api_key, payload["model"])
+    if not cache:
+        return await _with_deadline(_apost_with_retries(headers, payload, limiter), deadline)
+    cache_key = _cache_key(payload)
+    cached = RESPONSE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    return await _with_deadline(
+        LLM_FLIGHTS.do_async(cache_key, lambda: _apost_with_retries(headers, payload, limiter, cache_key)), deadline)
+
+
+async def _with_deadline(aw, deadline: Deadline | None):
+    if deadline is None:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, deadline.remaining())
+    except DeadlineExceeded:
+        raise
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Deadline exceeded during the Groq request") from None
+
+
+async def _apost_with_retries(headers: dict, payload: dict, limiter, cache_key: str | None = None) -> str:
+    client, inflight = _get_async_state()
+    cost = estimate_tokens(payload["messages"], payload["max_tokens"], payload.get("model"))
+    attempts = 0
+    last_err = None
+    while attempts <= MAX_RETRIES:
+        await limiter.acquire_async(cost)
+        async with inflight:
+            resp = await client.post(_chat_url(), headers=headers, json=payload)
+        limiter.update_from_headers(resp.headers)
+        wait_s = _retry_delay(resp.status_code, resp.text, attempts, resp.headers)
+        if wait_s is not None:
+            if resp.status_code == 429:
+                limiter.block_for(wait_s)
+            else:
+                await asyncio.sleep(wait_s)
+            attempts += 1
+            last_err = resp
+            continue
+        if resp.status_code >= 400:
+            raise requests.HTTPError(f"{resp.status_code} {resp.reason_phrase}: {resp.text}")
+        return _extract_content(resp.json(), cache_key)
+    if last_err is not None:
+        raise requests.HTTPError(f"{last_err.status_code} {last_err.reason_phrase}: {last_err.text}")
+    raise RuntimeError("Groq request failed after retries")
+
+
+async def groq_chat_stream_async(api_key: str, messages: list, model: str = None, temperature: float = 0.2,
+                                 max_tokens: int = 600, cache: bool = True):
+    """Async-iterator counterpart of `groq_chat(stream=True)` yielding content deltas."""
+    headers, payload = _build_request(api_key, messages, model, temperature, max_tokens)
+    limiter = get_limiter(api_key, payload["model"])
+    cache_key = _cache_key(payload) if cache else None
+    if cache_key:
+        cached = RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+    client, inflight = _get_async_state()
+    body = dict(payload, stream=True)
+    cost = estimate_tokens(payload["messages"], payload["max_tokens"], payload.get("model"))
+    attempts = 0
+    last_err = None
+    while attempts <= MAX_RETRIES:
+        await limiter.acquire_async(cost)
+        wait_s = None
+        async with inflight:
+            async with client.stream("POST", _chat_url(), headers=headers, json=body) as resp:
+                limiter.update_from_headers(resp.headers)
+                if resp.status_code >= 400:
+                    text = (await resp.aread()).decode("utf-8", "replace")
+                    wait_s = _retry_delay(resp.status_code, text, attempts, resp.headers)
+                    if wait_s is None:
+                        raise requests.HTTPError(f"{resp.status_code} {resp.reason_phrase}: {text}")
+                    last_err = (resp.status_code, resp.reason_phrase, text)
+                else:
+                    parts = []
+                    async for line in resp.aiter_lines():
+                        for delta in _iter_sse_deltas([line]):
+                            parts.append(delta)
+                            yield delta
+                        if line.strip() == "data: [DONE]":
+                            break
+                    if cache_key and parts:
+                        RESPONSE_CACHE.set(cache_key, "".join(parts))
+                    return
+        if last_err[0] == 429:
+            limiter.block_for(wait_s)
+        else:
+            await asyncio.sleep(wait_s)
+        attempts += 1
+    raise requests.HTTPError(f"{last_err[0]} {last_err[1]}: {last_err[2]}")
+
+
 # Ollama support removed per project configuration.
@@ -0,0 +1,451 @@
+"""Local OpenAI-compatible stand-in for the Groq chat-completions API.
+
+Point the app at it with ``GROQ_BASE_URL=http://127.0.0.1:8765/openai/v1``
+(read by `utils.llm_providers` on every call, so `groq_chat` and
+`utils.llm.llm_chat` both follow it), or in-process with
+``utils.llm_providers.use_base_url(server.base_url)``. Three modes:
+
+- ``replay``: answer from recorded cassettes (JSONL), keyed like the response cache
+- ``synthetic``: deterministic fake answers with configurable latency,
+  429/5xx injection and ``x-ratelimit-*`` headers. Structured answers are
+  keyed on the answer formats in `utils.structured_output` that the prompts
+  embed; `register_synthesizer` adds more
+- ``record``: proxy to the real API and append every exchange to a cassette
+
+Usage:
+    python -m utils.llm_standin --mode synthetic --latency-ms 300 --rate-429 0.05
+    python -m utils.llm_standin --mode record --cassette .cache/llm/cassette.jsonl
+    python -m utils.llm_standin --mode replay --cassette .cache/llm/cassette.jsonl
+"""
+
+import os
+import re
+import json
+import time
+import random
+import argparse
+import threading
+import sys
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from .llm_cache import request_key
+from .structured_output import (JOB_SKILLS_FORMAT, QUESTIONS_FORMAT, SKILL_LIST_FORMAT, SKILL_SCORES_FORMAT,
+                                WEAKNESSES_FORMAT)
+
+UPSTREAM_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+
+@dataclass
+class StandinConfig:
+    mode: str = "synthetic"            # replay | synthetic | record
+    cassette: str = os.path.join(".cache", "llm", "cassette.jsonl")
+    latency_ms: float = 0.0            # mean added latency per response
+    jitter_ms: float = 0.0             # uniform +/- jitter around the mean
+    model_latency_ms: dict = field(default_factory=dict)  # per-model override of latency_ms
+    rate_429: float = 0.0              # probability of answering 429
+    rate_5xx: float = 0.0              # probability of answering 503
+    retry_after_s: float = 1.0         # retry-after sent with injected 429s
+    rpm: int = 30                      # request budget advertised in headers
+    tpm: int = 6000                    # token budget advertised in headers
+    seed: int = 0
+    replay_fallback: bool = False      # synthesize answers for cassette misses
+    upstream: str = UPSTREAM_URL
+
+
+def _payload_key(payload: dict) -> str:
+    # Streamed and non-streamed calls for the same request share a cassette entry
+    return request_key({k: v for k, v in payload.items() if k != "stream"})
+
+
+def _prompt_text(payload: dict) -> str:
+    return "\n".join(str(m.get("content") or "") for m in payload.get("messages") or [])
+
+
+def _csv_after(label: str, text: str) -> list:
+    # The requested list comes last; earlier matches may be resume content ("Skills: ...")
+    matches = re.findall(rf"^\s*{label}:\s*(.+)", text, re.MULTILINE)
+    if not matches:
+        return []
+    return [s.strip() for s in re.split(r",\s*(?![^(]*\))", matches[-1]) if s.strip()]
+
+
+def _skill_scores(prompt: str, rng: random.Random) -> str:
+    skills = _csv_after("Skills", prompt)
+    return json.dumps({
+        "skill_scores": {s: rng.randint(2, 10) for s in skills},
+        "skill_reasoning": {s: f"Synthetic assessment of {s}." for s in skills},
+    })
+
+
+def _weaknesses(prompt: str, rng: random.Random) -> str:
+    return json.dumps({
+        s: {
+            "detail": f"{s} is not clearly demonstrated.",
+            "suggestions": [f"Add a project that uses {s}.", f"Quantify results achieved with {s}."],
+            "example": f"Built a {s} pipeline that cut processing time by {rng.randint(10, 60)}%.",
+        }
+        for s in _csv_after("Skills", prompt)
+    })
+
+
+def _job_skills(prompt: str, rng: random.Random) -> str:
+    jobs = re.split(r"^\s*Job (\d+):\s*$", prompt, flags=re.MULTILINE)[1:]
+    return json.dumps({
+        n: list(dict.fromkeys(re.findall(r"\b[A-Z][A-Za-z\+#\.]{1,20}\b", body)))[:15] or ["Communication"]
+        for n, body in zip(jobs[::2], jobs[1::2])
+    })
+
+
+def _skill_list(prompt: str, rng: random.Random) -> str:
+    words = re.findall(r"\b[A-Z][A-Za-z\+#\.]{1,20}\b", prompt.split("Job Description:", 1)[-1])
+    return ", ".join(list(dict.fromkeys(words))[:15]) or "Communication, Teamwork"
+
+
+def _questions(prompt: str, rng: random.Random) -> str:
+    m = re.search(r"Generate exactly (\d+)", prompt)
+    types = [t.rstrip(".") for t in _csv_after("Only include question types from this list", prompt)] or ["Technical"]
+    return json.dumps([
+        {
+            "type": types[i % len(types)],
+            "question": f"Synthetic question {i + 1} ({rng.randint(0, 999)})?",
+            "solution": "A concise synthetic answer describing context, action and measurable result.",
+        }
+        for i in range(int(m.group(1)) if m else 1)
+    ])
+
+
+# (answer format embedded in the prompt, synthesizer(prompt, rng) -> answer text)
+SYNTHESIZERS = [
+    (SKILL_SCORES_FORMAT, _skill_scores),
+    (WEAKNESSES_FORMAT, _weaknesses),
+    (JOB_SKILLS_FORMAT, _job_skills),
+    (SKILL_LIST_FORMAT, _skill_list),
+    (QUESTIONS_FORMAT, _questions),
+]
+
+
+def register_synthesizer(answer_format: str, fn) -> None:
+    """Answer prompts that embed `answer_format` with `fn(prompt, rng)` (checked before the built-ins)."""
+    SYNTHESIZERS.insert(0, (answer_format, fn))
+
+
+def synthetic_content(payload: dict) -> str:
+    """Deterministic answer shaped like the answer format the prompt asks for."""
+    prompt = _prompt_text(payload)
+    rng = random.Random(int(_payload_key(payload)[:16], 16))
+    for answer_format, fn in SYNTHESIZERS:
+        if answer_format in prompt:
+            return fn(prompt, rng)
+
+    vocab = ["resume", "experience", "project", "impact", "skills", "team", "delivered", "improved",
+             "designed", "metrics", "python", "systems", "results", "customers", "scaled"]
+    n_words = max(5, min(int(payload.get("max_tokens") or 100), 400) // 2)
+    return " ".join(rng.choice(vocab) for _ in range(n_words)).capitalize() + "."
+
+
+def _completion_body(payload: dict, content: str) -> dict:
+    prompt_tokens = len(_prompt_text(payload)) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": "chatcmpl-standin-" + _payload_key(payload)[:12],
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+class _Cassette:
+    """Append-only JSONL store of request/response exchanges."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+                    except (ValueError, KeyError):
+                        continue
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def append(self, key: str, payload: dict, status: int, body) -> None:
+        entry = {"key": key, "request": payload, "status": status, "response": body}
+        with self._lock:
+            self._entries[key] = entry
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class _Budget:
+    """Per-minute request/token window used to emit realistic ratelimit headers."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm, self.tpm = rpm, tpm
+        self._lock = threading.Lock()
+        self._window = time.monotonic()
+        self._requests = 0
+        self._tokens = 0
+
+    def charge(self, tokens: int) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window >= 60:
+                self._window, self._requests, self._tokens = now, 0, 0
+            self._requests += 1
+            self._tokens += tokens
+            reset = max(0.0, 60 - (now - self._window))
+            return {
+                "x-ratelimit-limit-requests": str(self.rpm),
+                "x-ratelimit-remaining-requests": str(max(0, self.rpm - self._requests)),
+                "x-ratelimit-reset-requests": f"{reset:.2f}s",
+                "x-ratelimit-limit-tokens": str(self.tpm),
+                "x-ratelimit-remaining-tokens": str(max(0, self.tpm - self._tokens)),
+                "x-ratelimit-reset-tokens": f"{reset:.2f}s",
+            }
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the stand-in configuration and state."""
+
+    daemon_threads = True
+
+    def __init__(self, address, config: StandinConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.cassette = _Cassette(config.cassette) if config.mode in ("replay", "record") else None
+        self.budget = _Budget(config.rpm, config.tpm)
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+        self.stats = {"requests": 0, "replayed": 0, "synthetic": 0, "recorded": 0, "injected_429": 0, "injected_5xx": 0}
+
+    def handle_error(self, request, client_address):
+        # Clients that hang up early (cancelled hedges, timeouts) are expected
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def roll(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def jitter(self, ms: float) -> float:
+        """Latency jitter in [-ms, ms] from the seeded RNG, so replay timing is reproducible."""
+        if not ms:
+            return 0.0
+        with self._rng_lock:
+            return self._rng.uniform(-ms, ms)
+
+    def count(self, name: str) -> None:
+        with self._rng_lock:
+            self.stats[name] += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/openai/v1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandinServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):  # keep benchmark output clean
+        pass
+
+    def _send_json(self, status: int, body, headers: dict | None = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_sse(self, content: str, payload: dict, headers: dict, delay_s: float) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        pieces = re.findall(r"\S+\s*", content) or [content]
+        per_piece = delay_s / max(1, len(pieces))
+        for piece in pieces:
+            chunk = {"object": "chat.completion.chunk", "model": payload.get("model"),
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if per_piece:
+                time.sleep(per_piece)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            from .llm import AVAILABLE_MODELS
+            models = [{"id": m, "object": "model"} for m in AVAILABLE_MODELS.get("groq", [])]
+            self._send_json(200, {"object": "list", "data": models})
+            return
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        cfg = self.server.config
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON body"}})
+            return
+        self.server.count("requests")
+        key = _payload_key(payload)
+        stream = bool(payload.get("stream"))
+
+        # Fault injection applies to every mode so retry paths can be exercised
+        roll = self.server.roll()
+        if roll < cfg.rate_429:
+            self.server.count("injected_429")
+            wait = cfg.retry_after_s
+            self._send_json(429, {"error": {"message": f"Rate limit reached. Please try again in {wait:.2f}s.",
+                                            "type": "tokens", "code": "rate_limit_exceeded"}},
+                            {"retry-after": f"{wait:g}"})
+            return
+        if roll < cfg.rate_429 + cfg.rate_5xx:
+            self.server.count("injected_5xx")
+            self._send_json(503, {"error": {"message": "Service unavailable (injected)"}})
+            return
+
+        latency_ms = cfg.model_latency_ms.get(payload.get("model"), cfg.latency_ms)
+        delay_s = max(0.0, latency_ms + self.server.jitter(cfg.jitter_ms)) / 1000.0
+
+        if cfg.mode == "record":
+            self._record(payload, key, stream)
+            return
+
+        status, body = 200, None
+        if cfg.mode == "replay":
+            entry = self.server.cassette.get(key)
+            if entry is not None:
+                self.server.count("replayed")
+                status, body = entry.get("status", 200), entry.get("response")
+            elif not cfg.replay_fallback:
+                self._send_json(404, {"error": {"message": f"no cassette entry for request {key[:12]}"}})
+                return
+        if body is None:
+            self.server.count("synthetic")
+            body = _completion_body(payload, synthetic_content(payload))
+
+        usage = (body or {}).get("usage") or {}
+        headers = self.server.budget.charge(int(usage.get("total_tokens") or 0))
+        if stream and status == 200:
+            content = body["choices"][0]["message"]["content"]
+            self._send_sse(content, payload, headers, delay_s)
+            return
+        if delay_s:
+            time.sleep(delay_s)
+        self._send_json(status, body, headers)
+
+    def _record(self, payload: dict, key: str, stream: bool) -> None:
+        # Upstream is always called without streaming so the cassette holds one
+        # complete body; streamed callers get it re-chunked as SSE.
+        cfg = self.server.config
+        upstream_payload = {k: v for k, v in payload.items() if k != "stream"}
+        try:
+            resp = requests.post(cfg.upstream, json=upstream_payload, timeout=60,
+                                 headers={"Authorization": self.headers.get("Authorization", ""),
+                                          "Content-Type": "application/json"})
+        except requests.RequestException as e:
+            self._send_json(502, {"error": {"message": f"upstream request failed: {e}"}})
+            return
+        try:
+            body = resp.json()
+        except ValueError:
+            body = {"error": {"message": resp.text}}
+        passthrough = {k: v for k, v in resp.headers.items()
+                       if k.lower().startswith("x-ratelimit") or k.lower() == "retry-after"}
+        if resp.status_code == 200:
+            self.server.cassette.append(key, upstream_payload, resp.status_code, body)
+            self.server.count("recorded")
+            if stream:
+                self._send_sse(body["choices"][0]["message"]["content"], payload, passthrough, 0.0)
+                return
+        self._send_json(resp.status_code, body, passthrough)
+
+
+def start_standin(config: StandinConfig | None = None, host: str = "127.0.0.1", port: int = 0) -> StandinServer:
+    """Start a stand-in server on a background thread (port 0 picks a free port).
+
+    Returns the server; redirect calls to it with
+    ``utils.llm_providers.use_base_url(server.base_url)`` (or `set_base_url`)
+    and stop it with `server.shutdown()`.
+    """
+    server = StandinServer((host, port), config or StandinConfig())
+    threading.Thread(target=server.serve_forever, name="llm-standin", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OpenAI-compatible Groq stand-in (replay / synthetic / record)")
+    parser.add_argument("--mode", choices=["replay", "synthetic", "record"], default="synthetic")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cassette", default=StandinConfig.cassette)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--model-latency", action="append", default=[], metavar="MODEL=MS",
+                        help="per-model latency override (repeatable), e.g. llama-3.1-8b-instant=5000")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--rpm", type=int, default=30)
+    parser.add_argument("--tpm", type=int, default=6000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay-fallback", action="store_true", help="synthesize answers for cassette misses")
+    parser.add_argument("--upstream", default=UPSTREAM_URL)
+    args = parser.parse_args(argv)
+
+    config = StandinConfig(
+        mode=args.mode, cassette=args.cassette, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        model_latency_ms={m: float(ms) for m, ms in (item.rsplit("=", 1) for item in args.model_latency)},
+        rate_429=args.rate_429, rate_5xx=args.rate_5xx, retry_after_s=args.retry_after,
+        rpm=args.rpm, tpm=args.tpm, seed=args.seed, replay_fallback=args.replay_fallback, upstream=args.upstream,
+    )
+    server = StandinServer((args.host, args.port), config)
+    extra = f", {len(server.cassette)} cassette entries" if server.cassette is not None else ""
+    print(f"LLM stand-in ({config.mode}{extra}) listening; set GROQ_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"LLM stand-in stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Token-budget-aware prompt assembly.
+
+Counts tokens with `tiktoken` for the models in `utils.llm.AVAILABLE_MODELS`
+and fills a model's context budget with the highest-priority prompt
+segments, instead of cutting text at fixed character offsets.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+try:
+    import tiktoken
+except Exception:  # optional at runtime; fall back to a chars/4 estimate
+    tiktoken = None
+
+# Tokens held back for chat-format overhead and estimation error
+SAFETY_MARGIN = 64
+
+
+def _encoding_name(model: str | None) -> str:
+    # gpt-oss models use the o200k family; Llama 3 BPE is closest to cl100k
+    return "o200k_base" if (model or "").startswith("openai/") else "cl100k_base"
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(name: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        print(f"tiktoken encoding '{name}' unavailable, estimating tokens: {e}")
+        return None
+
+
+def count_tokens(text: str | None, model: str | None = None) -> int:
+    """Count tokens in `text` for `model`.
+
+    Args:
+        text: Text to measure
+        model: Model name (selects the tokenizer)
+
+    Returns:
+        Token count (chars/4 estimate when tiktoken is unavailable)
+    """
+    if not text:
+        return 0
+    enc = _get_encoding(_encoding_name(model))
+    if enc is None:
+        return (len(text) + 3) // 4
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: list, model: str | None = None) -> int:
+    """Count prompt tokens for a chat message list (content + per-message overhead)."""
+    return sum(count_tokens(str(m.get("content") or ""), model) + 4 for m in (messages or [])) + 2
+
+
+def clamp_tokens(text: str | None, max_tokens: int, model: str | None = None, keep: str = "head") -> str:
+    """Clamp text to at most `max_tokens` tokens.
+
+    Args:
+        text: Text to clamp
+        max_tokens: Maximum tokens to keep
+        model: Model name (selects the tokenizer)
+        keep: "head" keeps the beginning, "tail" keeps the end
+
+    Returns:
+        Clamped text or empty string if text is None
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    enc = _get_encoding(_encoding_name(model))
+    if enc is None:
+        max_chars = max_tokens * 4
+        if len(text) <= max_chars:
+            return text
+        return text[-max_chars:] if keep == "tail" else text[:max_chars]
+    ids = enc.encode(text, disallowed_special=())
+    if len(ids) <= max_tokens:
+        return text
+    ids = ids[-max_tokens:] if keep == "tail" else ids[:max_tokens]
+    return enc.decode(ids)
+
+
+def _model_limits(model: str | None) -> dict:
+    # Imported lazily: utils.llm -> llm_providers -> rate_limit -> this module
+    from .llm import MODEL_LIMITS, DEFAULTS
+    return MODEL_LIMITS.get(model or DEFAULTS["groq"]) or {}
+
+
+def context_window(model: str | None) -> int:
+    """Context window (tokens) for `model`."""
+    return _model_limits(model).get("context_window", 8192)
+
+
+def max_completion_tokens(model: str | None) -> int:
+    """Largest completion the provider accepts for `model`."""
+    return _model_limits(model).get("max_completion_tokens", 4096)
+
+
+@dataclass
+class _Segment:
+    text: str
+    priority: int
+    max_tokens: int | None
+    keep: str
+    name: str
+    tokens: int = 0
+
+
+@dataclass
+class PromptPlan:
+    """Token accounting for an assembled prompt."""
+    prompt: str
+    prompt_tokens: int
+    completion_tokens: int
+    budget: int
+    truncated: list = field(default_factory=list)
+    dropped: list = field(default_factory=list)
+
+
+class PromptBuilder:
+    """Assemble a prompt from prioritised segments within a token budget.
+
+    Segments keep the order in which they were added; when the budget is
+    short, lower-priority segments are clamped (or dropped) first.
+
+    Example:
+        plan = (PromptBuilder(model, max_completion=600, budget=900)
+                .add(instructions, priority=100)
+                .add(resume_text, priority=50, max_tokens=500)
+                .build())
+    """
+
+    def __init__(self, model: str | None = None, max_completion: int = 600, budget: int | None = None):
+        self.model = model
+        self.max_completion = min(max_completion, max_completion_tokens(model))
+        window_budget = context_window(model) - self.max_completion - SAFETY_MARGIN
+        self.budget = max(0, min(budget, window_budget) if budget else window_budget)
+        self._segments: list[_Segment] = []
+
+    def add(self, text: str | None, priority: int = 0, max_tokens: int | None = None,
+            keep: str = "head", name: str | None = None) -> "PromptBuilder":
+        """Add a segment.
+
+        Args:
+            text: Segment text (empty segments are ignored)
+            priority: Higher priorities are filled first
+            max_tokens: Optional cap for this segment alone
+            keep: Which end to keep when clamping ("head" or "tail")
+            name: Label used in the plan's truncation report
+        """
+        if text:
+            self._segments.append(_Segment(text, priority, max_tokens, keep, name or f"segment{len(self._segments)}"))
+        return self
+
+    def build(self, separator: str = "") -> PromptPlan:
+        """Fill the budget by priority and return the assembled prompt with its token plan."""
+        remaining = self.budget
+        truncated, dropped = [], []
+        for seg in sorted(self._segments, key=lambda s: -s.priority):
+            limit = remaining if seg.max_tokens is None else min(seg.max_tokens, remaining)
+            full = count_tokens(seg.text, self.model)
+            if full > limit:
+                if limit <= 0:
+                    seg.text, seg.tokens = "", 0
+                    dropped.append(seg.name)
+                    continue
+                seg.text = clamp_tokens(seg.text, limit, self.model, keep=seg.keep)
+                seg.tokens = count_tokens(seg.text, self.model)
+                truncated.append(seg.name)
+            else:
+                seg.tokens = full
+            remaining -= seg.tokens
+        prompt = separator.join(seg.text for seg in self._segments if seg.text)
+        return PromptPlan(
+            prompt=prompt,
+            prompt_tokens=count_tokens(prompt, self.model),
+            completion_tokens=self.max_completion,
+            budget=self.budget,
+            truncated=truncated,
+            dropped=dropped,
+        )
@@ -0,0 +1,224 @@
+"""Process-wide, header-driven rate limiting for Groq calls.
+
+Groq reports its budget on every response through the
+``x-ratelimit-{limit,remaining,reset}-{requests,tokens}`` headers. The
+limiter mirrors those numbers in two token buckets (requests and tokens)
+and makes callers wait *before* sending a request that would exceed the
+remaining budget, instead of finding out through a 429.
+"""
+
+import re
+import time
+import asyncio
+import hashlib
+import threading
+
+from .prompt_budget import count_message_tokens
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value) -> float | None:
+    """Parse Groq reset/retry durations such as ``"2m59.56s"``, ``"7.66s"`` or ``"12"``.
+
+    Args:
+        value: Header value (string or number)
+
+    Returns:
+        Seconds as float, or None if the value cannot be parsed
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(text)
+    if not parts:
+        return None
+    return sum(float(num) * _UNIT_SECONDS[unit] for num, unit in parts)
+
+
+def estimate_tokens(messages: list, max_tokens: int = 0, model: str | None = None) -> int:
+    """Token cost of a chat request (prompt + reserved completion).
+
+    Args:
+        messages: Chat messages
+        max_tokens: Completion budget requested
+        model: Model name (selects the tokenizer)
+
+    Returns:
+        Estimated tokens counted against the provider's TPM budget
+    """
+    return count_message_tokens(messages, model) + int(max_tokens or 0)
+
+
+class _Bucket:
+    """Token bucket whose level and refill rate are set from response headers."""
+
+    def __init__(self):
+        self.capacity = None  # unknown until the first response
+        self.level = 0.0
+        self.rate = 0.0
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        if self.capacity is None:
+            return
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: float) -> float:
+        if self.capacity is None:
+            return 0.0
+        cost = min(cost, self.capacity)
+        if self.level >= cost:
+            return 0.0
+        if self.rate <= 0:
+            return 1.0
+        return (cost - self.level) / self.rate
+
+    def consume(self, cost: float) -> None:
+        if self.capacity is not None:
+            self.level -= min(cost, self.capacity)
+
+    def observe(self, limit, remaining, reset_s, now: float) -> None:
+        if remaining is None:
+            return
+        if limit:
+            self.capacity = float(limit)
+        elif self.capacity is None:
+            self.capacity = float(remaining)
+        self.level = float(remaining)
+        missing = max(0.0, self.capacity - self.level)
+        if reset_s and reset_s > 0:
+            self.rate = missing / reset_s if missing > 0 else self.capacity / max(reset_s, 1.0)
+        elif self.rate <= 0:
+            self.rate = self.capacity / 60.0
+        self.updated = now
+
+
+class RateLimiter:
+    """Paces requests against request and token budgets reported by the provider."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.requests = _Bucket()
+        self.tokens = _Bucket()
+        self.blocked_until = 0.0
+        self.waits = 0
+        self.waited_s = 0.0
+
+    def _wait_time(self, cost: int, now: float) -> float:
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        return max(self.blocked_until - now, self.requests.wait_time(1), self.tokens.wait_time(cost))
+
+    def _try_take(self, cost: int) -> float:
+        """Consume budget if available, else return the seconds to wait."""
+        now = time.monotonic()
+        wait = self._wait_time(cost, now)
+        if wait <= 0:
+            self.requests.consume(1)
+            self.tokens.consume(cost)
+        return wait
+
+    def acquire(self, cost: int, timeout: float | None = None) -> float:
+        """Block until `cost` tokens and one request fit the budget; return seconds waited.
+
+        With `timeout`, raise TimeoutError as soon as the required wait is
+        known to exceed it (instead of sleeping and failing later).
+        """
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                wait = self._try_take(cost)
+                if wait <= 0:
+                    break
+                if timeout is not None and time.monotonic() + wait > start + timeout:
+                    raise TimeoutError(f"rate limit wait of {wait:.1f}s exceeds the time left")
+                self._cond.wait(min(wait, 1.0))
+        return self._account(start)
+
+    async def acquire_async(self, cost: int) -> float:
+        """Async counterpart of `acquire` (sleeps without blocking the loop)."""
+        start = time.monotonic()
+        while True:
+            with self._cond:
+                wait = self._try_take(cost)
+            if wait <= 0:
+                break
+            await asyncio.sleep(min(wait, 1.0))
+        return self._account(start)
+
+    def _account(self, start: float) -> float:
+        waited = time.monotonic() - start
+        if waited > 0.001:
+            with self._cond:
+                self.waits += 1
+                self.waited_s += waited
+        return waited
+
+    def update_from_headers(self, headers) -> None:
+        """Sync bucket state with the ``x-ratelimit-*`` response headers."""
+        if not headers:
+            return
+
+        def _int(name):
+            try:
+                return int(float(headers.get(name)))
+            except (TypeError, ValueError):
+                return None
+
+        now = time.monotonic()
+        with self._cond:
+            self.requests.observe(
+                _int("x-ratelimit-limit-requests"), _int("x-ratelimit-remaining-requests"),
+                parse_duration(headers.get("x-ratelimit-reset-requests")), now,
+            )
+            self.tokens.observe(
+                _int("x-ratelimit-limit-tokens"), _int("x-ratelimit-remaining-tokens"),
+                parse_duration(headers.get("x-ratelimit-reset-tokens")), now,
+            )
+            self._cond.notify_all()
+
+    def block_for(self, seconds: float) -> None:
+        """Hold every caller for `seconds` (e.g. after a 429 with retry-after)."""
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + max(0.0, seconds))
+
+    def stats(self) -> dict:
+        """Return current bucket levels and cumulative queueing time."""
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                "requests_remaining": None if self.requests.capacity is None else int(self.requests.level),
+                "tokens_remaining": None if self.tokens.capacity is None else int(self.tokens.level),
+                "blocked_for_s": max(0.0, round(self.blocked_until - now, 3)),
+                "waits": self.waits,
+                "waited_s": round(self.waited_s, 3),
+            }
+
+
+_LIMITERS: dict[tuple[str, str], RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(api_key: str, model: str) -> RateLimiter:
+    """Return the shared limiter for an (API key, model) pair.
+
+    Groq budgets are per organisation and per model, so each pair gets its
+    own buckets; the key is hashed so it is never kept in memory verbatim.
+    """
+    key = (hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16], model or "")
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            limiter = _LIMITERS[key] = RateLimiter()
+        return limiter
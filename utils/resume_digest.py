@@ -0,0 +1,212 @@
+"""Compact, structured resume digest shared by every prompt.
+
+The digest is a deduplicated extract of the whole resume (skills, roles,
+achievements, metrics, education) built once per `resume_hash`, so prompts
+see content from every section instead of only the first N characters.
+
+Building one is a few milliseconds of regex work, so digests are kept in a
+small in-process LRU (`cached_resume_digest`) rather than in the database.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from .prompt_budget import clamp_tokens
+from .text_utils import compute_hash
+
+# Bump when the extraction changes so cached digests are rebuilt
+DIGEST_VERSION = 3
+DIGEST_CACHE_SIZE = int(os.getenv("RESUME_DIGEST_CACHE_SIZE", "256"))
+
+MAX_ROLES = 8
+MAX_ACHIEVEMENTS = 12
+MAX_METRICS = 15
+MAX_EDUCATION = 4
+
+_SECTION_RE = re.compile(
+    r"^(technical\s+skills|skills|core\s+competencies|technologies|experience|work\s+experience|"
+    r"professional\s+experience|employment|projects|education|certifications|achievements|awards|summary|profile)\s*:?\s*$",
+    re.IGNORECASE,
+)
+_BULLET_RE = re.compile(r"^\s*(?:[-*•▪◦●‣–]|\d+[.)])\s+")
+_DATE_RE = re.compile(
+    r"((?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?(19|20)\d{2}"
+    r"|\bpresent\b|\bcurrent\b",
+    re.IGNORECASE,
+)
+_ROLE_RE = re.compile(
+    r"\b(engineer|developer|intern|manager|analyst|scientist|lead|architect|consultant|designer|"
+    r"administrator|specialist|researcher|director|head|founder|associate|sde|swe)\b",
+    re.IGNORECASE,
+)
+_EDU_RE = re.compile(
+    r"\b(b\.?\s?tech|m\.?\s?tech|b\.?\s?e\b|b\.?\s?sc|m\.?\s?sc|bachelor|master|ph\.?d|mba|diploma|university|college|institute)\b",
+    re.IGNORECASE,
+)
+_METRIC_RE = re.compile(
+    r"(?:[$€£₹]\s?\d[\d,.]*\s?(?:k|m|mn|bn|b|million|billion)?|\d[\d,.]*\s?(?:%|x\b|\+|k\b|m\b|ms\b|users|customers|"
+    r"requests|hours|days|people|members|million|billion))(?:\s+[A-Za-z][\w/-]*){0,3}",
+    re.IGNORECASE,
+)
+_ACTION_RE = re.compile(
+    r"^(built|led|designed|developed|implemented|created|improved|reduced|increased|launched|optimized|"
+    r"optimised|migrated|automated|delivered|managed|architected|scaled|deployed|shipped|drove|owned|mentored)\b",
+    re.IGNORECASE,
+)
+_SKILL_SPLIT_RE = re.compile(r"[,|;/•·]")
+_TRAILING_STOP_RE = re.compile(r"(?:\s+(?:for|of|in|to|by|and|the|a|an|with|on|at))+$", re.IGNORECASE)
+
+
+def _norm(line: str) -> str:
+    return re.sub(r"\W+", " ", line.lower()).strip()
+
+
+def _dedupe(items, limit: int | None = None) -> list:
+    seen, out = set(), []
+    for item in items:
+        key = _norm(item)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        out.append(item)
+        if limit and len(out) >= limit:
+            break
+    return out
+
+
+def _sections(lines: list) -> list:
+    """Tag each line with the (lower-cased) heading of the section it belongs to."""
+    current = ""
+    tagged = []
+    for line in lines:
+        m = _SECTION_RE.match(line)
+        if m:
+            current = m.group(1).lower()
+            continue
+        tagged.append((current, line))
+    return tagged
+
+
+def split_sections(resume_text: str) -> list:
+    """Split a resume into sections, and long sections into entries, each with a content hash.
+
+    A new block starts at every heading and at a non-bullet line that
+    follows bullets (the next role or project), so editing one bullet only
+    changes the hash of the entry it belongs to.
+
+    Returns:
+        List of dicts with heading, text and hash, in document order
+    """
+    lines = [re.sub(r"\s+", " ", ln).strip() for ln in (resume_text or "").splitlines()]
+    lines = [ln for ln in lines if ln]
+    blocks = []
+    prev_heading, prev_bullet = None, False
+    for heading, line in _sections(lines):
+        is_bullet = bool(_BULLET_RE.match(line))
+        if not blocks or heading != prev_heading or (prev_bullet and not is_bullet):
+            blocks.append((heading, []))
+        blocks[-1][1].append(line)
+        prev_heading, prev_bullet = heading, is_bullet
+    return [{"heading": heading, "text": "\n".join(body), "hash": compute_hash(heading + "\n" + "\n".join(body))}
+            for heading, body in blocks]
+
+
+def build_resume_digest(resume_text: str, skills: list | None = None) -> dict:
+    """Extract a structured digest from the full resume text.
+
+    Args:
+        resume_text: Raw resume text
+        skills: Skills already detected elsewhere (e.g. vocabulary matching), merged first
+
+    Returns:
+        Dict with summary, skills, roles, achievements, metrics, education and source size
+    """
+    lines = [re.sub(r"\s+", " ", ln).strip() for ln in (resume_text or "").splitlines()]
+    lines = [ln for ln in lines if ln]
+    tagged = _sections(lines)
+
+    found_skills = list(skills or [])
+    summary, roles, achievements, education = "", [], [], []
+    for section, line in tagged:
+        body = _BULLET_RE.sub("", line).strip()
+        if section in ("summary", "profile"):
+            summary = summary or body
+            continue
+        if "skill" in section or section in ("core competencies", "technologies"):
+            # "Languages: Python, Go" -> Python, Go
+            values = body.split(":", 1)[-1]
+            found_skills.extend(s.strip(" .") for s in _SKILL_SPLIT_RE.split(values) if 1 < len(s.strip(" .")) <= 40)
+            continue
+        if _EDU_RE.search(line) and (section == "education" or len(line) < 120):
+            education.append(body)
+            continue
+        is_bullet = bool(_BULLET_RE.match(line))
+        if not is_bullet and len(line) < 120 and _ROLE_RE.search(line) and (
+                _DATE_RE.search(line) or section in ("experience", "work experience", "professional experience", "employment")):
+            roles.append(body)
+            continue
+        if (is_bullet or _ACTION_RE.match(body)) and len(body) > 12:
+            achievements.append(body)
+
+    # Quantified achievements first: they carry the most signal per token
+    achievements = _dedupe(achievements)
+    achievements.sort(key=lambda a: 0 if _METRIC_RE.search(a) else 1)
+    metrics = [_TRAILING_STOP_RE.sub("", m.group(0).strip(" ,.;")) for a in achievements for m in _METRIC_RE.finditer(a)]
+
+    return {
+        "version": DIGEST_VERSION,
+        "summary": summary,
+        "skills": _dedupe(found_skills),
+        "roles": _dedupe(roles, MAX_ROLES),
+        "achievements": achievements[:MAX_ACHIEVEMENTS],
+        "metrics": _dedupe(metrics, MAX_METRICS),
+        "education": _dedupe(education, MAX_EDUCATION),
+        "source_chars": len(resume_text or ""),
+    }
+
+
+def digest_to_text(digest: dict, max_tokens: int | None = None, model: str | None = None) -> str:
+    """Render a digest as compact prompt text, optionally clamped to `max_tokens`."""
+    if not digest:
+        return ""
+    parts = []
+    if digest.get("summary"):
+        parts.append("Summary: " + digest["summary"])
+    if digest.get("skills"):
+        parts.append("Skills: " + ", ".join(digest["skills"]))
+    if digest.get("roles"):
+        parts.append("Roles:\n" + "\n".join(f"- {r}" for r in digest["roles"]))
+    if digest.get("achievements"):
+        parts.append("Achievements:\n" + "\n".join(f"- {a}" for a in digest["achievements"]))
+    if digest.get("metrics"):
+        parts.append("Metrics: " + "; ".join(digest["metrics"]))
+    if digest.get("education"):
+        parts.append("Education:\n" + "\n".join(f"- {e}" for e in digest["education"]))
+    text = "\n".join(parts)
+    return clamp_tokens(text, max_tokens, model) if max_tokens else text
+
+
+_DIGESTS = OrderedDict()
+_DIGESTS_LOCK = threading.Lock()
+
+
+def cached_resume_digest(resume_hash: str, build) -> dict:
+    """Digest for `resume_hash`, calling `build()` only on a miss.
+
+    Entries are keyed by `(resume_hash, DIGEST_VERSION)` and evicted
+    least-recently-used beyond `DIGEST_CACHE_SIZE`.
+    """
+    key = (resume_hash, DIGEST_VERSION)
+    with _DIGESTS_LOCK:
+        digest = _DIGESTS.get(key)
+        if digest is not None:
+            _DIGESTS.move_to_end(key)
+            return digest
+    digest = build()
+    with _DIGESTS_LOCK:
+        _DIGESTS[key] = digest
+        while len(_DIGESTS) > DIGEST_CACHE_SIZE:
+            _DIGESTS.popitem(last=False)
+    return digest
@@ -0,0 +1,101 @@
+"""Single-flight coalescing of identical in-flight calls.
+
+While a call for a given key is running, later callers with the same key
+wait for the first call's result instead of issuing their own request.
+"""
+
+import time
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key (threads and asyncio)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+        # asyncio tasks are loop-bound, so keep one table per event loop
+        self._async_calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+        self.leaders = 0
+        self.coalesced = 0
+        self.retried = 0
+
+    def do(self, key: str, fn, timeout: float | None = None, retry_on: tuple = ()):
+        """Run `fn()` once per key at a time; concurrent duplicates share its result.
+
+        Args:
+            key: Identity of the call (e.g. a request hash)
+            fn: Zero-argument callable performing the work
+            timeout: Longest a waiter blocks on other callers' results (TimeoutError after)
+            retry_on: Exceptions that belong to the caller that ran the call rather than
+                to the call itself (e.g. its own deadline running out); a waiter that
+                receives one runs the call again, as the new leader if none is in flight
+
+        Returns:
+            The result of `fn()` (or re-raises its exception for every waiter)
+        """
+        wait_until = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                fut = self._calls.get(key)
+                # A finished future is only waiting for its leader to unregister it
+                leader = fut is None or fut.done()
+                if leader:
+                    fut = Future()
+                    self._calls[key] = fut
+                    self.leaders += 1
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+            try:
+                return fut.result(None if wait_until is None else max(0.0, wait_until - time.monotonic()))
+            except retry_on:
+                if not fut.done():
+                    raise
+                self.retried += 1
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._calls.get(key) is fut:
+                    del self._calls[key]
+
+    async def do_async(self, key: str, coro_fn):
+        """Async counterpart of `do`; `coro_fn()` must return an awaitable."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._async_calls.setdefault(loop, {})
+            task = calls.get(key)
+            if task is None:
+                task = loop.create_task(coro_fn())
+                calls[key] = task
+                self.leaders += 1
+
+                def _forget(t, calls=calls):
+                    if calls.get(key) is t:
+                        calls.pop(key, None)
+
+                task.add_done_callback(_forget)
+            else:
+                self.coalesced += 1
+        # Shield so one waiter's cancellation does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        """Return how many calls led, were coalesced onto a leader, or re-ran after the leader's own failure."""
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "retried": self.retried}
+
+
+# Process-wide coalescer used by `utils.llm_providers`
+LLM_FLIGHTS = SingleFlight()
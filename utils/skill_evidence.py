@@ -0,0 +1,81 @@
+"""Per-skill analysis results keyed by the resume sections that support them.
+
+Any edit changes a resume's whole-text hash, so whole-resume caches miss
+on every revision. A skill's score, though, rests on the few sections that
+mention it. `evidence_key` addresses one result by (user, model, kind,
+skill, hashes of its supporting sections): a revision that leaves those
+sections untouched finds the stored result, and only skills whose
+evidence changed go back to the LLM.
+
+Results live in a small SQLite database with size-bounded LRU eviction
+(see `utils.sqlite_lru`).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+from .sqlite_lru import SQLiteLRU
+
+SKILL_EVIDENCE_PATH = os.getenv("SKILL_EVIDENCE_PATH") or os.path.join(".cache", "skills", "evidence.sqlite3")
+SKILL_EVIDENCE_MAX_BYTES = int(os.getenv("SKILL_EVIDENCE_MAX_BYTES", str(32 * 1024 * 1024)))
+SKILL_EVIDENCE_ENABLED = (os.getenv("SKILL_EVIDENCE_DISABLED") or "").lower() not in ("1", "true", "yes")
+
+# Bump when prompts or result shapes change so stored results are not reused
+EVIDENCE_VERSION = 2
+
+
+def evidence_key(scope: str, model: str, kind: str, skill: str, sections) -> str:
+    """Content address of one skill result given the hashes of its supporting sections."""
+    payload = [EVIDENCE_VERSION, scope or "", model or "", kind, str(skill).lower(), sorted(set(sections))]
+    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class SkillEvidenceCache(SQLiteLRU):
+    """Evidence key -> JSON result, with the supporting section hashes kept alongside."""
+
+    table = "evidence"
+    columns = "kind TEXT NOT NULL, value TEXT NOT NULL, sections TEXT NOT NULL"
+    label = "Skill evidence cache"
+
+    def __init__(self, path: str = SKILL_EVIDENCE_PATH, max_bytes: int = SKILL_EVIDENCE_MAX_BYTES,
+                 enabled: bool = SKILL_EVIDENCE_ENABLED):
+        super().__init__(path, max_bytes, enabled)
+
+    def get_many(self, keys) -> dict:
+        """Stored results for `keys`, as {key: value} (misses are absent)."""
+        if not self.enabled:
+            return {}
+        keys = list(dict.fromkeys(keys))
+        try:
+            with self._lock:
+                rows = self._select(self._connect(), keys, "value", time.time())
+                found = {key: json.loads(value) for key, value in rows}
+                self.hits += len(found)
+                self.misses += len(keys) - len(found)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Skill evidence cache read failed: {e}")
+            return {}
+        return found
+
+    def put_many(self, kind: str, entries: dict) -> None:
+        """Store {key: (value, supporting section hashes)} and evict least-recently-used rows if over budget."""
+        if not self.enabled or not entries:
+            return
+        now = time.time()
+        rows = []
+        for key, (value, sections) in entries.items():
+            blob = json.dumps(value, ensure_ascii=False)
+            hashes = json.dumps(sorted(set(sections)))
+            rows.append((key, kind, blob, hashes, len(blob) + len(hashes), now))
+        try:
+            with self._lock:
+                self._upsert(self._connect(), ("key", "kind", "value", "sections", "size", "accessed_at"), rows)
+        except sqlite3.Error as e:
+            print(f"Skill evidence cache write failed: {e}")
+
+
+# Process-wide cache used by `agents.resume_analyzer`
+SKILL_EVIDENCE_CACHE = SkillEvidenceCache()
@@ -0,0 +1,156 @@
+"""Precompiled skill-vocabulary matcher.
+
+The vocabulary is compiled once at import time into a single trie-shaped
+regular expression, so a text is scanned in one linear pass and matches
+come back leftmost-longest, already ordered by position. Matches must sit
+on token boundaries ("go" no longer matches inside "good"), and very short,
+ambiguous terms ("r", "c", "go") only count in the case they are written as
+skills ("R", "C", "Go"/"GO").
+"""
+
+import re
+
+SKILL_VOCAB = (
+    # Programming Languages
+    "python", "java", "javascript", "typescript", "c", "c++", "c#", "go", "golang", "rust", "kotlin", "swift",
+    "ruby", "php", "scala", "r", "matlab", "perl", "dart", "lua",
+    # Web/Frontend
+    "react", "next.js", "nextjs", "angular", "vue", "svelte", "html", "css", "html5", "css3", "sass", "scss", "less",
+    "tailwind", "bootstrap", "redux", "graphql", "webpack", "vite", "parcel", "gulp", "npm", "yarn", "pnpm",
+    # Backend/Frameworks
+    "node", "node.js", "express", "django", "flask", "fastapi", "spring", "spring boot", ".net", "dotnet", "asp.net",
+    "grpc", "rest", "restful", "microservices", "soap", "laravel", "rails", "ruby on rails",
+    # Databases
+    "sql", "mysql", "postgresql", "postgres", "mongodb", "redis", "elasticsearch", "cassandra", "dynamodb", "mariadb",
+    "oracle", "sqlite", "neo4j", "couchdb", "firestore",
+    # Message Queue/Streaming
+    "kafka", "rabbitmq", "activemq", "zeromq", "nats", "pulsar", "kinesis",
+    # Big Data/Analytics
+    "spark", "hadoop", "hive", "airflow", "databricks", "etl", "data warehouse", "snowflake", "bigquery", "redshift",
+    "presto", "flink",
+    # Machine Learning/AI
+    "machine learning", "deep learning", "ml", "dl", "nlp", "natural language processing", "computer vision", "cv",
+    "pandas", "numpy", "scikit-learn", "sklearn", "tensorflow", "pytorch", "keras", "transformers", "hugging face",
+    "bert", "gpt", "llm", "generative ai", "langchain", "llama", "rag",
+    # DevOps/Cloud
+    "docker", "kubernetes", "k8s", "terraform", "ansible", "puppet", "chef", "jenkins", "gitlab", "github actions",
+    "ci/cd", "cicd", "git", "github", "bitbucket", "linux", "unix", "bash", "shell", "aws", "azure", "gcp",
+    "google cloud", "cloud", "heroku", "vercel", "netlify", "cloudflare",
+    # AWS Services
+    "ec2", "s3", "lambda", "rds", "cloudformation", "ecs", "eks", "sqs", "sns", "cloudwatch", "iam", "vpc", "route53",
+    "api gateway",
+    # Azure Services
+    "azure functions", "azure sql", "blob storage", "cosmos db", "aks", "azure devops",
+    # GCP Services
+    "compute engine", "cloud storage", "cloud functions", "cloud run", "gke", "pub/sub",
+    # Mobile
+    "android", "ios", "react native", "flutter", "swiftui", "xamarin", "ionic",
+    # Testing/QA
+    "pytest", "unittest", "selenium", "cypress", "playwright", "junit", "jest", "mocha", "jasmine", "testng",
+    "postman", "jmeter", "loadrunner",
+    # Methodologies
+    "agile", "scrum", "kanban", "waterfall", "devops", "tdd", "test driven development", "bdd",
+    "behavior driven development",
+    # Soft Skills
+    "leadership", "communication", "teamwork", "problem solving", "analytical", "critical thinking",
+    "project management", "time management",
+    # Tools
+    "jira", "confluence", "slack", "trello", "asana", "figma", "sketch", "insomnia", "datadog", "new relic", "splunk",
+    "prometheus", "grafana", "tableau", "power bi", "excel", "jupyter", "vscode", "intellij", "eclipse", "vim",
+    # Security
+    "oauth", "jwt", "ssl", "tls", "encryption", "authentication", "authorization", "security", "cybersecurity",
+    "penetration testing", "owasp",
+    # Other Tech
+    "api", "json", "xml", "yaml", "websocket", "protobuf", "openapi", "swagger", "nginx", "apache", "tomcat", "iis",
+    "solr", "memcached",
+)
+
+# Terms that are ordinary words/letters in lower case; only these spellings count
+CASE_SENSITIVE_TERMS = {
+    "r": {"R"},
+    "c": {"C"},
+    "go": {"Go", "GO"},
+}
+
+# Characters that continue a token ("c" must not match inside "c++" or "c_api")
+_WORD_CHARS = r"A-Za-z0-9_+#"
+# Single letters next to these are abbreviations, not languages ("R&D", "C-level", "C's")
+_AMBIGUOUS_NEIGHBOURS = "&'’-"
+
+
+def _trie_regex(terms) -> str:
+    """Render terms as a trie-shaped alternation (longest alternative tried first)."""
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: dict) -> str:
+        alts = [(r"\s+" if ch == " " else re.escape(ch)) + render(child)
+                for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return render(trie)
+
+
+class SkillMatcher:
+    """Single-pass, boundary-aware matcher over a fixed skill vocabulary.
+
+    Example:
+        for start, end, term in SKILL_MATCHER.finditer(jd_text):
+            ...
+    """
+
+    def __init__(self, terms, case_sensitive: dict | None = None):
+        self.terms = frozenset(t.lower() for t in terms)
+        self.case_sensitive = dict(CASE_SENSITIVE_TERMS if case_sensitive is None else case_sensitive)
+        self._pattern = re.compile(
+            rf"(?<![{_WORD_CHARS}])(?:{_trie_regex(sorted(self.terms))})(?![{_WORD_CHARS}])",
+            re.IGNORECASE,
+        )
+
+    def _accept(self, text: str, start: int, end: int, term: str) -> bool:
+        allowed = self.case_sensitive.get(term)
+        if allowed is None:
+            return True
+        if text[start:end] not in allowed:
+            return False
+        if len(term) == 1:
+            before = text[start - 1] if start else ""
+            after = text[end] if end < len(text) else ""
+            if (before and before in _AMBIGUOUS_NEIGHBOURS) or (after and after in _AMBIGUOUS_NEIGHBOURS):
+                return False
+        return True
+
+    def finditer(self, text: str):
+        """Yield (start, end, term) for each match, in order of position."""
+        if not text:
+            return
+        for m in self._pattern.finditer(text):
+            term = " ".join(m.group(0).lower().split())
+            if self._accept(text, m.start(), m.end(), term):
+                yield m.start(), m.end(), term
+
+    def find_all(self, text: str) -> list:
+        """All matches as (start, end, term) tuples."""
+        return list(self.finditer(text))
+
+    def find_skills(self, text: str) -> list:
+        """Distinct vocabulary terms in order of first appearance."""
+        seen = {}
+        for _, _, term in self.finditer(text):
+            seen.setdefault(term, None)
+        return list(seen)
+
+
+SKILL_MATCHER = SkillMatcher(SKILL_VOCAB)
+
+
+def find_skills(text: str) -> list:
+    """Distinct vocabulary skills in `text`, in order of first appearance."""
+    return SKILL_MATCHER.find_skills(text)
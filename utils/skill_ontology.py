@@ -0,0 +1,428 @@
+"""Skill ontology: canonical names, aliases and categories.
+
+Skills reach the system from several places (vocabulary matching, LLM
+extraction, role requirements, user-supplied custom skills), each with its
+own spelling ("node", "node.js", "Node.js"). `canonicalize` maps all of
+them to one display name, so caches and aggregates keyed by skill agree.
+Strings that are not in the alias index can optionally be resolved to the
+nearest canonical skill by embedding similarity.
+"""
+
+import os
+import re
+import threading
+from functools import lru_cache
+
+try:
+    import numpy as np
+except Exception:  # only needed for the embedding fallback
+    np = None
+
+SKILL_ONTOLOGY_EMBEDDINGS = (os.getenv("SKILL_ONTOLOGY_EMBEDDINGS") or "1").lower() not in ("0", "false", "no")
+SKILL_ONTOLOGY_MIN_SIMILARITY = float(os.getenv("SKILL_ONTOLOGY_MIN_SIMILARITY", "0.88"))
+
+# category -> [(canonical id, display name, aliases)]
+_ONTOLOGY = {
+    "language": [
+        ("python", "Python", ("python3", "py")),
+        ("java", "Java", ()),
+        ("javascript", "JavaScript", ("js", "ecmascript", "es6")),
+        ("typescript", "TypeScript", ("ts",)),
+        ("c", "C", ("c language",)),
+        ("cpp", "C++", ("c++", "cplusplus", "cpp")),
+        ("csharp", "C#", ("c#", "c sharp", "csharp")),
+        ("go", "Go", ("golang", "go lang")),
+        ("rust", "Rust", ()),
+        ("kotlin", "Kotlin", ()),
+        ("swift", "Swift", ()),
+        ("ruby", "Ruby", ()),
+        ("php", "PHP", ()),
+        ("scala", "Scala", ()),
+        ("r", "R", ("r language", "r programming")),
+        ("matlab", "MATLAB", ()),
+        ("perl", "Perl", ()),
+        ("dart", "Dart", ()),
+        ("lua", "Lua", ()),
+        ("bash", "Bash", ("shell", "shell scripting", "bash scripting")),
+    ],
+    "frontend": [
+        ("react", "React", ("react.js", "reactjs")),
+        ("nextjs", "Next.js", ("next.js", "next")),
+        ("angular", "Angular", ("angularjs", "angular.js")),
+        ("vue", "Vue", ("vue.js", "vuejs")),
+        ("svelte", "Svelte", ()),
+        ("html", "HTML", ("html5",)),
+        ("css", "CSS", ("css3",)),
+        ("sass", "Sass", ("scss",)),
+        ("less", "Less", ()),
+        ("tailwind", "Tailwind CSS", ("tailwind", "tailwindcss")),
+        ("bootstrap", "Bootstrap", ()),
+        ("redux", "Redux", ()),
+        ("webpack", "Webpack", ()),
+        ("vite", "Vite", ()),
+        ("parcel", "Parcel", ()),
+        ("gulp", "Gulp", ()),
+        ("npm", "npm", ()),
+        ("yarn", "Yarn", ()),
+        ("pnpm", "pnpm", ()),
+    ],
+    "backend": [
+        ("nodejs", "Node.js", ("node", "node.js", "nodejs")),
+        ("express", "Express.js", ("express", "expressjs")),
+        ("django", "Django", ()),
+        ("flask", "Flask", ()),
+        ("fastapi", "FastAPI", ()),
+        ("spring", "Spring", ()),
+        ("spring_boot", "Spring Boot", ("springboot",)),
+        ("dotnet", ".NET", (".net", "dotnet", ".net core", "asp.net", "asp.net core")),
+        ("rest", "REST APIs", ("rest", "restful", "rest api", "restful apis", "restful api")),
+        ("graphql", "GraphQL", ()),
+        ("grpc", "gRPC", ()),
+        ("microservices", "Microservices", ("microservice", "microservice architecture")),
+        ("soap", "SOAP", ()),
+        ("laravel", "Laravel", ()),
+        ("rails", "Ruby on Rails", ("rails", "ror")),
+        ("api", "APIs", ("api", "api design", "api development")),
+    ],
+    "database": [
+        ("sql", "SQL", ("sql databases", "relational databases", "rdbms")),
+        ("nosql", "NoSQL", ("nosql databases",)),
+        ("mysql", "MySQL", ()),
+        ("postgresql", "PostgreSQL", ("postgres", "psql")),
+        ("mongodb", "MongoDB", ("mongo",)),
+        ("redis", "Redis", ()),
+        ("elasticsearch", "Elasticsearch", ("elastic search", "elk")),
+        ("cassandra", "Cassandra", ()),
+        ("dynamodb", "DynamoDB", ()),
+        ("mariadb", "MariaDB", ()),
+        ("oracle", "Oracle", ("oracle db",)),
+        ("sqlite", "SQLite", ()),
+        ("neo4j", "Neo4j", ()),
+        ("couchdb", "CouchDB", ()),
+        ("firestore", "Firestore", ()),
+        ("solr", "Solr", ()),
+        ("memcached", "Memcached", ()),
+    ],
+    "messaging": [
+        ("kafka", "Kafka", ("apache kafka",)),
+        ("rabbitmq", "RabbitMQ", ()),
+        ("activemq", "ActiveMQ", ()),
+        ("zeromq", "ZeroMQ", ()),
+        ("nats", "NATS", ()),
+        ("pulsar", "Pulsar", ()),
+        ("kinesis", "Kinesis", ()),
+    ],
+    "data": [
+        ("spark", "Spark", ("apache spark", "pyspark")),
+        ("hadoop", "Hadoop", ()),
+        ("hive", "Hive", ()),
+        ("airflow", "Airflow", ("apache airflow",)),
+        ("databricks", "Databricks", ()),
+        ("etl", "ETL", ("etl pipelines",)),
+        ("data_warehouse", "Data Warehouse", ("data warehousing",)),
+        ("snowflake", "Snowflake", ()),
+        ("bigquery", "BigQuery", ()),
+        ("redshift", "Redshift", ()),
+        ("presto", "Presto", ()),
+        ("flink", "Flink", ()),
+        ("pandas", "Pandas", ()),
+        ("numpy", "NumPy", ()),
+        ("data_visualization", "Data Visualization", ("visualization",)),
+        ("power_bi", "Power BI", ("powerbi",)),
+        ("tableau", "Tableau", ()),
+        ("excel", "Excel", ("ms excel", "microsoft excel")),
+        ("jupyter", "Jupyter", ("jupyter notebook",)),
+    ],
+    "ml": [
+        ("machine_learning", "Machine Learning", ("ml",)),
+        ("deep_learning", "Deep Learning", ("dl",)),
+        ("nlp", "NLP", ("natural language processing",)),
+        ("computer_vision", "Computer Vision", ("cv",)),
+        ("scikit_learn", "Scikit-learn", ("scikit-learn", "sklearn", "scikit learn")),
+        ("tensorflow", "TensorFlow", ("tf",)),
+        ("pytorch", "PyTorch", ("torch",)),
+        ("keras", "Keras", ()),
+        ("transformers", "Transformers", ()),
+        ("hugging_face", "Hugging Face", ("huggingface",)),
+        ("bert", "BERT", ()),
+        ("gpt", "GPT", ()),
+        ("llm", "LLMs", ("llm", "large language models")),
+        ("generative_ai", "Generative AI", ("genai", "gen ai")),
+        ("langchain", "LangChain", ()),
+        ("llama", "Llama", ()),
+        ("rag", "RAG", ("retrieval augmented generation",)),
+        ("mlops", "MLOps", ()),
+    ],
+    "devops": [
+        ("docker", "Docker", ("containers", "containerization")),
+        ("kubernetes", "Kubernetes", ("k8s",)),
+        ("terraform", "Terraform", ()),
+        ("ansible", "Ansible", ()),
+        ("puppet", "Puppet", ()),
+        ("chef", "Chef", ()),
+        ("jenkins", "Jenkins", ()),
+        ("cicd", "CI/CD", ("ci/cd", "cicd", "ci cd", "continuous integration")),
+        ("github_actions", "GitHub Actions", ()),
+        ("git", "Git", ("version control",)),
+        ("github", "GitHub", ()),
+        ("gitlab", "GitLab", ()),
+        ("bitbucket", "Bitbucket", ()),
+        ("linux", "Linux", ()),
+        ("unix", "Unix", ()),
+        ("devops", "DevOps", ()),
+        ("nginx", "Nginx", ()),
+        ("apache", "Apache", ()),
+        ("tomcat", "Tomcat", ()),
+        ("iis", "IIS", ()),
+        ("prometheus", "Prometheus", ()),
+        ("grafana", "Grafana", ()),
+        ("datadog", "Datadog", ()),
+        ("new_relic", "New Relic", ()),
+        ("splunk", "Splunk", ()),
+    ],
+    "cloud": [
+        ("cloud", "Cloud", ("cloud computing", "cloud services", "cloud platforms")),
+        ("aws", "AWS", ("amazon web services",)),
+        ("azure", "Azure", ("microsoft azure",)),
+        ("gcp", "GCP", ("google cloud", "google cloud platform")),
+        ("heroku", "Heroku", ()),
+        ("vercel", "Vercel", ()),
+        ("netlify", "Netlify", ()),
+        ("cloudflare", "Cloudflare", ()),
+        ("aws_ec2", "EC2", ("ec2", "aws ec2")),
+        ("aws_s3", "S3", ("s3", "aws s3")),
+        ("aws_lambda", "AWS Lambda", ("lambda",)),
+        ("aws_rds", "RDS", ("rds",)),
+        ("cloudformation", "CloudFormation", ()),
+        ("aws_ecs", "ECS", ("ecs",)),
+        ("aws_eks", "EKS", ("eks",)),
+        ("aws_sqs", "SQS", ("sqs",)),
+        ("aws_sns", "SNS", ("sns",)),
+        ("cloudwatch", "CloudWatch", ()),
+        ("aws_iam", "IAM", ("iam",)),
+        ("vpc", "VPC", ()),
+        ("route53", "Route 53", ("route53",)),
+        ("api_gateway", "API Gateway", ()),
+        ("azure_functions", "Azure Functions", ()),
+        ("azure_sql", "Azure SQL", ()),
+        ("blob_storage", "Blob Storage", ()),
+        ("cosmos_db", "Cosmos DB", ("cosmosdb",)),
+        ("aks", "AKS", ()),
+        ("azure_devops", "Azure DevOps", ()),
+        ("compute_engine", "Compute Engine", ()),
+        ("cloud_storage", "Cloud Storage", ()),
+        ("cloud_functions", "Cloud Functions", ()),
+        ("cloud_run", "Cloud Run", ()),
+        ("gke", "GKE", ()),
+        ("pubsub", "Pub/Sub", ("pub/sub", "pubsub")),
+    ],
+    "mobile": [
+        ("android", "Android", ()),
+        ("ios", "iOS", ()),
+        ("react_native", "React Native", ()),
+        ("flutter", "Flutter", ()),
+        ("swiftui", "SwiftUI", ()),
+        ("xamarin", "Xamarin", ()),
+        ("ionic", "Ionic", ()),
+    ],
+    "testing": [
+        ("testing", "Testing", ("software testing", "automated testing")),
+        ("pytest", "PyTest", ()),
+        ("unittest", "unittest", ()),
+        ("selenium", "Selenium", ()),
+        ("cypress", "Cypress", ()),
+        ("playwright", "Playwright", ()),
+        ("junit", "JUnit", ()),
+        ("jest", "Jest", ()),
+        ("mocha", "Mocha", ()),
+        ("jasmine", "Jasmine", ()),
+        ("testng", "TestNG", ()),
+        ("postman", "Postman", ()),
+        ("insomnia", "Insomnia", ()),
+        ("jmeter", "JMeter", ()),
+        ("loadrunner", "LoadRunner", ()),
+    ],
+    "methodology": [
+        ("agile", "Agile", ()),
+        ("scrum", "Scrum", ()),
+        ("kanban", "Kanban", ()),
+        ("waterfall", "Waterfall", ()),
+        ("tdd", "TDD", ("test driven development", "test-driven development")),
+        ("bdd", "BDD", ("behavior driven development", "behaviour driven development")),
+    ],
+    "soft_skill": [
+        ("leadership", "Leadership", ()),
+        ("communication", "Communication", ("communication skills",)),
+        ("teamwork", "Teamwork", ("collaboration",)),
+        ("problem_solving", "Problem Solving", ("problem-solving",)),
+        ("analytical", "Analytical Skills", ("analytical", "analytical thinking")),
+        ("critical_thinking", "Critical Thinking", ()),
+        ("project_management", "Project Management", ()),
+        ("time_management", "Time Management", ()),
+    ],
+    "tool": [
+        ("jira", "Jira", ()),
+        ("confluence", "Confluence", ()),
+        ("slack", "Slack", ()),
+        ("trello", "Trello", ()),
+        ("asana", "Asana", ()),
+        ("figma", "Figma", ()),
+        ("sketch", "Sketch", ()),
+        ("vscode", "VS Code", ("vscode", "visual studio code")),
+        ("intellij", "IntelliJ", ("intellij idea",)),
+        ("eclipse", "Eclipse", ()),
+        ("vim", "Vim", ()),
+    ],
+    "security": [
+        ("oauth", "OAuth", ("oauth2", "oauth 2.0")),
+        ("jwt", "JWT", ()),
+        ("tls", "SSL/TLS", ("ssl", "tls", "ssl/tls")),
+        ("encryption", "Encryption", ()),
+        ("authentication", "Authentication", ()),
+        ("authorization", "Authorization", ()),
+        ("security", "Security", ()),
+        ("cybersecurity", "Cybersecurity", ("cyber security",)),
+        ("penetration_testing", "Penetration Testing", ("pentesting",)),
+        ("owasp", "OWASP", ()),
+        ("api_security", "API Security", ()),
+    ],
+    "data_format": [
+        ("json", "JSON", ()),
+        ("xml", "XML", ()),
+        ("yaml", "YAML", ()),
+        ("websocket", "WebSockets", ("websocket", "websockets")),
+        ("protobuf", "Protobuf", ("protocol buffers",)),
+        ("openapi", "OpenAPI", ()),
+        ("swagger", "Swagger", ()),
+    ],
+}
+
+
+def _key(text: str) -> str:
+    """Lookup key: lower-case, single-spaced, without surrounding punctuation."""
+    return re.sub(r"\s+", " ", (text or "").lower()).strip(" .,;:-*•")
+
+
+def _compact(key: str) -> str:
+    # "Node JS" / "node-js" / "nodejs" share a compact form; keep + and # (c++, c#)
+    return re.sub(r"[\s.\-_]", "", key)
+
+
+SKILLS = {}       # id -> {"id", "name", "category", "aliases"}
+_ALIAS_INDEX = {}  # key / compact key -> id
+for _category, _entries in _ONTOLOGY.items():
+    for _id, _name, _aliases in _entries:
+        SKILLS[_id] = {"id": _id, "name": _name, "category": _category, "aliases": tuple(_aliases)}
+        for _alias in (_id, _name, *_aliases):
+            _ALIAS_INDEX.setdefault(_key(_alias), _id)
+            _ALIAS_INDEX.setdefault(_compact(_key(_alias)), _id)
+
+_PAREN_RE = re.compile(r"\s*\(([^)]*)\)\s*")
+
+
+def _lookup(text: str) -> str | None:
+    key = _key(text)
+    if not key:
+        return None
+    hit = _ALIAS_INDEX.get(key) or _ALIAS_INDEX.get(_compact(key))
+    if hit:
+        return hit
+    # "Natural Language Processing (NLP)" -> "natural language processing" / "nlp";
+    # "Testing (Jest, Cypress)" lists examples and is kept as written
+    groups = [m.group(1) for m in _PAREN_RE.finditer(key)]
+    if groups and not any("," in g for g in groups):
+        for candidate in (_PAREN_RE.sub(" ", key), *groups):
+            candidate = _key(candidate)
+            hit = _ALIAS_INDEX.get(candidate) or _ALIAS_INDEX.get(_compact(candidate))
+            if hit:
+                return hit
+    return None
+
+
+class _EmbeddingIndex:
+    """Nearest canonical skill by cosine similarity (loaded on first use)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._embeddings = None
+        self._ids = None
+        self._matrix = None
+        self._failed = False
+
+    def _load(self) -> bool:
+        if self._matrix is not None or self._failed:
+            return not self._failed
+        with self._lock:
+            if self._matrix is not None or self._failed:
+                return not self._failed
+            try:
+                from .embeddings import get_embeddings
+                self._embeddings = get_embeddings()
+                ids = list(SKILLS)
+                vectors = np.asarray(self._embeddings.embed_documents([SKILLS[i]["name"] for i in ids]), dtype=np.float32)
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+                self._ids, self._matrix = ids, vectors
+            except Exception as e:
+                print(f"Skill ontology embedding fallback unavailable: {e}")
+                self._failed = True
+        return not self._failed
+
+    def nearest(self, text: str) -> tuple:
+        """Return (skill id, similarity) for the closest canonical skill, or (None, 0.0)."""
+        if np is None or not self._load():
+            return None, 0.0
+        try:
+            vec = np.asarray(self._embeddings.embed_query(text), dtype=np.float32)
+            vec /= np.linalg.norm(vec) + 1e-12
+            sims = self._matrix @ vec
+            best = int(np.argmax(sims))
+            return self._ids[best], float(sims[best])
+        except Exception as e:
+            print(f"Skill ontology embedding lookup failed for '{text}': {e}")
+            return None, 0.0
+
+
+_EMBEDDING_INDEX = _EmbeddingIndex()
+
+
+@lru_cache(maxsize=4096)
+def skill_id(skill: str, fuzzy: bool = True) -> str | None:
+    """Canonical id for `skill`, or None if it is not in the ontology.
+
+    Args:
+        skill: Skill name in any spelling
+        fuzzy: Fall back to embedding nearest-neighbour for unseen strings
+    """
+    hit = _lookup(skill)
+    if hit or not fuzzy or not SKILL_ONTOLOGY_EMBEDDINGS:
+        return hit
+    key = _key(skill)
+    # Long phrases and groups ("TensorFlow/PyTorch", "Testing (Jest, Cypress)") are not one skill
+    if not key or len(key) > 40 or any(ch in key for ch in "(,/&"):
+        return None
+    best, similarity = _EMBEDDING_INDEX.nearest(key)
+    return best if similarity >= SKILL_ONTOLOGY_MIN_SIMILARITY else None
+
+
+def canonicalize(skill: str, fuzzy: bool = True) -> str:
+    """Canonical display name for `skill` (unknown skills are returned tidied, not dropped)."""
+    sid = skill_id(skill, fuzzy)
+    if sid:
+        return SKILLS[sid]["name"]
+    return re.sub(r"\s+", " ", (skill or "")).strip(" .,;:*•")
+
+
+def canonicalize_skills(skills, fuzzy: bool = True) -> list:
+    """Canonicalize a list of skills, dropping duplicates while keeping order."""
+    out = []
+    for skill in skills or []:
+        name = canonicalize(str(skill), fuzzy)
+        if name and name not in out:
+            out.append(name)
+    return out
+
+
+def skill_category(skill: str) -> str | None:
+    """Parent category of `skill` (e.g. "database"), or None if unknown."""
+    sid = skill_id(skill, fuzzy=False)
+    return SKILLS[sid]["category"] if sid else None
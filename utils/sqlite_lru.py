@@ -0,0 +1,153 @@
+"""SQLite-backed key/value tables with LRU eviction by total size.
+
+Base of the LLM response cache, the embedding cache and the skill
+evidence cache. Every table has a ``key`` primary key, the subclass's
+value columns, a ``size`` counted against the byte budget and an
+``accessed_at`` timestamp that orders eviction. Any storage error is
+treated as a cache miss, so a cache can never break the call it serves.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+# SQLite host-parameter limit is 999 on older builds
+QUERY_BATCH = 500
+
+
+class SQLiteLRU:
+    """One SQLite table evicted least-recently-used first once it exceeds `max_bytes`.
+
+    Subclasses set `table`, `columns` (DDL of the value columns) and
+    `label` (prefix of logged errors), and may override `_expire`.
+    """
+
+    table = "entries"
+    columns = "value BLOB NOT NULL"
+    label = "Cache"
+
+    def __init__(self, path: str, max_bytes: int, enabled: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._approx_bytes = 0
+
+    def _connect(self):
+        if self._conn is None:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f" key TEXT PRIMARY KEY, {self.columns}, size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_accessed ON {self.table}(accessed_at)")
+            conn.commit()
+            self._approx_bytes = self._total(conn)
+            self._conn = conn
+        return self._conn
+
+    def _total(self, conn) -> int:
+        return conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+
+    def _select(self, conn, keys, columns: str, now: float) -> list:
+        """Rows ``(key, *columns)`` for `keys`, marked as just used."""
+        keys = list(keys)
+        rows = []
+        for i in range(0, len(keys), QUERY_BATCH):
+            batch = keys[i:i + QUERY_BATCH]
+            marks = ",".join("?" * len(batch))
+            rows.extend(conn.execute(f"SELECT key, {columns} FROM {self.table} WHERE key IN ({marks})", batch))
+            conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key IN ({marks})", [now, *batch])
+        conn.commit()
+        return rows
+
+    def _upsert(self, conn, names: tuple, rows: list) -> None:
+        """Insert or replace `rows` (tuples ordered like `names`, which include key and size).
+
+        Sizes of replaced rows are subtracted, so the running byte count
+        stays exact and eviction does not fire early.
+        """
+        rows = list({row[names.index("key")]: row for row in rows}.values())
+        keys = [row[names.index("key")] for row in rows]
+        replaced = 0
+        for i in range(0, len(keys), QUERY_BATCH):
+            batch = keys[i:i + QUERY_BATCH]
+            marks = ",".join("?" * len(batch))
+            replaced += conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table} WHERE key IN ({marks})",
+                                     batch).fetchone()[0]
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {self.table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", rows
+        )
+        conn.commit()
+        self._approx_bytes += sum(row[names.index("size")] for row in rows) - replaced
+        if self._approx_bytes > self.max_bytes:
+            self._evict(conn)
+
+    def _expire(self, conn, now: float) -> None:
+        """Drop rows that are no longer valid before evicting by size (none by default)."""
+
+    def _evict(self, conn) -> None:
+        # Drop invalid rows, then oldest-accessed rows until under 90% of budget
+        self._expire(conn, time.time())
+        total = self._total(conn)
+        target = int(self.max_bytes * 0.9)
+        if total > target:
+            freed = 0
+            victims = []
+            for key, size in conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC"):
+                if total - freed <= target:
+                    break
+                victims.append((key,))
+                freed += size
+            conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+            total -= freed
+        conn.commit()
+        self._approx_bytes = total
+
+    def delete(self, key: str) -> None:
+        """Drop the entry for `key` (e.g. a value that turned out to be unusable)."""
+        self.delete_many([key])
+
+    def delete_many(self, keys) -> None:
+        """Drop the entries for `keys`."""
+        if not self.enabled:
+            return
+        keys = list(keys)
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", [(k,) for k in keys])
+                conn.commit()
+                self._approx_bytes = self._total(conn)
+        except sqlite3.Error as e:
+            print(f"{self.label} delete failed: {e}")
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(f"DELETE FROM {self.table}")
+                conn.commit()
+                self._approx_bytes = 0
+        except sqlite3.Error as e:
+            print(f"{self.label} clear failed: {e}")
+
+    def stats(self) -> dict:
+        """Return entry count, stored bytes and hit/miss counters."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                entries, total = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        except sqlite3.Error:
+            entries, total = 0, 0
+        return {"entries": entries, "bytes": total, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,236 @@
+"""Tolerant parsing of JSON answers from LLMs.
+
+Models wrap JSON in prose or code fences, leave trailing commas, use
+Python literals or stop mid-object when `max_tokens` runs out. Each of
+those used to send callers down an expensive fallback (per-item LLM calls,
+regex scraping, extra fill prompts). `parse_json` extracts the first
+balanced JSON value, repairs common defects and checks it against a small
+schema; `structured_output_stats` reports how often repair avoided a
+fallback and how many LLM calls that saved.
+"""
+
+import ast
+import json
+import re
+import threading
+
+try:
+    import requests
+except Exception:  # only used to recognise provider errors
+    requests = None
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*([\s\S]*?)```")
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_LINE_COMMENT_RE = re.compile(r"(?m)^\s*//.*$")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+# Answer formats of the agents' structured prompts. Prompts embed them verbatim and
+# `utils.llm_standin` keys its synthetic answers on them, so the two cannot drift apart.
+SKILL_SCORES_FORMAT = '{"skill_scores":{skill:score}, "skill_reasoning":{skill:short_reason}}'
+WEAKNESSES_FORMAT = "{skill:{detail:str, suggestions:[str], example:str}}"
+JOB_SKILLS_FORMAT = '{"1": [skills], "2": [skills], ...}'
+SKILL_LIST_FORMAT = "a plain comma-separated list of skills"
+QUESTIONS_FORMAT = ('[{"type": "<One type from the list above>", "question": "<A real interview question>", '
+                    '"solution": "<A best-fit, strong answer tailored to the resume in 4-7 sentences>"}]')
+
+_STATS_LOCK = threading.Lock()
+_STATS = {"parsed": 0, "repaired": 0, "failed": 0, "json_mode": 0, "calls_saved": 0}
+
+
+def _bump(key: str, amount: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[key] += amount
+
+
+def structured_output_stats() -> dict:
+    """Counters: clean parses, repairs (fallbacks avoided), failures, JSON-mode calls and LLM calls saved."""
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+def json_response_format(model: str | None, expect=dict) -> dict | None:
+    """`response_format` for JSON mode, or None if the model (or an array answer) cannot use it."""
+    # JSON mode only guarantees a top-level object
+    if expect is not dict:
+        return None
+    from .llm import supports_json_mode  # lazy: utils.llm imports the provider stack
+    if not supports_json_mode(model):
+        return None
+    _bump("json_mode")
+    return {"type": "json_object"}
+
+
+def failed_generation(exc: BaseException) -> str | None:
+    """Text the provider rejected in JSON mode (Groq's ``json_validate_failed``), if any."""
+    if requests is None or not isinstance(exc, requests.HTTPError):
+        return None
+    message = str(exc)
+    if "json_validate_failed" not in message:
+        return None
+    try:
+        body = json.loads(message[message.index("{"):])
+        return (body.get("error") or {}).get("failed_generation")
+    except Exception:
+        return None
+
+
+def _structural(text: str, start: int = 0):
+    """Yield (index, char) for characters outside JSON strings."""
+    in_string, escaped = False, False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        yield i, ch
+
+
+def _balanced_span(text: str, opener: str) -> tuple | None:
+    """(start, end) of the first balanced value starting with `opener`; end is None if it never closes."""
+    start = text.find(opener)
+    if start < 0:
+        return None
+    stack = []
+    for i, ch in _structural(text, start):
+        if ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if not stack or stack.pop() != ch:
+                return start, None
+            if not stack:
+                return start, i + 1
+    return start, None
+
+
+def _close_truncated(fragment: str) -> str:
+    """Close a value cut off mid-way (e.g. by max_tokens), dropping the incomplete last member."""
+    # Cut back to the last complete member...
+    last_safe = 0
+    for i, ch in _structural(fragment):
+        if ch in "{[}]":
+            last_safe = i + 1
+        elif ch == ",":
+            last_safe = i
+    head = fragment[:last_safe]
+    # ...then close whatever is still open at that point
+    stack = []
+    for _, ch in _structural(head):
+        if ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    return head.rstrip().rstrip(",") + "".join(reversed(stack))
+
+
+def _loads_lenient(text: str):
+    """json.loads, then the same text with common defects fixed, then Python-literal syntax."""
+    try:
+        return json.loads(text)
+    except Exception:
+        pass
+    fixed = _TRAILING_COMMA_RE.sub(r"\1", _LINE_COMMENT_RE.sub("", text.translate(_SMART_QUOTES)))
+    try:
+        return json.loads(fixed)
+    except Exception:
+        pass
+    try:
+        # Single quotes, True/False/None
+        value = ast.literal_eval(fixed)
+        return value if isinstance(value, (dict, list)) else None
+    except Exception:
+        return None
+
+
+def extract_json(text: str, expect=None):
+    """Extract and repair the first JSON object/array in `text`.
+
+    Args:
+        text: Raw model output (may contain prose, code fences or a truncated value)
+        expect: `dict`, `list` or None (whichever appears first)
+
+    Returns:
+        Parsed value, or None if nothing usable was found
+    """
+    if not text:
+        return None
+    candidates = [m.group(1) for m in _FENCE_RE.finditer(text)] + [text]
+    openers = {dict: "{", list: "["}.get(expect) or None
+    for candidate in candidates:
+        if openers:
+            order = [openers]
+        else:
+            brace, bracket = candidate.find("{"), candidate.find("[")
+            order = ["{", "["] if bracket < 0 or (0 <= brace < bracket) else ["[", "{"]
+        for opener in order:
+            span = _balanced_span(candidate, opener)
+            if not span:
+                continue
+            start, end = span
+            fragment = candidate[start:end] if end else _close_truncated(candidate[start:])
+            value = _loads_lenient(fragment)
+            if value is not None and (expect is None or isinstance(value, expect)):
+                return value
+    return None
+
+
+def matches_schema(value, schema) -> bool:
+    """Check `value` against a minimal schema.
+
+    A schema is a type (``str``, ``dict``...), a dict of key -> schema (keys
+    ending in ``?`` are optional) or a one-element list ``[item_schema]``.
+    """
+    if schema is None:
+        return True
+    if isinstance(schema, type):
+        return isinstance(value, schema)
+    if isinstance(schema, list):
+        return isinstance(value, list) and all(matches_schema(v, schema[0]) for v in value)
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            return False
+        for key, sub in schema.items():
+            optional = key.endswith("?")
+            name = key.rstrip("?")
+            if name not in value:
+                if optional:
+                    continue
+                return False
+            if not matches_schema(value[name], sub):
+                return False
+        return True
+    return False
+
+
+def parse_json(text: str, schema=None, fallback_calls: int = 0):
+    """Parse a model answer as JSON, repairing it when needed.
+
+    Args:
+        text: Raw model output
+        schema: Optional schema for `matches_schema`; the top-level type picks dict/list
+        fallback_calls: LLM calls the caller would spend if parsing failed (for the stats)
+
+    Returns:
+        Parsed value, or None if it cannot be parsed or does not match `schema`
+    """
+    expect = dict if isinstance(schema, dict) else list if isinstance(schema, list) else schema
+    try:
+        value = json.loads(text)
+        if matches_schema(value, schema):
+            _bump("parsed")
+            return value
+    except Exception:
+        pass
+    value = extract_json(text or "", expect if isinstance(expect, type) else None)
+    if value is not None and matches_schema(value, schema):
+        _bump("repaired")
+        _bump("calls_saved", fallback_calls)
+        return value
+    _bump("failed")
+    return None
@@ -2,6 +2,13 @@
 
 import hashlib
 
+try:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+except Exception:  # chunking falls back to `_split_recursive`
+    RecursiveCharacterTextSplitter = None
+
+_SEPARATORS = ("\n\n", "\n", " ", "")
+
 
 def clamp_text(text: str | None, max_chars: int) -> str:
     """Clamp text to reduce token usage.
@@ -34,3 +41,42 @@ def compute_hash(text: str) -> str:
     # normalize whitespace to ensure stable hash
     norm = "\n".join(line.strip() for line in text.splitlines() if line is not None)
     return hashlib.sha256(norm.encode("utf-8")).hexdigest()
+
+
+def _split_recursive(text: str, chunk_size: int, chunk_overlap: int, separators=_SEPARATORS) -> list:
+    """Split on the coarsest separator present, merging pieces into chunks of at most `chunk_size` characters."""
+    sep = next(s for s in separators if s == "" or s in text)
+    finer = separators[separators.index(sep) + 1:]
+    pieces = list(text) if sep == "" else [p for p in text.split(sep) if p.strip()]
+    chunks, window, size = [], [], 0
+    for piece in pieces:
+        if len(piece) > chunk_size:
+            if window:
+                chunks.append(sep.join(window))
+                window, size = [], 0
+            chunks.extend(_split_recursive(piece, chunk_size, chunk_overlap, finer))
+            continue
+        if window and size + len(sep) + len(piece) > chunk_size:
+            chunks.append(sep.join(window))
+            # Keep a tail of the previous chunk (up to `chunk_overlap` characters) as overlap
+            while window and (size > chunk_overlap or size + len(sep) + len(piece) > chunk_size):
+                size -= len(window.pop(0)) + (len(sep) if window else 0)
+        size += len(piece) + (len(sep) if window else 0)
+        window.append(piece)
+    if window:
+        chunks.append(sep.join(window))
+    return [c.strip() for c in chunks if c.strip()]
+
+
+def split_text(text: str, chunk_size: int, chunk_overlap: int = 0) -> list:
+    """Split text into overlapping chunks of at most `chunk_size` characters.
+
+    Uses LangChain's `RecursiveCharacterTextSplitter` when it is installed,
+    and otherwise a small splitter with the same separators (paragraphs,
+    lines, words, characters).
+    """
+    if not text:
+        return []
+    if RecursiveCharacterTextSplitter is not None:
+        return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap).split_text(text)
+    return _split_recursive(text, chunk_size, chunk_overlap)
@@ -0,0 +1,321 @@
+"""Size-bounded management of the on-disk vector store cache.
+
+`VECTOR_CACHE_DIR` holds one store directory per user, resume hash and
+kind (``<root>/<user>/<resume_hash>/<kind>``). `VectorCacheManager` keeps
+a small SQLite index of those entries with their size and last access,
+and runs online, inside the app:
+
+- `record` / `touch` register writes and reads
+- eviction drops least-recently-used entries when the cache exceeds
+  `VECTOR_CACHE_MAX_BYTES` or `VECTOR_CACHE_MAX_ENTRIES`
+- `gc` (run periodically on a background thread) removes partially written
+  entries, abandoned temp directories, stores in the old pickled FAISS format
+  and index rows whose directory is gone, and adopts entries the index
+  does not know yet (e.g. written by another process)
+- `stats` reports occupancy
+- `build_lock` serializes builds of one entry across threads and worker
+  processes (a file lock per key), so a second builder waits for the first
+  and then loads its result
+
+Removing an entry another request has memory-mapped is safe: the mapping
+stays valid until the store is dropped.
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except Exception:  # not on Windows: build locks only cover threads of this process
+    fcntl = None
+
+from .vector_store import NumpyVectorStore
+
+VECTOR_CACHE_DIR = os.getenv("VECTOR_CACHE_DIR") or os.path.join(".cache", "faiss")
+VECTOR_CACHE_MAX_BYTES = int(os.getenv("VECTOR_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+VECTOR_CACHE_MAX_ENTRIES = int(os.getenv("VECTOR_CACHE_MAX_ENTRIES", "20000"))
+VECTOR_CACHE_GC_INTERVAL = float(os.getenv("VECTOR_CACHE_GC_INTERVAL", "600"))
+# Incomplete entries younger than this may still be being written
+VECTOR_CACHE_PARTIAL_GRACE = float(os.getenv("VECTOR_CACHE_PARTIAL_GRACE", "300"))
+# How long a builder waits for another one before building anyway
+VECTOR_CACHE_LOCK_TIMEOUT = float(os.getenv("VECTOR_CACHE_LOCK_TIMEOUT", "60"))
+
+INDEX_FILE = ".index.sqlite3"
+LOCK_DIR = ".locks"
+# Temporary/replaced directories left by `NumpyVectorStore.save_local`
+_SCRATCH_MARKERS = (".tmp-", ".old-")
+# Reads refresh an entry's access time at most this often
+_TOUCH_INTERVAL = 60.0
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _remove_tree(path: str, root: str) -> None:
+    """Delete an entry directory and any parents it leaves empty (up to `root`)."""
+    shutil.rmtree(path, ignore_errors=True)
+    root = os.path.abspath(root)
+    parent = os.path.dirname(os.path.abspath(path))
+    while parent.startswith(root + os.sep):
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+
+
+class VectorCacheManager:
+    """LRU index and garbage collector for one vector cache directory."""
+
+    def __init__(self, root: str = VECTOR_CACHE_DIR, max_bytes: int = VECTOR_CACHE_MAX_BYTES,
+                 max_entries: int = VECTOR_CACHE_MAX_ENTRIES, gc_interval: float = VECTOR_CACHE_GC_INTERVAL):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.gc_interval = gc_interval
+        self.evictions = 0
+        self.removed = 0
+        self.last_gc = None
+        self._lock = threading.Lock()
+        self._conn = None
+        self._touched = {}
+        self._gc_thread = None
+        self._next_gc = 0.0
+        self._key_locks = {}
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.root, INDEX_FILE), check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " path TEXT PRIMARY KEY, size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def record(self, path: str) -> None:
+        """Register a freshly written entry and evict others if the cache is over budget."""
+        try:
+            size = _dir_size(path)
+            with self._lock:
+                conn = self._connect()
+                now = time.time()
+                conn.execute("INSERT OR REPLACE INTO entries (path, size, accessed_at) VALUES (?, ?, ?)",
+                             (self._rel(path), size, now))
+                conn.commit()
+                self._touched[path] = now
+                self._enforce(conn, keep=self._rel(path))
+        except (sqlite3.Error, OSError) as e:
+            print(f"Vector cache index update failed: {e}")
+        self.maybe_gc()
+
+    def touch(self, path: str) -> None:
+        """Mark an entry as used (throttled, so chat turns do not write on every hit)."""
+        now = time.time()
+        if now - self._touched.get(path, 0.0) < _TOUCH_INTERVAL:
+            return
+        self._touched[path] = now
+        try:
+            with self._lock:
+                conn = self._connect()
+                cur = conn.execute("UPDATE entries SET accessed_at = ? WHERE path = ?", (now, self._rel(path)))
+                conn.commit()
+            if cur.rowcount == 0 and NumpyVectorStore.exists(path):
+                self.record(path)
+        except sqlite3.Error as e:
+            print(f"Vector cache index update failed: {e}")
+
+    @contextmanager
+    def build_lock(self, path: str, timeout: float = VECTOR_CACHE_LOCK_TIMEOUT):
+        """Hold the exclusive build lock for one entry; yields False if it timed out.
+
+        Example:
+            with manager.build_lock(cache_path):
+                store = load_again() or build_and_save()
+        """
+        rel = self._rel(path)
+        if fcntl is None:
+            with self._lock:
+                lock = self._key_locks.setdefault(rel, threading.Lock())
+            acquired = lock.acquire(timeout=timeout)
+            if not acquired:
+                print(f"Vector cache build lock timed out for {rel}; building anyway")
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    lock.release()
+            return
+
+        lock_dir = os.path.join(self.root, LOCK_DIR)
+        os.makedirs(lock_dir, exist_ok=True)
+        lock_path = os.path.join(lock_dir, hashlib.sha1(rel.encode("utf-8")).hexdigest()[:20] + ".lock")
+        acquired = False
+        with open(lock_path, "a") as fh:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    acquired = True
+                    break
+                except OSError:
+                    if time.monotonic() >= deadline:
+                        break
+                    time.sleep(0.05)
+            if acquired:
+                os.utime(lock_path)  # fresh locks are never garbage-collected
+            else:
+                print(f"Vector cache build lock timed out for {rel}; building anyway")
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    def _enforce(self, conn, keep: str | None = None) -> None:
+        # Evict least-recently-used entries until both budgets hold
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes and (not self.max_entries or count <= self.max_entries):
+            return
+        victims = []
+        for rel, size in conn.execute("SELECT path, size FROM entries ORDER BY accessed_at ASC"):
+            if total <= self.max_bytes and (not self.max_entries or count <= self.max_entries):
+                break
+            if rel == keep:
+                continue
+            victims.append(rel)
+            total -= size
+            count -= 1
+        for rel in victims:
+            path = os.path.join(self.root, rel)
+            _remove_tree(path, self.root)
+            self._touched.pop(path, None)
+        conn.executemany("DELETE FROM entries WHERE path = ?", [(rel,) for rel in victims])
+        conn.commit()
+        self.evictions += len(victims)
+
+    def _entry_dirs(self):
+        """Yield every ``<user>/<hash>/<kind>`` directory under the root."""
+        for user in os.scandir(self.root):
+            if not user.is_dir() or user.name.startswith("."):
+                continue
+            for resume in os.scandir(user.path):
+                if not resume.is_dir():
+                    continue
+                for kind in os.scandir(resume.path):
+                    if kind.is_dir():
+                        yield kind.path
+
+    def gc(self) -> dict:
+        """Remove partial, legacy and orphaned entries, reconcile the index, then enforce the budget.
+
+        The directory scan runs without the index lock, so requests keep
+        recording and touching entries meanwhile.
+        """
+        if not os.path.isdir(self.root):
+            return self.stats()
+        now = time.time()
+        complete, removed = {}, 0
+        try:
+            for path in list(self._entry_dirs()):
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                stale = now - mtime > VECTOR_CACHE_PARTIAL_GRACE
+                scratch = any(marker in os.path.basename(path) for marker in _SCRATCH_MARKERS)
+                if not scratch and NumpyVectorStore.exists(path):
+                    complete[self._rel(path)] = (_dir_size(path), mtime)
+                elif stale:
+                    # Abandoned temp directory, torn write, or the old pickled FAISS format
+                    _remove_tree(path, self.root)
+                    removed += 1
+            # Lock files untouched for an hour belong to no running build
+            lock_dir = os.path.join(self.root, LOCK_DIR)
+            if os.path.isdir(lock_dir):
+                for entry in os.scandir(lock_dir):
+                    if entry.is_file() and now - entry.stat().st_mtime > 3600:
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+        except OSError as e:
+            print(f"Vector cache GC scan failed: {e}")
+            return self.stats()
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                known = {rel for (rel,) in conn.execute("SELECT path FROM entries")}
+                # Adopt entries written by other processes (or before the index existed)
+                conn.executemany("INSERT OR IGNORE INTO entries (path, size, accessed_at) VALUES (?, ?, ?)",
+                                 [(rel, size, mtime) for rel, (size, mtime) in complete.items() if rel not in known])
+                gone = [(rel,) for rel in known
+                        if rel not in complete and not NumpyVectorStore.exists(os.path.join(self.root, rel))]
+                conn.executemany("DELETE FROM entries WHERE path = ?", gone)
+                conn.commit()
+                self._enforce(conn)
+                self.removed += removed
+                self.last_gc = now
+        except sqlite3.Error as e:
+            print(f"Vector cache GC failed: {e}")
+        return self.stats()
+
+    def maybe_gc(self) -> None:
+        """Start a background GC pass if the interval has elapsed (never blocks the caller)."""
+        now = time.time()
+        if self.gc_interval <= 0 or now < self._next_gc:
+            return
+        with self._lock:
+            if now < self._next_gc or (self._gc_thread and self._gc_thread.is_alive()):
+                return
+            self._next_gc = now + self.gc_interval
+            self._gc_thread = threading.Thread(target=self.gc, name="vector-cache-gc", daemon=True)
+            self._gc_thread.start()
+
+    def stats(self) -> dict:
+        """Entries and bytes on disk, budgets, and eviction/GC counters."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        except (sqlite3.Error, OSError):
+            entries, total = 0, 0
+        return {"root": self.root, "entries": entries, "bytes": total, "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries, "evictions": self.evictions, "removed": self.removed,
+                "last_gc": self.last_gc}
+
+
+_MANAGERS = {}
+_MANAGERS_LOCK = threading.Lock()
+
+
+def get_vector_cache(root: str | None = None) -> VectorCacheManager:
+    """The process-wide manager for a cache directory (one per distinct root)."""
+    root = os.path.normpath(root or VECTOR_CACHE_DIR)
+    with _MANAGERS_LOCK:
+        manager = _MANAGERS.get(root)
+        if manager is None:
+            manager = _MANAGERS[root] = VectorCacheManager(root)
+        return manager
@@ -0,0 +1,252 @@
+"""Compact vector store for small per-resume indexes.
+
+A resume index holds a handful of chunks, so brute-force search (one
+matrix-vector product) beats any ANN structure, and loading should cost
+no more than opening two files. A store directory contains:
+
+- ``vectors.npy``: float32 matrix of L2-normalized chunk vectors, opened
+  memory-mapped (zero-copy) on load
+- ``chunks.json``: embedding model id, dimension, chunk texts and metadata
+
+`save_local` writes into a temporary sibling directory and publishes it
+with an atomic rename, so readers never see a half-written store.
+
+Nothing is pickled, so loading needs no unsafe deserialization. The store
+exposes the small part of the LangChain vector-store interface the agents
+use (`from_texts`, `save_local`, `load_local`, `similarity_search`,
+`as_retriever().get_relevant_documents/invoke`).
+
+`VECTOR_STORE_CACHE` keeps loaded stores resident across requests and
+sessions (LRU bounded by total bytes), so a chat turn on a request-scoped
+agent reuses the index instead of reopening it from disk.
+"""
+
+import os
+import json
+import uuid
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from langchain_core.documents import Document
+except Exception:
+    class Document:
+        """Minimal stand-in for LangChain's Document."""
+
+        def __init__(self, page_content: str, metadata: dict | None = None):
+            self.page_content = page_content
+            self.metadata = metadata or {}
+
+        def __repr__(self):
+            return f"Document(page_content={self.page_content!r}, metadata={self.metadata!r})"
+
+VECTORS_FILE = "vectors.npy"
+CHUNKS_FILE = "chunks.json"
+
+VECTOR_STORE_CACHE_MAX_BYTES = int(os.getenv("VECTOR_STORE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def _model_id(embeddings) -> str | None:
+    return getattr(embeddings, "model_id", None) or getattr(embeddings, "model_name", None)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / (np.linalg.norm(matrix, axis=-1, keepdims=True) + 1e-12)
+
+
+def _publish(tmp: str, path: str) -> None:
+    """Atomically move the finished directory `tmp` to `path`, replacing what is there."""
+    try:
+        os.rename(tmp, path)  # atomic; also replaces an empty directory on POSIX
+        return
+    except OSError:
+        if not os.path.isdir(path):
+            raise
+    # Existing store (or a torn/legacy directory): swap it out, then delete it
+    old = f"{path}.old-{uuid.uuid4().hex[:8]}"
+    os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+class NumpyRetriever:
+    """Retriever over a `NumpyVectorStore` (top-k by cosine similarity)."""
+
+    def __init__(self, store, k: int = 4):
+        self.store = store
+        self.k = k
+
+    def get_relevant_documents(self, query: str) -> list:
+        return self.store.similarity_search(query, k=self.k)
+
+    def invoke(self, query: str, config=None, **kwargs) -> list:
+        return self.get_relevant_documents(query)
+
+
+class NumpyVectorStore:
+    """Brute-force cosine-similarity store backed by a float32 matrix.
+
+    Example:
+        store = NumpyVectorStore.from_texts(chunks, embeddings)
+        store.save_local(path)
+        docs = NumpyVectorStore.load_local(path, embeddings).as_retriever(search_kwargs={"k": 3}).invoke("python")
+    """
+
+    def __init__(self, texts: list, vectors: np.ndarray, embeddings, metadatas: list | None = None,
+                 model_id: str | None = None):
+        self.texts = list(texts)
+        self.vectors = vectors
+        self.embeddings = embeddings
+        self.metadatas = list(metadatas) if metadatas is not None else [{} for _ in self.texts]
+        self.model_id = model_id or _model_id(embeddings)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate resident size: vectors plus chunk text."""
+        return int(self.vectors.nbytes) + sum(len(t.encode("utf-8")) for t in self.texts)
+
+    @classmethod
+    def from_texts(cls, texts, embeddings, metadatas: list | None = None) -> "NumpyVectorStore":
+        """Embed `texts` and build a store."""
+        texts = list(texts)
+        if texts:
+            vectors = _normalize(np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+        else:
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        return cls(texts, vectors, embeddings, metadatas)
+
+    def save_local(self, path: str) -> None:
+        """Write the store to directory `path` via a temporary directory and an atomic rename."""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=os.path.basename(path) + ".tmp-", dir=parent)
+        try:
+            os.chmod(tmp, 0o755)
+            with open(os.path.join(tmp, VECTORS_FILE), "wb") as f:
+                np.save(f, np.ascontiguousarray(self.vectors, dtype=np.float32))
+            with open(os.path.join(tmp, CHUNKS_FILE), "w", encoding="utf-8") as f:
+                json.dump({
+                    "model": self.model_id,
+                    "dim": int(self.vectors.shape[1]) if self.vectors.ndim == 2 else 0,
+                    "texts": self.texts,
+                    "metadatas": self.metadatas,
+                }, f, ensure_ascii=False)
+            _publish(tmp, path)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, CHUNKS_FILE)) and os.path.isfile(os.path.join(path, VECTORS_FILE))
+
+    @classmethod
+    def load_local(cls, path: str, embeddings) -> "NumpyVectorStore | None":
+        """Open a saved store (vectors memory-mapped), or None if missing, incomplete or from another model."""
+        if not cls.exists(path):
+            return None
+        with open(os.path.join(path, CHUNKS_FILE), "r", encoding="utf-8") as f:
+            table = json.load(f)
+        model_id = _model_id(embeddings)
+        if model_id and table.get("model") and table["model"] != model_id:
+            return None
+        texts = table.get("texts") or []
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        # Empty files cannot be mapped
+        vectors = np.load(vectors_path, mmap_mode="r") if texts else np.load(vectors_path)
+        if vectors.shape[0] != len(texts):
+            return None
+        return cls(texts, vectors, embeddings, table.get("metadatas"), model_id=table.get("model"))
+
+    def similarity_search_with_score_by_vector(self, vector, k: int = 4) -> list:
+        """[(Document, cosine similarity)] for the `k` chunks closest to `vector`."""
+        if not self.texts:
+            return []
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        scores = self.vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(Document(page_content=self.texts[i], metadata=self.metadatas[i]), float(scores[i])) for i in top]
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> list:
+        if not self.texts:
+            return []
+        return self.similarity_search_with_score_by_vector(self.embeddings.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4) -> list:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def as_retriever(self, search_kwargs: dict | None = None, **kwargs) -> NumpyRetriever:
+        return NumpyRetriever(self, k=(search_kwargs or {}).get("k", 4))
+
+
+class VectorStoreLRU:
+    """Process-wide LRU of loaded vector stores, bounded by total bytes.
+
+    Keys are tuples such as ``(user, resume_hash, kind)``.
+    """
+
+    def __init__(self, max_bytes: int = VECTOR_STORE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stores = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """The resident store for `key` (marked most recently used), or None."""
+        with self._lock:
+            store = self._stores.get(key)
+            if store is None:
+                self.misses += 1
+                return None
+            self._stores.move_to_end(key)
+            self.hits += 1
+            return store
+
+    def put(self, key, store) -> None:
+        """Keep `store` resident, evicting least-recently-used stores over the byte budget."""
+        size = store.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._stores.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._stores[key] = store
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._stores) > 1:
+                _, victim = self._stores.popitem(last=False)
+                self._bytes -= victim.nbytes
+                self.evictions += 1
+
+    def discard(self, key) -> None:
+        with self._lock:
+            store = self._stores.pop(key, None)
+            if store is not None:
+                self._bytes -= store.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stores.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Resident stores and bytes, budget, and hit/miss/eviction counters."""
+        with self._lock:
+            return {"stores": len(self._stores), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+# Process-wide cache used by `agents.resume_analyzer`
+VECTOR_STORE_CACHE = VectorStoreLRU()